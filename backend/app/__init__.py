@@ -1,23 +1,42 @@
 import warnings
 from sqlalchemy.exc import LegacyAPIWarning
-from authlib.integrations.flask_client import OAuth
 from flask import Flask, jsonify
 from flask_cors import CORS
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from flask_mail import Mail
-from twilio.rest import Client as TwilioClient
+from werkzeug.utils import import_string
 from backend.config import DevConfig, TestConfig
+from .hashing import HashingBusy, PasswordHasher
+from .integrations import LazyOAuth, ProviderNotConfigured
+from .routing import RoutingSession
 warnings.filterwarnings("ignore", category=LegacyAPIWarning)
 Flask._check_setup_finished = lambda self, f_name: None
-db = SQLAlchemy(session_options={"expire_on_commit": False})
-migrate = Migrate()
+db = SQLAlchemy(session_options={"expire_on_commit": False, "class_": RoutingSession})
 bcrypt = Bcrypt()
+hasher = PasswordHasher()
 jwt = JWTManager()
-oauth = OAuth()
-mail = Mail()
+oauth = LazyOAuth()
+BLUEPRINTS = {
+    "admin": "admin:admin_bp",
+    "audit": "audit:audit_bp",
+    "auth": "auth:auth_bp",
+    "categories": "categories:categories_bp",
+    "comments": "comments:comments_bp",
+    "content": "content:content_bp",
+    "email_verification": "email_verification:email_verification_bp",
+    "moderation": "moderation:moderation_bp",
+    "notifications": "notifications:notifications_bp",
+    "password_reset": "password_reset:password_reset_bp",
+    "profiles": "profiles:profile_bp",
+    "profiling": "profiling:profiling_bp",
+    "proxy": "proxy:proxy_bp",
+    "recommendations": "recommendations:recommendations_bp",
+    "reactions": "reactions:reactions_bp",
+    "subscriptions": "subscriptions:subscriptions_bp",
+    "users": "users:user_bp",
+    "wishlists": "wishlists:wishlists_bp",
+}
 def create_app(config_name=DevConfig):
     app = Flask(__name__)
     if isinstance(config_name, str) and config_name.lower() == "testing":
@@ -28,6 +47,13 @@ def create_app(config_name=DevConfig):
         }
     else:
         app.config.from_object(config_name)
+    if app.config.get("PROXY_FIX_X_FOR") or app.config.get("PROXY_FIX_X_PROTO"):
+        from werkzeug.middleware.proxy_fix import ProxyFix
+        app.wsgi_app = ProxyFix(
+            app.wsgi_app, x_for=app.config["PROXY_FIX_X_FOR"], x_proto=app.config.get("PROXY_FIX_X_PROTO", 0)
+        )
+    from .metrics import metrics
+    metrics.init_app(app)
     CORS(
         app,
         supports_credentials=True,
@@ -35,70 +61,53 @@ def create_app(config_name=DevConfig):
     )
     db.init_app(app)
     app.extensions["sqlalchemy"].db = db
-    migrate.init_app(app, db)
+    from .routing import router
+    router.init_app(app)
+    if app.config.get("DB_MIGRATIONS_ENABLED", True):
+        from flask_migrate import Migrate
+        Migrate(app, db)
     bcrypt.init_app(app)
+    hasher.init_app(app)
     jwt.init_app(app)
+    from .revocation import revocations
+    revocations.init_app(app, jwt)
+    from .identity import identity_loader
+    identity_loader.init_app(app, jwt)
     oauth.init_app(app)
-    mail.init_app(app)
-    sid = app.config.get("TWILIO_ACCOUNT_SID")
-    token = app.config.get("TWILIO_AUTH_TOKEN")
-    if sid and token:
-        app.twilio = TwilioClient(sid, token)
-    else:
-        app.twilio = None
-    oauth.register(
-        name="github",
-        client_id=app.config["GITHUB_CLIENT_ID"],
-        client_secret=app.config["GITHUB_CLIENT_SECRET"],
-        access_token_url="https://github.com/login/oauth/access_token",
-        authorize_url="https://github.com/login/oauth/authorize",
-        api_base_url="https://api.github.com/",
-        client_kwargs={"scope": "user:email"},
-    )
-    oauth.register(
-        name="google",
-        client_id=app.config["GOOGLE_CLIENT_ID"],
-        client_secret=app.config["GOOGLE_CLIENT_SECRET"],
-        access_token_url="https://oauth2.googleapis.com/token",
-        authorize_url="https://accounts.google.com/o/oauth2/auth",
-        api_base_url="https://www.googleapis.com/oauth2/v1/",
-        client_kwargs={"scope": "openid email profile"},
-    )
+    from .sweeper import sweeper
+    sweeper.init_app(app)
+    from .ratelimit import limiter
+    limiter.init_app(app)
+    from .audit import audit_writer
+    audit_writer.init_app(app)
+    from .audit_archive import audit_archive
+    audit_archive.init_app(app)
+    from .cache import cache
+    cache.init_app(app)
+    from .upstream import upstream
+    upstream.init_app(app)
+    from .ingestion import ingestor
+    ingestor.init_app(app)
+    from .startup import startup_profiler
+    startup_profiler.init_app(app)
+    from .moderation import counters
+    counters.init_app(app)
+    from .seeding import seeder
+    seeder.init_app(app)
+    from .profiling import request_profiler
+    request_profiler.init_app(app)
+    from .scheduling import job_runner
+    job_runner.init_app(app)
     @app.errorhandler(404)
     def handle_not_found(error):
         message = error.description or "Not found"
         return jsonify({"error": message}), 404
-    from .admin import admin_bp
-    from .audit import audit_bp
-    from .auth import auth_bp
-    from .categories import categories_bp
-    from .comments import comments_bp
-    from .content import content_bp
-    from .email_verification import email_verification_bp
-    from .notifications import notifications_bp
-    from .password_reset import password_reset_bp
-    from .profiles import profile_bp
-    from .recommendations import recommendations_bp
-    from .reactions import reactions_bp
-    from .subscriptions import subscriptions_bp
-    from .users import user_bp
-    from .wishlists import wishlists_bp
-    for bp in (
-        admin_bp,
-        audit_bp,
-        auth_bp,
-        categories_bp,
-        comments_bp,
-        content_bp,
-        email_verification_bp,
-        notifications_bp,
-        password_reset_bp,
-        profile_bp,
-        recommendations_bp,
-        reactions_bp,
-        subscriptions_bp,
-        user_bp,
-        wishlists_bp,
-    ):
-        app.register_blueprint(bp)
+    @app.errorhandler(HashingBusy)
+    def handle_hashing_busy(error):
+        return jsonify({"error": "Server busy, please retry."}), 503, {"Retry-After": "1"}
+    @app.errorhandler(ProviderNotConfigured)
+    def handle_provider_not_configured(error):
+        return jsonify({"error": f"{error.provider.title()} login is not configured."}), 503
+    for name in app.config.get("BLUEPRINTS") or BLUEPRINTS:
+        app.register_blueprint(import_string(f"{__name__}.{BLUEPRINTS[name]}"))
     return app
\ No newline at end of file
@@ -1,10 +1,29 @@
 import logging
-from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import jwt_required
-from marshmallow import Schema, ValidationError, fields, validate
+from flask import Blueprint, abort, current_app, jsonify, request
+from flask_jwt_extended import current_user, get_jwt_identity, jwt_required
+from marshmallow import Schema, ValidationError, fields, validate, validates
+from sqlalchemy import delete, func, insert, select, update
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
-from . import bcrypt, db
-from .models import Category, Content, ContentStatusEnum, Role, User, UserRole
+from . import db, hasher
+from .audit import audit
+from .content import _fan_out_notifications
+from .models import (
+    Category,
+    Comment,
+    Content,
+    ContentHistory,
+    ContentStatusEnum,
+    ContentTag,
+    Flag,
+    Notification,
+    Reaction,
+    Role,
+    Subscription,
+    User,
+    UserRole,
+    Wishlist,
+)
+from .moderation import add_delta, content_deltas, counters
 from .utils import roles_required
 logger = logging.getLogger(__name__)
 admin_bp = Blueprint("admin", __name__, url_prefix="/admin")
@@ -38,7 +57,7 @@ def handle_validation_error(err: ValidationError):
 def create_user():
     data = CreateUserSchema().load(request.get_json() or {})
     chosen_name = data.get("name") or data["email"]
-    pw_hash = bcrypt.generate_password_hash(data["password"]).decode("utf-8")
+    pw_hash = hasher.generate(data["password"])
     user = User(email=data["email"], name=chosen_name, password_hash=pw_hash)
     db.session.add(user)
     try:
@@ -132,6 +151,8 @@ def flag_content(content_id: int):
         abort(404)
     data = FlagContentSchema().load(request.get_json() or {})
     content.status = ContentStatusEnum.Flagged
+    content.flag_count = Content.flag_count + 1
+    db.session.add(Flag(user_id=int(get_jwt_identity()), content_id=content.id, reason=data["reason"]))
     db.session.commit()
     return jsonify(
         {"message": f"Content {content.id} flagged.", "reason": data["reason"]}
@@ -145,4 +166,161 @@ def delete_content(content_id: int):
         abort(404)
     db.session.delete(content)
     db.session.commit()
-    return jsonify({"message": f"Content {content.id} deleted."}), 200
\ No newline at end of file
+    return jsonify({"message": f"Content {content.id} deleted."}), 200
+CONTENT_CHILDREN = (ContentTag, ContentHistory, Comment, Subscription, Wishlist, Reaction, Flag, Notification)
+class BulkContentSchema(Schema):
+    ids = fields.List(fields.Int(strict=True), required=True, validate=validate.Length(min=1))
+    @validates("ids")
+    def validate_size(self, ids, **kwargs):
+        limit = current_app.config.get("ADMIN_BULK_MAX_IDS", 1000)
+        if len(ids) > limit:
+            raise ValidationError(f"At most {limit} ids per request.")
+class BulkFlagContentSchema(BulkContentSchema):
+    reason = fields.Str(required=True, validate=validate.Length(max=256))
+def _unique(ids) -> list:
+    return list(dict.fromkeys(ids))
+def _authored(stmt):
+    if current_user.has_role("Admin"):
+        return stmt
+    return stmt.where(Content.author_id == current_user.id)
+def _statuses(ids):
+    rows = db.session.execute(select(Content.id, Content.status, Content.author_id).where(Content.id.in_(ids))).all()
+    authors = {row.id: row.author_id for row in rows}
+    if current_user.has_role("Admin"):
+        return {row.id: row.status for row in rows}, set(), authors
+    current = {row.id: row.status for row in rows if row.author_id == current_user.id}
+    return current, {row.id for row in rows if row.author_id != current_user.id}, authors
+def _result(cid, current, forbidden, label):
+    if cid in forbidden:
+        return "forbidden"
+    return label if cid in current else "not_found"
+def _record_status_change(current, changed, status, authors) -> None:
+    deltas = {}
+    for cid in changed:
+        add_delta(deltas, "status", current[cid], -1, authors[cid])
+        add_delta(deltas, "status", status, 1, authors[cid])
+    counters.record(db.session, deltas)
+def _tag_contents(ids, *prefixes) -> None:
+    db.session.info.setdefault("cache_tags", set()).update(
+        f"{prefix}:{content_id}" for content_id in ids for prefix in prefixes
+    )
+def _bulk_details(kwargs, resp):
+    body = resp[0].get_json()
+    if not body or "results" not in body:
+        return None
+    changed = [r["id"] for r in body["results"] if r["result"] not in ("unchanged", "not_found", "forbidden")]
+    return {"requested": len(body["results"]), "ids": changed}
+def _bulk_set_status(ids, status, label):
+    ids = _unique(ids)
+    current, forbidden, authors = _statuses(ids)
+    changed = [cid for cid in ids if cid in current and current[cid] != status]
+    if changed:
+        db.session.execute(
+            _authored(update(Content).where(Content.id.in_(changed)).values(status=status)),
+            execution_options={"synchronize_session": False},
+        )
+        _record_status_change(current, changed, status, authors)
+        _tag_contents(changed, "content")
+    results = [
+        {"id": cid, "result": _result(cid, current, forbidden, label if cid in changed else "unchanged")}
+        for cid in ids
+    ]
+    return changed, results
+@admin_bp.route("/contents/bulk/approve", methods=["POST"])
+@jwt_required()
+@roles_required("Admin", "TechWriter")
+@audit("bulk_approve_content", target_type="Content", details_fn=_bulk_details)
+def bulk_approve_content():
+    data = BulkContentSchema().load(request.get_json() or {})
+    try:
+        changed, results = _bulk_set_status(data["ids"], ContentStatusEnum.Published, "approved")
+        notified = _fan_out_notifications(changed)
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Bulk approval of %d contents failed", len(data["ids"]))
+        return jsonify({"error": "Bulk approval failed."}), 500
+    return jsonify({"approved": len(changed), "notified": notified, "results": results}), 200
+@admin_bp.route("/contents/bulk/flag", methods=["POST"])
+@jwt_required()
+@roles_required("Admin", "TechWriter")
+@audit("bulk_flag_content", target_type="Content", details_fn=_bulk_details)
+def bulk_flag_content():
+    data = BulkFlagContentSchema().load(request.get_json() or {})
+    ids = _unique(data["ids"])
+    try:
+        current, forbidden, authors = _statuses(ids)
+        found = [cid for cid in ids if cid in current]
+        if found:
+            user_id = int(get_jwt_identity())
+            db.session.execute(
+                insert(Flag),
+                [{"user_id": user_id, "content_id": cid, "reason": data["reason"]} for cid in found],
+            )
+            db.session.execute(
+                _authored(
+                    update(Content)
+                    .where(Content.id.in_(found))
+                    .values(status=ContentStatusEnum.Flagged, flag_count=Content.flag_count + 1)
+                ),
+                execution_options={"synchronize_session": False},
+            )
+            changed = [cid for cid in found if current[cid] != ContentStatusEnum.Flagged]
+            _record_status_change(current, changed, ContentStatusEnum.Flagged, authors)
+            _tag_contents(found, "content")
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Bulk flagging of %d contents failed", len(ids))
+        return jsonify({"error": "Bulk flagging failed."}), 500
+    results = [{"id": cid, "result": _result(cid, current, forbidden, "flagged")} for cid in ids]
+    return jsonify({"flagged": len(found), "reason": data["reason"], "results": results}), 200
+@admin_bp.route("/contents/bulk/delete", methods=["POST"])
+@jwt_required()
+@roles_required("Admin")
+@audit("bulk_delete_content", target_type="Content", details_fn=_bulk_details)
+def bulk_delete_content():
+    data = BulkContentSchema().load(request.get_json() or {})
+    ids = _unique(data["ids"])
+    try:
+        rows = db.session.execute(
+            select(Content.id, Content.status, Content.content_type, Content.category_id, Content.author_id)
+            .where(Content.id.in_(ids))
+        ).all()
+        found = {row.id for row in rows}
+        if found:
+            deltas = content_deltas([row[1:] for row in rows], -1)
+            for author_id, count in db.session.execute(
+                select(Content.author_id, func.count())
+                .select_from(Comment)
+                .join(Content, Content.id == Comment.content_id)
+                .where(Comment.content_id.in_(found))
+                .group_by(Content.author_id)
+            ):
+                add_delta(deltas, "comments", "all", -count, author_id)
+            for author_id, reaction_type, count in db.session.execute(
+                select(Content.author_id, Reaction.type, func.count())
+                .select_from(Reaction)
+                .join(Content, Content.id == Reaction.content_id)
+                .where(Reaction.content_id.in_(found))
+                .group_by(Content.author_id, Reaction.type)
+            ):
+                add_delta(deltas, "reactions", reaction_type, -count, author_id)
+            counters.record(db.session, deltas)
+            for model in CONTENT_CHILDREN:
+                db.session.execute(
+                    delete(model).where(model.content_id.in_(found)),
+                    execution_options={"synchronize_session": False},
+                )
+            db.session.execute(
+                delete(Content).where(Content.id.in_(found)),
+                execution_options={"synchronize_session": False},
+            )
+            _tag_contents(found, "content", "reactions")
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        logger.exception("Bulk deletion of %d contents failed", len(ids))
+        return jsonify({"error": "Bulk deletion failed."}), 500
+    results = [{"id": cid, "result": "deleted" if cid in found else "not_found"} for cid in ids]
+    return jsonify({"deleted": len(found), "results": results}), 200
@@ -1,11 +1,190 @@
+import atexit
 import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
 from functools import wraps
+from itertools import islice
 from flask import Blueprint, request, jsonify, current_app
 from flask_jwt_extended import get_jwt_identity, jwt_required
+from sqlalchemy.orm import load_only
+from werkzeug.exceptions import BadRequest
 from . import db
 from .models import AuditLog
 logger = logging.getLogger(__name__)
 audit_bp = Blueprint("audit", __name__, url_prefix="/audit")
+_WAKE = object()
+class AuditWriter:
+    def __init__(self, app=None):
+        self.app = None
+        self.enabled = False
+        self.batch_size = 500
+        self.flush_interval = 1.0
+        self._queue = queue.Queue()
+        self._thread = None
+        self._pid = None
+        self._stop = threading.Event()
+        self._batch_ready = threading.Event()
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.overflowed = 0
+        self.failed = 0
+        atexit.register(self.shutdown)
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        self.shutdown()
+        self.app = app
+        self.enabled = app.config.get("AUDIT_ASYNC", True)
+        self.batch_size = app.config.get("AUDIT_BATCH_SIZE", 500)
+        self.flush_interval = app.config.get("AUDIT_FLUSH_INTERVAL", 1.0)
+        self._queue = queue.Queue(maxsize=app.config.get("AUDIT_QUEUE_SIZE", 10000))
+        self._stop = threading.Event()
+        app.extensions["audit_writer"] = self
+    def depth(self) -> int:
+        return self._queue.qsize()
+    def submit(self, row: dict) -> None:
+        if not self.enabled:
+            self._write_sync([row])
+            return
+        self._ensure_started()
+        try:
+            self._queue.put_nowait(row)
+            if self._queue.qsize() >= self.batch_size:
+                self._batch_ready.set()
+        except queue.Full:
+            self.overflowed += 1
+            logger.warning("Audit queue full; writing %s synchronously", row["action"])
+            self._write_sync([row])
+    def _ensure_started(self) -> None:
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            return
+        with self._start_lock:
+            if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+                return
+            self._stop.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name="audit-writer", daemon=True)
+            self._thread.start()
+    def _write_sync(self, rows) -> None:
+        db.session.execute(AuditLog.__table__.insert().values(rows))
+        db.session.commit()
+        self.written += len(rows)
+    def _write_batch(self, rows) -> None:
+        with self.app.app_context():
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(AuditLog.__table__.insert().values(rows))
+                self.written += len(rows)
+            except Exception:
+                self.failed += len(rows)
+                logger.exception("Failed to write %s audit records", len(rows))
+    def _drain(self, batch):
+        while len(batch) < self.batch_size:
+            try:
+                row = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if row is _WAKE:
+                self._queue.task_done()
+                continue
+            batch.append(row)
+        return batch
+    def _run(self) -> None:
+        while not self._stop.is_set() or not self._queue.empty():
+            try:
+                first = self._queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                continue
+            if first is _WAKE:
+                self._queue.task_done()
+                continue
+            if not self._stop.is_set():
+                self._batch_ready.wait(self.flush_interval)
+            self._batch_ready.clear()
+            batch = self._drain([first])
+            self._write_batch(batch)
+            for _ in batch:
+                self._queue.task_done()
+    def flush(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self._batch_ready.set()
+            self._queue.join()
+    def shutdown(self, timeout: float = 10.0) -> None:
+        self._stop.set()
+        self._batch_ready.set()
+        if self._thread is not None and self._thread.is_alive() and self._pid == os.getpid():
+            try:
+                self._queue.put_nowait(_WAKE)
+            except queue.Full:
+                pass
+            self._thread.join(timeout)
+        self._thread = None
+        leftover = []
+        while True:
+            try:
+                row = self._queue.get_nowait()
+                self._queue.task_done()
+                if row is not _WAKE:
+                    leftover.append(row)
+            except queue.Empty:
+                break
+        for start in range(0, len(leftover), self.batch_size):
+            self._write_batch(leftover[start:start + self.batch_size])
+audit_writer = AuditWriter()
+def _parse_timestamp(name: str):
+    raw = request.args.get(name)
+    if raw is None:
+        return None
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise BadRequest(f"Invalid {name} timestamp")
+def _log_to_dict(log: AuditLog, include_details: bool):
+    item = {
+        "id": log.id,
+        "user_id": log.user_id,
+        "action": log.action,
+        "target_type": log.target_type,
+        "target_id": log.target_id,
+        "timestamp": log.timestamp.isoformat() if log.timestamp else None,
+    }
+    if include_details:
+        item["details"] = log.details
+    return item
+def build_log_query(user_id=None, action=None, target_type=None, target_id=None,
+                    since=None, until=None, before_id=None, include_details=False):
+    columns = [
+        AuditLog.id,
+        AuditLog.user_id,
+        AuditLog.action,
+        AuditLog.target_type,
+        AuditLog.target_id,
+        AuditLog.timestamp,
+    ]
+    q = db.session.query(AuditLog)
+    if not include_details:
+        q = q.options(load_only(*columns))
+    if user_id is not None:
+        q = q.filter(AuditLog.user_id == user_id)
+    if action is not None:
+        q = q.filter(AuditLog.action == action)
+    if target_type is not None:
+        q = q.filter(AuditLog.target_type == target_type)
+    if target_id is not None:
+        q = q.filter(AuditLog.target_id == target_id)
+    if since is not None:
+        q = q.filter(AuditLog.timestamp >= since)
+    if until is not None:
+        q = q.filter(AuditLog.timestamp < until)
+    if before_id is not None:
+        q = q.filter(AuditLog.id < before_id)
+    return q.order_by(AuditLog.id.desc())
+@audit_bp.errorhandler(BadRequest)
+def handle_bad_request(err: BadRequest):
+    return jsonify({"error": err.description}), 400
 @audit_bp.route("/logs", methods=["GET"])
 @jwt_required()
 def list_logs():
@@ -15,23 +194,30 @@ def list_logs():
     if limit is None:
         limit = default_limit
     else:
-        limit = min(limit, max_limit)
-    logs = (
-        db.session
-        .query(AuditLog)
-        .order_by(AuditLog.id.desc())
-        .limit(limit)
-        .all()
+        limit = max(1, min(limit, max_limit))
+    filters = dict(
+        user_id=request.args.get("user_id", type=int),
+        action=request.args.get("action"),
+        target_type=request.args.get("target_type"),
+        target_id=request.args.get("target_id", type=int),
+        since=_parse_timestamp("since"),
+        until=_parse_timestamp("until"),
+        include_details=request.args.get("include_details", "").lower() in ("1", "true", "yes"),
     )
-    out = []
-    for l in logs:
-        out.append({
-            "user_id": l.user_id,
-            "action": l.action,
-            "target_type": l.target_type,
-            "target_id": l.target_id,
-        })
-    return jsonify(out), 200
+    before_id = request.args.get("cursor", type=int)
+    logs = build_log_query(before_id=before_id, **filters).limit(limit + 1).all()
+    items = [_log_to_dict(l, filters["include_details"]) for l in logs]
+    if len(items) <= limit:
+        archive = current_app.extensions.get("audit_archive")
+        if archive is not None:
+            archived = archive.iter_logs(before_id=items[-1]["id"] if items else before_id, **filters)
+            items.extend(islice(archived, limit + 1 - len(items)))
+    has_more = len(items) > limit
+    items = items[:limit]
+    return jsonify({
+        "items": items,
+        "next_cursor": items[-1]["id"] if has_more else None,
+    }), 200
 def audit(action: str, target_type: str, target_id_arg: str = None, details_fn=None):
     def decorator(fn):
         @wraps(fn)
@@ -54,15 +240,14 @@ def audit(action: str, target_type: str, target_id_arg: str = None, details_fn=N
                         details = details_fn(kwargs, resp)
                     except Exception:
                         current_app.logger.exception("Failed to run details_fn for %s", action)
-                log = AuditLog(
-                    user_id=user_id,
-                    action=action,
-                    target_type=target_type,
-                    target_id=target_id,
-                    details=details
-                )
-                db.session.add(log)
-                db.session.commit()
+                current_app.extensions["audit_writer"].submit({
+                    "user_id": user_id,
+                    "action": action,
+                    "target_type": target_type,
+                    "target_id": target_id,
+                    "details": details,
+                    "timestamp": datetime.utcnow(),
+                })
             except Exception:
                 current_app.logger.exception("Failed to record audit log for %s", action)
             return resp
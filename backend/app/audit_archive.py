@@ -0,0 +1,282 @@
+import gzip
+import json
+import logging
+import os
+from datetime import datetime
+import click
+from flask import current_app
+from sqlalchemy import text
+from . import db
+from .models import AuditLog
+logger = logging.getLogger(__name__)
+_COLUMNS = ("id", "user_id", "action", "target_type", "target_id", "timestamp", "details")
+def month_start(value: datetime) -> datetime:
+    return datetime(value.year, value.month, 1)
+def add_months(value: datetime, months: int) -> datetime:
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+def partition_name(month: datetime) -> str:
+    return f"audit_logs_y{month.year:04d}m{month.month:02d}"
+def partition_ddl(month: datetime) -> str:
+    return (
+        f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF audit_logs "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')"
+    )
+def move_from_default_ddl(month: datetime) -> list:
+    name = partition_name(month)
+    bounds = f"timestamp >= '{month:%Y-%m-%d}' AND timestamp < '{add_months(month, 1):%Y-%m-%d}'"
+    return [
+        f"CREATE TABLE {name} (LIKE audit_logs INCLUDING DEFAULTS INCLUDING CONSTRAINTS)",
+        f"WITH moved AS (DELETE FROM audit_logs_default WHERE {bounds} RETURNING *) INSERT INTO {name} SELECT * FROM moved",
+        f"ALTER TABLE audit_logs ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{add_months(month, 1):%Y-%m-%d}')",
+    ]
+def _row_to_dict(row) -> dict:
+    item = dict(zip(_COLUMNS, row))
+    item["timestamp"] = item["timestamp"].isoformat() if item["timestamp"] else None
+    return item
+class _NdjsonWriter:
+    suffix = ".ndjson.gz"
+    def __init__(self, path: str):
+        self._fh = gzip.open(path, "wt", encoding="utf-8")
+    def write(self, rows) -> None:
+        for row in rows:
+            self._fh.write(json.dumps(row, separators=(",", ":")))
+            self._fh.write("\n")
+    def close(self) -> None:
+        self._fh.close()
+class _ParquetWriter:
+    suffix = ".parquet"
+    def __init__(self, path: str):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._schema = pa.schema([
+            ("id", pa.int64()),
+            ("user_id", pa.int64()),
+            ("action", pa.string()),
+            ("target_type", pa.string()),
+            ("target_id", pa.int64()),
+            ("timestamp", pa.string()),
+            ("details", pa.string()),
+        ])
+        self._writer = pq.ParquetWriter(path, self._schema, compression="zstd")
+    def write(self, rows) -> None:
+        columns = {name: [row[name] for row in rows] for name in self._schema.names}
+        columns["details"] = [
+            None if value is None else json.dumps(value) for value in columns["details"]
+        ]
+        self._writer.write_table(self._pa.table(columns, schema=self._schema))
+    def close(self) -> None:
+        self._writer.close()
+_WRITERS = {"ndjson": _NdjsonWriter, "parquet": _ParquetWriter}
+def _read_ndjson(path: str):
+    with gzip.open(path, "rt", encoding="utf-8") as fh:
+        for line in fh:
+            if line.strip():
+                yield json.loads(line)
+def _read_parquet(path: str):
+    import pyarrow.parquet as pq
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=1000):
+        for row in batch.to_pylist():
+            if row["details"] is not None:
+                row["details"] = json.loads(row["details"])
+            yield row
+_READERS = {"ndjson": _read_ndjson, "parquet": _read_parquet}
+class AuditArchive:
+    def __init__(self, app=None):
+        self._scheduler = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["audit_archive"] = self
+        @app.cli.command("audit-partitions")
+        @click.option("--ahead", type=int, default=None, help="Months of future partitions to create.")
+        def audit_partitions_command(ahead):
+            created = self.ensure_partitions(ahead=ahead)
+            if created is None:
+                click.echo("audit_logs is not partitioned on this database; nothing to do")
+            for name in created or []:
+                click.echo(f"{name}: ready")
+        @app.cli.command("archive-audit-logs")
+        @click.option("--older-than-months", type=int, default=None, help="Archive months older than this.")
+        def archive_audit_logs_command(older_than_months):
+            for entry in self.archive(older_than_months=older_than_months):
+                click.echo(f"{entry['month']}: {entry['rows']} rows -> {entry['path']}")
+    @property
+    def directory(self) -> str:
+        return current_app.config.get("AUDIT_ARCHIVE_DIR") or os.path.join(current_app.instance_path, "audit_archive")
+    def _is_partitioned(self) -> bool:
+        if db.engine.dialect.name != "postgresql":
+            return False
+        return bool(db.session.execute(text(
+            "SELECT 1 FROM pg_partitioned_table p JOIN pg_class c ON c.oid = p.partrelid "
+            "WHERE c.relname = 'audit_logs'"
+        )).scalar())
+    def ensure_partitions(self, ahead=None, now=None):
+        if not self._is_partitioned():
+            return None
+        ahead = current_app.config.get("AUDIT_PARTITION_MONTHS_AHEAD", 3) if ahead is None else ahead
+        first = month_start(now or datetime.utcnow())
+        names = []
+        for offset in range(ahead + 1):
+            month = add_months(first, offset)
+            name = partition_name(month)
+            if not self._exists(name):
+                if self._default_has_rows(month):
+                    for statement in move_from_default_ddl(month):
+                        db.session.execute(text(statement))
+                    logger.info("Moved %s rows out of audit_logs_default into %s", f"{month:%Y-%m}", name)
+                else:
+                    db.session.execute(text(partition_ddl(month)))
+            names.append(name)
+        db.session.commit()
+        return names
+    def _exists(self, name: str) -> bool:
+        return db.session.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None
+    def _default_has_rows(self, month: datetime) -> bool:
+        if not self._exists("audit_logs_default"):
+            return False
+        return bool(db.session.execute(
+            text("SELECT 1 FROM audit_logs_default WHERE timestamp >= :start AND timestamp < :end LIMIT 1"),
+            {"start": month, "end": add_months(month, 1)},
+        ).scalar())
+    def start_scheduler(self, app, interval_minutes: int) -> None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        def run():
+            with app.app_context():
+                try:
+                    self.ensure_partitions()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Scheduled audit partition maintenance failed")
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(
+            run, "interval", minutes=interval_minutes, id="audit_partitions", max_instances=1, coalesce=True
+        )
+        self._scheduler.start()
+    def shutdown(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+    def load_index(self) -> list:
+        path = os.path.join(self.directory, "index.json")
+        if not os.path.exists(path):
+            return []
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)["entries"]
+    def _save_index(self, entries) -> None:
+        path = os.path.join(self.directory, "index.json")
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as fh:
+            json.dump({"entries": entries}, fh, indent=2)
+        os.replace(tmp, path)
+    def archive(self, older_than_months=None, now=None) -> list:
+        if older_than_months is None:
+            older_than_months = current_app.config.get("AUDIT_ARCHIVE_AFTER_MONTHS", 6)
+        cutoff = add_months(month_start(now or datetime.utcnow()), -older_than_months)
+        oldest = db.session.query(db.func.min(AuditLog.timestamp)).scalar()
+        if oldest is None or oldest >= cutoff:
+            return []
+        os.makedirs(self.directory, exist_ok=True)
+        entries = self.load_index()
+        archived = []
+        month = month_start(oldest)
+        while month < cutoff:
+            entry = self._archive_month(month, entries)
+            if entry is not None:
+                entries.append(entry)
+                self._save_index(entries)
+                self._drop_month(month)
+                archived.append(entry)
+            month = add_months(month, 1)
+        return archived
+    def _archive_month(self, month: datetime, entries: list):
+        fmt = current_app.config.get("AUDIT_ARCHIVE_FORMAT", "ndjson")
+        writer_cls = _WRITERS[fmt]
+        end = add_months(month, 1)
+        part = sum(1 for e in entries if e["month"] == f"{month:%Y-%m}")
+        filename = f"audit_logs_{month:%Y_%m}" + (f".{part}" if part else "") + writer_cls.suffix
+        path = os.path.join(self.directory, filename)
+        batch_size = current_app.config.get("AUDIT_ARCHIVE_BATCH_SIZE", 5000)
+        table = AuditLog.__table__
+        columns = [table.c[name] for name in _COLUMNS]
+        rows_written = 0
+        min_id = max_id = None
+        before_id = None
+        writer = writer_cls(path + ".tmp")
+        try:
+            while True:
+                q = db.select(*columns).where(table.c.timestamp >= month, table.c.timestamp < end)
+                if before_id is not None:
+                    q = q.where(table.c.id < before_id)
+                rows = [_row_to_dict(r) for r in db.session.execute(q.order_by(table.c.id.desc()).limit(batch_size))]
+                if not rows:
+                    break
+                writer.write(rows)
+                rows_written += len(rows)
+                max_id = max_id or rows[0]["id"]
+                min_id = before_id = rows[-1]["id"]
+        finally:
+            writer.close()
+        if not rows_written:
+            os.remove(path + ".tmp")
+            return None
+        os.replace(path + ".tmp", path)
+        logger.info("Archived %s audit rows for %s to %s", rows_written, f"{month:%Y-%m}", path)
+        return {
+            "month": f"{month:%Y-%m}",
+            "start": month.isoformat(),
+            "end": end.isoformat(),
+            "path": filename,
+            "format": fmt,
+            "rows": rows_written,
+            "min_id": min_id,
+            "max_id": max_id,
+        }
+    def _drop_month(self, month: datetime) -> None:
+        name = partition_name(month)
+        if self._is_partitioned() and self._exists(name):
+            db.session.execute(text(f"ALTER TABLE audit_logs DETACH PARTITION {name}"))
+            db.session.execute(text(f"DROP TABLE {name}"))
+            db.session.commit()
+            return
+        end = add_months(month, 1)
+        batch_size = current_app.config.get("AUDIT_ARCHIVE_BATCH_SIZE", 5000)
+        while True:
+            ids = [row_id for (row_id,) in db.session.query(AuditLog.id).filter(
+                AuditLog.timestamp >= month, AuditLog.timestamp < end
+            ).limit(batch_size)]
+            if not ids:
+                break
+            db.session.query(AuditLog).filter(AuditLog.id.in_(ids)).delete(synchronize_session=False)
+            db.session.commit()
+    def iter_logs(self, user_id=None, action=None, target_type=None, target_id=None,
+                  since=None, until=None, before_id=None, include_details=False):
+        entries = sorted(self.load_index(), key=lambda e: e["max_id"], reverse=True)
+        for entry in entries:
+            if before_id is not None and entry["min_id"] >= before_id:
+                continue
+            if since is not None and datetime.fromisoformat(entry["end"]) <= since:
+                continue
+            if until is not None and datetime.fromisoformat(entry["start"]) >= until:
+                continue
+            for row in _READERS[entry["format"]](os.path.join(self.directory, entry["path"])):
+                if before_id is not None and row["id"] >= before_id:
+                    continue
+                if user_id is not None and row["user_id"] != user_id:
+                    continue
+                if action is not None and row["action"] != action:
+                    continue
+                if target_type is not None and row["target_type"] != target_type:
+                    continue
+                if target_id is not None and row["target_id"] != target_id:
+                    continue
+                if since is not None or until is not None:
+                    ts = datetime.fromisoformat(row["timestamp"])
+                    if (since is not None and ts < since) or (until is not None and ts >= until):
+                        continue
+                if not include_details:
+                    row.pop("details", None)
+                yield row
+audit_archive = AuditArchive()
@@ -7,23 +7,24 @@ from flask import Blueprint, request, jsonify, current_app, url_for
 from flask_jwt_extended import(
     create_access_token,
     create_refresh_token,
+    current_user,
     jwt_required,
     get_jwt_identity,
     get_jwt,
 )
-from flask_jwt_extended.utils import decode_token
-from authlib.integrations.flask_client import OAuthError
-from sqlalchemy.exc import SQLAlchemyError
-from twilio.rest import Client as TwilioClient
-from . import db, bcrypt, oauth, mail
+from authlib.common.errors import AuthlibBaseError
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from . import db, hasher, oauth
 from .models import(
     User,
-    RefreshToken,
+    FederatedIdentity,
     PasswordResetToken,
     Role,
     UserRole,
     UserRoleEnum,
 )
+from .ratelimit import rate_limit
+from .revocation import revocations
 from .utils import roles_required, send_email
 logger = logging.getLogger(__name__)
 auth_bp = Blueprint("auth", __name__, url_prefix="/auth")
@@ -59,11 +60,22 @@ def _create_tokens(user_id: int):
     identity = str(user_id)
     at = create_access_token(identity=identity, expires_delta=access_expires)
     rt = create_refresh_token(identity=identity, expires_delta=refresh_expires)
-    jti = decode_token(rt)["jti"]
-    expires_at = datetime.utcnow() + refresh_expires
-    db.session.add(RefreshToken(token=jti, user_id=user_id, expires_at=expires_at))
-    db.session.commit()
     return at, rt
+def _find_federated_user(provider: str, subject: str):
+    identity = FederatedIdentity.query.filter_by(provider=provider, subject=subject).first()
+    return identity.user if identity else None
+def _link_federated_user(provider: str, subject: str, email: str, name: str = None):
+    user = User.query.filter_by(email=email).first()
+    if not user:
+        user = User(email=email, name=name or "", password_hash=None)
+        db.session.add(user)
+    db.session.add(FederatedIdentity(provider=provider, subject=subject, user=user))
+    try:
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        return _find_federated_user(provider, subject) or User.query.filter_by(email=email).first()
+    return user
 @auth_bp.route("/register", methods=["POST"])
 def register():
     raw_data = request.get_json() or {}
@@ -81,7 +93,7 @@ def register():
             db.session.commit()
         except SQLAlchemyError:
             db.session.rollback()
-    pw_hash = bcrypt.generate_password_hash(data["password"]).decode()
+    pw_hash = hasher.generate(data["password"])
     user = User(email=data["email"], name=data["name"], password_hash=pw_hash)
     db.session.add(user)
     try:
@@ -108,11 +120,23 @@ def register():
         201,
     )
 @auth_bp.route("/login", methods=["POST"])
+@rate_limit("login", identifier_field="email")
 def login():
     data = LoginSchema().load(request.get_json() or {})
     user = User.query.filter_by(email=data["email"]).first()
-    if not user or not bcrypt.check_password_hash(user.password_hash, data["password"]):
+    if not user:
+        return jsonify({"error": "Invalid credentials."}), 401
+    stored_hash = user.password_hash
+    if not hasher.verify_and_update(user, data["password"]):
         return jsonify({"error": "Invalid credentials."}), 401
+    if not user.is_active:
+        return jsonify({"error": "Account deactivated."}), 403
+    if user.password_hash != stored_hash:
+        try:
+            db.session.commit()
+        except SQLAlchemyError:
+            db.session.rollback()
+            logger.exception("Password rehash failed for user %s", user.id)
     at, rt = _create_tokens(user.id)
     return(
         jsonify(
@@ -126,42 +150,32 @@ def login():
 @auth_bp.route("/refresh", methods=["POST"])
 @jwt_required(refresh=True)
 def refresh():
-    jti = get_jwt()["jti"]
-    token = RefreshToken.query.filter_by(token=jti, revoked=False).first()
-    if not token:
-        return jsonify({"error": "Token revoked."}), 401
     new_at = create_access_token(identity=get_jwt_identity())
     return jsonify(access_token=new_at), 200
 @auth_bp.route("/logout", methods=["DELETE"])
 @jwt_required(refresh=True)
 def logout():
-    jti = get_jwt()["jti"]
-    token = RefreshToken.query.filter_by(token=jti, revoked=False).first()
-    if token:
-        token.revoked = True
-        db.session.commit()
+    revocations.revoke(get_jwt())
     return jsonify(message="Logged out."), 200
 @auth_bp.route("/me", methods=["GET"])
 @jwt_required()
 def me():
-    user_id = int(get_jwt_identity())
-    user = User.query.get(user_id)
     return(
         jsonify(
-            id=user.id,
-            email=user.email,
-            name=user.name,
-            is_active=user.is_active,
-            roles=[r.name for r in user.roles],
+            id=current_user.id,
+            email=current_user.email,
+            name=current_user.name,
+            is_active=current_user.is_active,
+            roles=sorted(current_user.role_names),
         ),
         200,
     )
 @auth_bp.route("/request-password-reset", methods=["POST"])
+@rate_limit("password_reset", identifier_field="email")
 def request_password_reset():
     from .models import PasswordResetToken
-    db.session.expire_all()
     data = RequestPasswordResetSchema().load(request.get_json() or {})
-    user = User.query.filter_by(email=data["email"]).first()
+    user = User.query.filter_by(email=data["email"]).execution_options(populate_existing=True).first()
     if not user or not user.is_active:
         return(
             jsonify(
@@ -192,15 +206,18 @@ def request_password_reset():
 @auth_bp.route("/reset-password", methods=["POST"])
 def reset_password():
     from .models import PasswordResetToken
-    db.session.expire_all()
     data = ResetPasswordSchema().load(request.get_json() or {})
-    prt = PasswordResetToken.query.filter_by(token=data["token"], used=False).first()
+    prt = (
+        PasswordResetToken.query.filter_by(token=data["token"], used=False)
+        .execution_options(populate_existing=True)
+        .first()
+    )
     if not prt or prt.expires_at < datetime.utcnow():
         return jsonify({"error": "Invalid or expired token."}), 400
-    user = User.query.get(prt.user_id)
+    user = db.session.get(User, prt.user_id, populate_existing=True)
     if not user or not user.is_active:
         return jsonify({"error": "Invalid token."}), 400
-    user.password_hash = bcrypt.generate_password_hash(data["new_password"]).decode()
+    user.password_hash = hasher.generate(data["new_password"])
     prt.used = True
     try:
         db.session.commit()
@@ -218,19 +235,18 @@ def callback_google():
     try:
         token = oauth.google.authorize_access_token()
         userinfo = oauth.google.parse_id_token(token)
-    except OAuthError:
+    except AuthlibBaseError:
         logger.exception("Google OAuth failed")
         return jsonify({"error": "Google login failed"}), 400
-    email = userinfo.get("email")
-    if not email:
-        return jsonify({"error": "Google did not return an email"}), 400
-    user = User.query.filter_by(email=email).first()
+    subject = userinfo.get("sub")
+    if not subject:
+        return jsonify({"error": "Google did not return a subject"}), 400
+    user = _find_federated_user("google", subject)
     if not user:
-        rand_pw = uuid.uuid4().hex
-        pw_hash = bcrypt.generate_password_hash(rand_pw).decode()
-        user = User(email=email, name=userinfo.get("name", ""), password_hash=pw_hash)
-        db.session.add(user)
-        db.session.commit()
+        email = userinfo.get("email")
+        if not email:
+            return jsonify({"error": "Google did not return an email"}), 400
+        user = _link_federated_user("google", subject, email, userinfo.get("name"))
     at, rt = _create_tokens(user.id)
     return(
         jsonify(message="Google login successful.", access_token=at, refresh_token=rt),
@@ -245,21 +261,22 @@ def callback_github():
     try:
         token = oauth.github.authorize_access_token()
         profile = oauth.github.get("user", token=token).json()
-        email = profile.get("email") or next(
-            e["email"]
-            for e in oauth.github.get("user/emails", token=token).json()
-            if e.get("primary")
-        )
+        subject = str(profile["id"])
     except Exception:
         logger.exception("GitHub OAuth failed")
         return jsonify({"error": "GitHub login failed"}), 400
-    user = User.query.filter_by(email=email).first()
+    user = _find_federated_user("github", subject)
     if not user:
-        rand_pw = uuid.uuid4().hex
-        pw_hash = bcrypt.generate_password_hash(rand_pw).decode()
-        user = User(email=email, name=profile.get("name", ""), password_hash=pw_hash)
-        db.session.add(user)
-        db.session.commit()
+        try:
+            email = profile.get("email") or next(
+                e["email"]
+                for e in oauth.github.get("user/emails", token=token).json()
+                if e.get("primary")
+            )
+        except Exception:
+            logger.exception("GitHub OAuth failed")
+            return jsonify({"error": "GitHub login failed"}), 400
+        user = _link_federated_user("github", subject, email, profile.get("name"))
     at, rt = _create_tokens(user.id)
     return(
         jsonify(message="GitHub login successful.", access_token=at, refresh_token=rt),
@@ -0,0 +1,268 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+from flask import Response, current_app, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+logger = logging.getLogger(__name__)
+class CacheStats:
+    FIELDS = ("local_hits", "shared_hits", "misses", "sets", "evictions", "expirations", "invalidations", "errors")
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+    def reset(self) -> None:
+        self._counts = {field: 0 for field in self.FIELDS}
+    def as_dict(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts["local_hits"] + counts["shared_hits"] + counts["misses"]
+        counts["hit_ratio"] = (lookups - counts["misses"]) / lookups if lookups else 0.0
+        return counts
+class LRUTier:
+    def __init__(self, max_entries=2048, stats=None):
+        self.max_entries = max_entries
+        self.stats = stats or CacheStats()
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._tags = {}
+    def _discard(self, key) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._tags.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tags[tag]
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] <= time.monotonic():
+                self._discard(key)
+                self.stats.incr("expirations")
+                return None
+            self._entries.move_to_end(key)
+            return entry[1]
+    def set(self, key, value, ttl, tags=()) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._discard(key)
+            self._entries[key] = (time.monotonic() + ttl, value, tuple(tags))
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._discard(next(iter(self._entries)))
+                self.stats.incr("evictions")
+    def invalidate_tags(self, tags) -> int:
+        with self._lock:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._discard(key)
+            return len(keys)
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._tags.clear()
+    def __len__(self) -> int:
+        return len(self._entries)
+class RedisTier:
+    def __init__(self, client, prefix="cache:"):
+        self._redis = client
+        self.prefix = prefix
+        self.channel = prefix + "invalidations"
+        self._pubsub = None
+        self._listener = None
+        self._on_invalidate = None
+    @classmethod
+    def from_url(cls, url, prefix="cache:"):
+        import redis
+        return cls(redis.Redis.from_url(url), prefix)
+    def get(self, key):
+        raw = self._redis.get(self.prefix + key)
+        if raw is None:
+            return None
+        payload = json.loads(raw)
+        return payload["value"], payload["tags"]
+    def set(self, key, value, ttl, tags=()) -> None:
+        pipe = self._redis.pipeline()
+        pipe.set(self.prefix + key, json.dumps({"value": value, "tags": list(tags)}), ex=max(1, int(ttl)))
+        for tag in tags:
+            pipe.sadd(f"{self.prefix}tag:{tag}", key)
+            pipe.expire(f"{self.prefix}tag:{tag}", max(1, int(ttl)) * 2)
+        pipe.execute()
+    def invalidate_tags(self, tags) -> int:
+        removed = 0
+        for tag in tags:
+            tag_key = f"{self.prefix}tag:{tag}"
+            keys = self._redis.smembers(tag_key)
+            pipe = self._redis.pipeline()
+            for key in keys:
+                pipe.delete(self.prefix + key.decode() if isinstance(key, bytes) else self.prefix + key)
+            pipe.delete(tag_key)
+            removed += len(keys)
+            pipe.execute()
+        return removed
+    def clear(self) -> None:
+        for key in self._redis.scan_iter(self.prefix + "*"):
+            self._redis.delete(key)
+    def subscribe(self, on_invalidate) -> None:
+        self._on_invalidate = on_invalidate
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{self.channel: self._on_message})
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    def _on_message(self, message) -> None:
+        data = message["data"]
+        self._on_invalidate(json.loads(data.decode() if isinstance(data, bytes) else data))
+    def publish(self, tags) -> None:
+        self._redis.publish(self.channel, json.dumps(list(tags)))
+    def after_fork(self) -> None:
+        self._redis.connection_pool.reset()
+        if self._on_invalidate is not None:
+            self.subscribe(self._on_invalidate)
+    def shutdown(self) -> None:
+        if self._listener is not None:
+            self._listener.stop()
+            self._pubsub.close()
+            self._listener = None
+class Cache:
+    def __init__(self, app=None):
+        self.stats = CacheStats()
+        self.local = LRUTier(stats=self.stats)
+        self.shared = None
+        self.default_ttl = 60
+        self.local_ttl = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        self.stats.reset()
+        self.local = LRUTier(app.config.get("CACHE_LOCAL_MAX_ENTRIES", 2048), stats=self.stats)
+        self.default_ttl = app.config.get("CACHE_DEFAULT_TTL", 60)
+        self.local_ttl = app.config.get("CACHE_LOCAL_TTL")
+        self.shutdown()
+        self.shared = None
+        if app.config.get("CACHE_REDIS_URL"):
+            self.shared = RedisTier.from_url(app.config["CACHE_REDIS_URL"], app.config.get("CACHE_KEY_PREFIX", "cache:"))
+            self.shared.subscribe(self.local.invalidate_tags)
+        app.extensions["cache"] = self
+    @staticmethod
+    def enabled() -> bool:
+        return current_app.config.get("CACHE_ENABLED", True)
+    def get(self, key):
+        value = self.local.get(key)
+        if value is not None:
+            self.stats.incr("local_hits")
+            return value
+        if self.shared is not None:
+            try:
+                found = self.shared.get(key)
+            except Exception:
+                self.stats.incr("errors")
+                logger.warning("Shared cache read failed for %s", key, exc_info=True)
+                found = None
+            if found is not None:
+                self.stats.incr("shared_hits")
+                value, tags = found
+                self.local.set(key, value, self._local_ttl(self.default_ttl), tags)
+                return value
+        self.stats.incr("misses")
+        return None
+    def _local_ttl(self, ttl):
+        if self.local_ttl:
+            return min(ttl, self.local_ttl)
+        return ttl
+    def set(self, key, value, ttl=None, tags=()) -> None:
+        ttl = self.default_ttl if ttl is None else ttl
+        self.stats.incr("sets")
+        self.local.set(key, value, self._local_ttl(ttl), tags)
+        if self.shared is not None:
+            try:
+                self.shared.set(key, value, ttl, tags)
+            except Exception:
+                self.stats.incr("errors")
+                logger.warning("Shared cache write failed for %s", key, exc_info=True)
+    def invalidate_tags(self, *tags) -> None:
+        if not tags:
+            return
+        self.stats.incr("invalidations", len(tags))
+        self.local.invalidate_tags(tags)
+        if self.shared is not None:
+            try:
+                self.shared.invalidate_tags(tags)
+                self.shared.publish(tags)
+            except Exception:
+                self.stats.incr("errors")
+                logger.warning("Shared cache invalidation failed for %s", tags, exc_info=True)
+    def clear(self) -> None:
+        self.local.clear()
+        if self.shared is not None:
+            self.shared.clear()
+    def after_fork(self) -> None:
+        if self.shared is not None:
+            self.shared.after_fork()
+    def shutdown(self) -> None:
+        if self.shared is not None:
+            self.shared.shutdown()
+cache = Cache()
+def _build_key(prefix, kwargs, vary_on_identity, query_args):
+    parts = [prefix]
+    parts.extend(f"{name}={kwargs[name]}" for name in sorted(kwargs))
+    if query_args:
+        parts.extend(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+    if vary_on_identity:
+        verify_jwt_in_request(optional=True)
+        parts.append(f"identity={get_jwt_identity()}")
+    return "|".join(parts)
+def cached(ttl=None, tags=(), key_prefix=None, vary_on_identity=False, query_args=True):
+    def decorator(fn):
+        prefix = key_prefix or f"{fn.__module__}.{fn.__name__}"
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not cache.enabled():
+                return fn(*args, **kwargs)
+            key = _build_key(prefix, kwargs, vary_on_identity, query_args)
+            hit = cache.get(key)
+            if hit is not None:
+                return Response(hit["body"], status=hit["status"], mimetype=hit["mimetype"])
+            resp = current_app.make_response(fn(*args, **kwargs))
+            if resp.status_code == 200 and not resp.direct_passthrough:
+                cache.set(
+                    key,
+                    {"body": resp.get_data(as_text=True), "status": resp.status_code, "mimetype": resp.mimetype},
+                    ttl,
+                    [tag.format(**kwargs) for tag in tags],
+                )
+            return resp
+        return wrapper
+    return decorator
+def _model_tags(obj) -> list:
+    from .models import Category, Content, Reaction
+    if isinstance(obj, Content):
+        return [f"content:{obj.id}", f"reactions:{obj.id}"]
+    if isinstance(obj, Reaction):
+        return [f"reactions:{obj.content_id}"]
+    if isinstance(obj, Category):
+        return ["categories"]
+    return []
+@event.listens_for(Session, "after_flush")
+def _collect_cache_tags(session, flush_context):
+    tags = session.info.setdefault("cache_tags", set())
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        tags.update(_model_tags(obj))
+@event.listens_for(Session, "after_commit")
+def _invalidate_committed(session):
+    tags = session.info.pop("cache_tags", None)
+    if tags:
+        cache.invalidate_tags(*tags)
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("cache_tags", None)
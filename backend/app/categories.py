@@ -5,7 +5,9 @@ from marshmallow import Schema, ValidationError, fields, validate, EXCLUDE
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from . import db
 from .audit import audit
+from .cache import cached
 from .models import Category
+from .routing import replica_reads
 from .utils import roles_required
 logger = logging.getLogger(__name__)
 categories_bp = Blueprint("categories", __name__, url_prefix="/categories")
@@ -22,6 +24,8 @@ class CategorySchema(Schema):
 def handle_validation_error(err: ValidationError):
     return jsonify({"errors": err.messages}), 400
 @categories_bp.route("", methods=["GET"])
+@cached(ttl=600, tags=("categories",))
+@replica_reads
 def list_categories():
     cats = Category.query.order_by(Category.name).all()
     return jsonify([
@@ -29,6 +33,7 @@ def list_categories():
         for c in cats
     ]), 200
 @categories_bp.route("/<int:category_id>", methods=["GET"])
+@replica_reads
 def get_category(category_id):
     c = Category.query.get_or_404(category_id)
     return jsonify({
@@ -2,12 +2,13 @@ import logging
 from datetime import datetime, timedelta
 from typing import Any, Dict, List
 from flask import Blueprint, abort, jsonify, request
-from flask_jwt_extended import get_jwt_identity, jwt_required
+from flask_jwt_extended import current_user, get_jwt_identity, jwt_required
 from marshmallow import Schema, ValidationError, fields, validate
 from sqlalchemy.exc import SQLAlchemyError
 from werkzeug.exceptions import HTTPException
 from . import db
-from .models import Comment, Content, User
+from .models import Comment, Content
+from .routing import replica_reads
 logger = logging.getLogger(__name__)
 comments_bp = Blueprint(
     "comments",
@@ -34,16 +35,36 @@ class CommentService:
             abort(404, description="Comment not found")
         return comment
     @staticmethod
-    def is_admin(user: User) -> bool:
-        return any(r.name == "Admin" for r in user.roles)
+    def is_admin(user) -> bool:
+        return user.has_role("Admin")
     @staticmethod
     def can_edit(comment: Comment, user_id: int) -> bool:
         if comment.user_id != user_id:
             return False
         return datetime.utcnow() <= comment.created_at + EDIT_WINDOW
     @staticmethod
-    def can_delete(comment: Comment, user: User) -> bool:
+    def can_delete(comment: Comment, user) -> bool:
         return comment.user_id == user.id or CommentService.is_admin(user)
+def _build_comment_tree(comments) -> List[Dict[str, Any]]:
+    nodes: Dict[int, Dict[str, Any]] = {
+        c.id: {
+            "id": c.id,
+            "user_id": c.user_id,
+            "body": c.body,
+            "parent_id": c.parent_id,
+            "created_at": c.created_at.isoformat(),
+            "replies": [],
+        }
+        for c in comments
+    }
+    threads: List[Dict[str, Any]] = []
+    for c in comments:
+        node = nodes[c.id]
+        if not c.parent_id:
+            threads.append(node)
+        elif c.parent_id in nodes:
+            nodes[c.parent_id]["replies"].append(node)
+    return threads
 @comments_bp.errorhandler(ValidationError)
 def handle_bad_payload(err: ValidationError):
     return jsonify({"errors": err.messages}), 400
@@ -81,31 +102,13 @@ def create_comment(content_id: int):
         abort(500, description="Could not create comment")
     return jsonify({"id": comment.id}), 201
 @comments_bp.route("", methods=["GET"])
+@replica_reads
 def list_comments(content_id: int):
     CommentService.get_content_or_404(content_id)
     all_comments = Comment.query.filter_by(
         content_id=content_id
     ).order_by(Comment.created_at).all()
-    nodes: Dict[int, Dict[str, Any]] = {
-        c.id: {
-            "id": c.id,
-            "user_id": c.user_id,
-            "body": c.body,
-            "parent_id": c.parent_id,
-            "created_at": c.created_at.isoformat(),
-            "replies": [],
-        }
-        for c in all_comments
-    }
-    threads: List[Dict[str, Any]] = []
-    for c in all_comments:
-        node = nodes[c.id]
-        if c.parent_id:
-            nodes[c.parent_id]["replies"].append(node)
-        else:
-            threads.append(node)
-
-    return jsonify(threads), 200
+    return jsonify(_build_comment_tree(all_comments)), 200
 @comments_bp.route("/<int:comment_id>", methods=["PUT"])
 @jwt_required()
 def edit_comment(content_id: int, comment_id: int):
@@ -125,12 +128,9 @@ def edit_comment(content_id: int, comment_id: int):
 @comments_bp.route("/<int:comment_id>", methods=["DELETE"])
 @jwt_required()
 def delete_comment(content_id: int, comment_id: int):
-    user_id = int(get_jwt_identity())
+    user_id = current_user.id
     comment = CommentService.get_comment_or_404(content_id, comment_id)
-    user = db.session.get(User, user_id)
-    if not user:
-        abort(404, description="User not found")
-    if not CommentService.can_delete(comment, user):
+    if not CommentService.can_delete(comment, current_user):
         abort(403, description="You may not delete this comment")
     try:
         db.session.delete(comment)
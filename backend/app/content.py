@@ -1,11 +1,13 @@
 import logging
-from typing import Dict, Any, List
 from flask import Blueprint, request, jsonify, abort, current_app
-from flask_jwt_extended import jwt_required, get_jwt_identity
+from flask_jwt_extended import current_user, jwt_required, get_jwt_identity
 from marshmallow import Schema, fields, validate, ValidationError
+from sqlalchemy import insert, select
 from sqlalchemy.exc import SQLAlchemyError
 from . import db
 from .audit import audit
+from .cache import cached
+from .comments import _build_comment_tree
 from .models import(
     Category,
     Comment,
@@ -14,8 +16,8 @@ from .models import(
     ContentTypeEnum,
     Notification,
     Subscription,
-    User,
 )
+from .routing import replica_reads
 logger = logging.getLogger(__name__)
 content_bp = Blueprint("content", __name__, url_prefix="/content")
 class ContentSchema(Schema):
@@ -34,9 +36,8 @@ class ContentSchema(Schema):
 class CommentSchema(Schema):
     body = fields.Str(required=True)
     parent_id = fields.Int(load_default=None)
-def _require_writer_or_admin(user: User) -> None:
-    roles = {r.name for r in user.roles}
-    if "TechWriter" not in roles and "Admin" not in roles:
+def _require_writer_or_admin(user) -> None:
+    if not user.has_role("TechWriter", "Admin"):
         abort(403, description="Insufficient permissions")
 def _send_notifications(content: Content) -> None:
     subs = Subscription.query.filter_by(category_id=content.category_id).all()
@@ -47,6 +48,25 @@ def _send_notifications(content: Content) -> None:
             Notification(user_id=sub.user_id, content_id=content.id, message=message)
         )
     db.session.commit()
+def _fan_out_notifications(content_ids) -> int:
+    if not content_ids:
+        return 0
+    rows = db.session.execute(
+        select(Subscription.user_id, Content.id, Content.content_type, Content.title, Category.name)
+        .join(Category, Category.id == Content.category_id)
+        .join(Subscription, Subscription.category_id == Content.category_id)
+        .where(Content.id.in_(content_ids))
+    ).all()
+    if rows:
+        db.session.execute(insert(Notification), [
+            {
+                "user_id": user_id,
+                "content_id": content_id,
+                "message": f"New {content_type.value} in {category_name}: {title}",
+            }
+            for user_id, content_id, content_type, title, category_name in rows
+        ])
+    return len(rows)
 @content_bp.errorhandler(ValidationError)
 def handle_validation(err: ValidationError):
     return jsonify(errors=err.messages), 400
@@ -54,9 +74,8 @@ def handle_validation(err: ValidationError):
 @jwt_required()
 @audit("create_content", target_type="Content", target_id_arg="id")
 def create_content():
-    user_id = int(get_jwt_identity())
-    user = db.session.get(User, user_id) or abort(404, description="User not found")
-    _require_writer_or_admin(user)
+    user_id = current_user.id
+    _require_writer_or_admin(current_user)
     data = ContentSchema().load(request.get_json() or {})
     cat_id = data.get("category_id")
     if cat_id is not None and not db.session.get(Category, cat_id):
@@ -74,6 +93,7 @@ def create_content():
         _send_notifications(content)
     return jsonify(id=content.id), 201
 @content_bp.route("", methods=["GET"])
+@replica_reads
 def list_content():
     page = request.args.get("page", type=int, default=1)
     per_page = request.args.get(
@@ -97,6 +117,8 @@ def list_content():
     ]
     return jsonify(items), 200
 @content_bp.route("/<int:content_id>", methods=["GET"])
+@cached(ttl=300, tags=("content:{content_id}",))
+@replica_reads
 def get_content(content_id: int):
     content = db.session.get(Content, content_id) or abort(404, description="Content not found")
     return jsonify(
@@ -116,12 +138,8 @@ def get_content(content_id: int):
 @jwt_required()
 @audit("update_content", target_type="Content", target_id_arg="content_id")
 def update_content(content_id: int):
-    user_id = int(get_jwt_identity())
-    user = db.session.get(User, user_id) or abort(404, description="User not found")
     content = db.session.get(Content, content_id) or abort(404, description="Content not found")
-    is_author = content.author_id == user_id
-    is_admin = any(r.name == "Admin" for r in user.roles)
-    if not (is_author or is_admin):
+    if not (content.author_id == current_user.id or current_user.has_role("Admin")):
         abort(403, description="Insufficient permissions")
     data = ContentSchema().load(request.get_json() or {}, partial=True)
     if "category_id" in data and data["category_id"] is not None:
@@ -145,12 +163,8 @@ def update_content(content_id: int):
 @jwt_required()
 @audit("delete_content", target_type="Content", target_id_arg="content_id")
 def delete_content(content_id: int):
-    user_id = int(get_jwt_identity())
-    user = db.session.get(User, user_id) or abort(404, description="User not found")
     content = db.session.get(Content, content_id) or abort(404, description="Content not found")
-    is_author = content.author_id == user_id
-    is_admin = any(r.name == "Admin" for r in user.roles)
-    if not (is_author or is_admin):
+    if not (content.author_id == current_user.id or current_user.has_role("Admin")):
         abort(403, description="Insufficient permissions")
     db.session.delete(content)
     try:
@@ -183,27 +197,9 @@ def add_comment(content_id: int):
         return jsonify(error="Could not add comment."), 500
     return jsonify(id=comment.id), 201
 @content_bp.route("/<int:content_id>/comments", methods=["GET"])
+@replica_reads
 def list_comments(content_id: int):
     if not db.session.get(Content, content_id):
         abort(404, description="Content not found")
     comments = Comment.query.filter_by(content_id=content_id).order_by(Comment.created_at).all()
-    nodes: Dict[int, Dict[str, Any]] = {}
-    for c in comments:
-        nodes[c.id] = {
-            "id": c.id,
-            "body": c.body,
-            "user_id": c.user_id,
-            "parent_id": c.parent_id,
-            "created_at": c.created_at.isoformat(),
-            "replies": [],
-        }
-    tree: List[Dict[str, Any]] = []
-    for c in comments:
-        node = nodes[c.id]
-        if c.parent_id:
-            parent_node = nodes.get(c.parent_id)
-            if parent_node:
-                parent_node["replies"].append(node)
-        else:
-            tree.append(node)
-    return jsonify(tree), 200
\ No newline at end of file
+    return jsonify(_build_comment_tree(comments)), 200
\ No newline at end of file
@@ -0,0 +1,73 @@
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+import bcrypt as _bcrypt
+logger = logging.getLogger(__name__)
+class HashingBusy(Exception):
+    pass
+def _hash(password: bytes, rounds: int) -> bytes:
+    return _bcrypt.hashpw(password, _bcrypt.gensalt(rounds))
+def _check(password: bytes, pw_hash: bytes) -> bool:
+    return _bcrypt.checkpw(password, pw_hash)
+class PasswordHasher:
+    def __init__(self, app=None):
+        self.rounds = 12
+        self.queue_timeout = 5.0
+        self._executor = None
+        self._slots = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        self.shutdown()
+        self.rounds = int(app.config.get("BCRYPT_LOG_ROUNDS", 12))
+        self.queue_timeout = float(app.config.get("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
+        workers = int(app.config.get("PASSWORD_HASH_WORKERS", 4))
+        max_pending = int(app.config.get("PASSWORD_HASH_MAX_PENDING", workers * 16))
+        if app.config.get("PASSWORD_HASH_EXECUTOR", "thread") == "process":
+            self._executor = ProcessPoolExecutor(max_workers=workers)
+        else:
+            self._executor = ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="pw-hash"
+            )
+        self._slots = threading.BoundedSemaphore(max(max_pending, workers))
+        app.extensions["password_hasher"] = self
+    def shutdown(self, wait: bool = True):
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait)
+            self._executor = None
+    def _run(self, fn, *args):
+        if self._executor is None:
+            return fn(*args)
+        if not self._slots.acquire(timeout=self.queue_timeout):
+            logger.warning("Password hashing pool saturated; rejecting request")
+            raise HashingBusy()
+        try:
+            return self._executor.submit(fn, *args).result()
+        finally:
+            self._slots.release()
+    @staticmethod
+    def cost_of(pw_hash: str):
+        try:
+            return int(pw_hash.split("$")[2])
+        except (AttributeError, IndexError, ValueError):
+            return None
+    def is_usable(self, pw_hash: str) -> bool:
+        return self.cost_of(pw_hash) is not None
+    def generate(self, password: str) -> str:
+        return self._run(_hash, password.encode("utf-8"), self.rounds).decode("utf-8")
+    def check(self, pw_hash: str, password: str) -> bool:
+        if not self.is_usable(pw_hash):
+            return False
+        try:
+            return self._run(_check, password.encode("utf-8"), pw_hash.encode("utf-8"))
+        except ValueError:
+            logger.warning("Malformed password hash encountered")
+            return False
+    def needs_rehash(self, pw_hash: str) -> bool:
+        return self.cost_of(pw_hash) != self.rounds
+    def verify_and_update(self, user, password: str) -> bool:
+        if not self.check(user.password_hash, password):
+            return False
+        if self.needs_rehash(user.password_hash):
+            user.password_hash = self.generate(password)
+        return True
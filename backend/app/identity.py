@@ -0,0 +1,134 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import FrozenSet, NamedTuple, Optional
+from flask import current_app, has_app_context, jsonify
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from . import db
+from .models import Role, User, UserRole
+logger = logging.getLogger(__name__)
+class CurrentUser(NamedTuple):
+    id: int
+    email: str
+    name: Optional[str]
+    is_active: bool
+    role_names: FrozenSet[str]
+    def has_role(self, *names) -> bool:
+        return not self.role_names.isdisjoint(names)
+class DeferredIdentity:
+    __slots__ = ("_loader", "_user_id", "_identity")
+    def __init__(self, loader, user_id: int):
+        self._loader = loader
+        self._user_id = user_id
+        self._identity = None
+    @property
+    def id(self) -> int:
+        return self._user_id
+    def __getattr__(self, name):
+        if self._identity is None:
+            self._identity = self._loader.load(self._user_id)
+            if self._identity is None:
+                raise LookupError(f"User {self._user_id} no longer exists")
+        return getattr(self._identity, name)
+class IdentityCache:
+    def __init__(self, max_entries=10000):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    def get(self, user_id: int, ttl: float):
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > time.monotonic():
+                self._entries.move_to_end(user_id)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+            return None
+    def set(self, user_id: int, identity: CurrentUser, ttl: float) -> None:
+        with self._lock:
+            self._entries[user_id] = (time.monotonic() + ttl, identity)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+    def invalidate(self, *user_ids) -> None:
+        with self._lock:
+            for user_id in user_ids:
+                self._entries.pop(user_id, None)
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+def fetch_identity(user_id: int) -> Optional[CurrentUser]:
+    rows = (
+        db.session.query(User.id, User.email, User.name, User.is_active, Role.name)
+        .outerjoin(UserRole, UserRole.user_id == User.id)
+        .outerjoin(Role, Role.id == UserRole.role_id)
+        .filter(User.id == user_id)
+        .all()
+    )
+    if not rows:
+        return None
+    uid, email, name, is_active, _ = rows[0]
+    return CurrentUser(uid, email, name, is_active, frozenset(r[4] for r in rows if r[4]))
+class IdentityLoader:
+    def __init__(self, app=None, jwt=None):
+        self.cache = IdentityCache()
+        if app is not None:
+            self.init_app(app, jwt)
+    def init_app(self, app, jwt):
+        self.cache = IdentityCache(app.config.get("IDENTITY_CACHE_MAX_ENTRIES", 10000))
+        app.extensions["identity_loader"] = self
+        deactivated = app.extensions.get("user_deactivations")
+        if deactivated is not None:
+            deactivated.on_identity_change = self.cache.invalidate
+        jwt.user_lookup_loader(self._lookup)
+        jwt.user_lookup_error_loader(self._lookup_error)
+    def load(self, user_id: int) -> Optional[CurrentUser]:
+        ttl = current_app.config.get("IDENTITY_CACHE_TTL", 30)
+        if ttl:
+            identity = self.cache.get(user_id, ttl)
+            if identity is not None:
+                return identity
+        identity = fetch_identity(user_id)
+        if identity is not None and ttl:
+            self.cache.set(user_id, identity, ttl)
+        return identity
+    @staticmethod
+    def _lookup_error(jwt_header, jwt_payload):
+        return jsonify({"error": "User not found."}), 401
+    def _lookup(self, jwt_header, jwt_payload):
+        try:
+            user_id = int(jwt_payload["sub"])
+        except (KeyError, TypeError, ValueError):
+            return None
+        if jwt_payload.get("type") == "refresh":
+            return DeferredIdentity(self, user_id)
+        return self.load(user_id)
+identity_loader = IdentityLoader()
+def _affected_user_ids(session) -> set:
+    user_ids = set()
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, User):
+            user_ids.add(obj.id)
+        elif isinstance(obj, UserRole):
+            user_ids.add(obj.user_id)
+    return user_ids
+@event.listens_for(Session, "after_flush")
+def _collect_identity_changes(session, flush_context):
+    user_ids = _affected_user_ids(session)
+    if user_ids:
+        session.info.setdefault("identity_changes", set()).update(user_ids)
+@event.listens_for(Session, "after_commit")
+def _invalidate_identities(session):
+    user_ids = session.info.pop("identity_changes", None)
+    if user_ids:
+        identity_loader.cache.invalidate(*user_ids)
+        deactivated = current_app.extensions.get("user_deactivations") if has_app_context() else None
+        if deactivated is not None:
+            deactivated.publish_identity_change(user_ids)
+@event.listens_for(Session, "after_rollback")
+def _discard_identity_changes(session):
+    session.info.pop("identity_changes", None)
@@ -0,0 +1,270 @@
+import io
+import logging
+import time
+import xml.etree.ElementTree as ET
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+import click
+from flask import current_app
+from sqlalchemy import bindparam, update
+from sqlalchemy.dialects import postgresql, sqlite
+from . import db
+from .models import Content, ContentStatusEnum, ContentTypeEnum, FeedState, User
+from .moderation import content_deltas, counters
+from .upstream import upstream
+logger = logging.getLogger(__name__)
+class FeedError(Exception):
+    pass
+def _local(tag: str) -> str:
+    return tag.rsplit("}", 1)[-1]
+def _child(elem, name):
+    for child in elem:
+        if _local(child.tag) == name:
+            return child
+    return None
+def _text(elem, name):
+    child = _child(elem, name)
+    if child is None or child.text is None:
+        return None
+    return child.text.strip() or None
+def _parse_date(value):
+    if not value:
+        return None
+    try:
+        parsed = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+def _parse_rss_item(item) -> dict:
+    enclosure = _child(item, "enclosure")
+    link = _text(item, "link")
+    return {
+        "guid": _text(item, "guid") or link,
+        "title": _text(item, "title"),
+        "body": _text(item, "description") or _text(item, "encoded"),
+        "link": link,
+        "media_url": enclosure.get("url") if enclosure is not None else link,
+        "published_at": _parse_date(_text(item, "pubDate")),
+    }
+def _parse_atom_entry(entry) -> dict:
+    link = None
+    for child in entry:
+        if _local(child.tag) == "link" and child.get("rel", "alternate") == "alternate":
+            link = child.get("href")
+            break
+    body = _text(entry, "summary") or _text(entry, "content")
+    group = _child(entry, "group")
+    if body is None and group is not None:
+        body = _text(group, "description")
+    return {
+        "guid": _text(entry, "id") or link,
+        "title": _text(entry, "title"),
+        "body": body,
+        "link": link,
+        "media_url": link,
+        "published_at": _parse_date(_text(entry, "published") or _text(entry, "updated")),
+    }
+def parse_feed(source) -> list:
+    if isinstance(source, (bytes, bytearray)):
+        source = io.BytesIO(source)
+    items = []
+    kind = None
+    try:
+        for event, elem in ET.iterparse(source, events=("start", "end")):
+            if kind is None:
+                kind = _local(elem.tag)
+                if kind not in ("feed", "rss", "RDF"):
+                    raise FeedError(f"Unsupported feed type: {kind}")
+                continue
+            if event != "end":
+                continue
+            name = _local(elem.tag)
+            if name == "entry" and kind == "feed":
+                items.append(_parse_atom_entry(elem))
+                elem.clear()
+            elif name == "item" and kind != "feed":
+                items.append(_parse_rss_item(elem))
+                elem.clear()
+    except ET.ParseError as exc:
+        raise FeedError(f"Malformed feed: {exc}") from exc
+    return [item for item in items if item["guid"] and item["title"]]
+class FeedIngestor:
+    def __init__(self, app=None):
+        self._scheduler = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["feed_ingestor"] = self
+        @app.cli.command("ingest-feeds")
+        @click.option("--source", "sources", multiple=True, help="Only ingest the named source(s).")
+        def ingest_feeds_command(sources):
+            for name, result in self.ingest(names=sources or None).items():
+                if result["error"]:
+                    click.echo(f"{name}: failed ({result['error']})")
+                elif result["not_modified"]:
+                    click.echo(f"{name}: not modified")
+                else:
+                    click.echo(f"{name}: {result['items']} items")
+    def _fetch(self, source: dict, etag=None, last_modified=None):
+        headers = upstream.conditional_headers(etag, last_modified)
+        try:
+            response = upstream.get(source["url"], headers=headers, stream=True)
+        except Exception as exc:
+            raise FeedError(str(exc)) from exc
+        try:
+            validators = (response.headers.get("ETag"), response.headers.get("Last-Modified"))
+            if response.status_code == 304:
+                return None, (validators[0] or etag, validators[1] or last_modified)
+            response.raw.decode_content = True
+            return parse_feed(response.raw), validators
+        finally:
+            response.close()
+    def _save_state(self, url, validators, changed: bool) -> None:
+        state = FeedState.query.filter_by(url=url).first()
+        if state is None:
+            state = FeedState(url=url)
+            db.session.add(state)
+        now = datetime.utcnow()
+        state.etag, state.last_modified = validators
+        state.fetched_at = now
+        if changed:
+            state.changed_at = now
+        db.session.commit()
+    def _system_author_id(self) -> int:
+        email = current_app.config.get("FEED_SYSTEM_USER_EMAIL", "feeds@moringa-daily.dev")
+        user_id = db.session.query(User.id).filter_by(email=email).scalar()
+        if user_id is None:
+            user = User(email=email, name="Feed Bot", password_hash=None)
+            db.session.add(user)
+            db.session.commit()
+            user_id = user.id
+        return user_id
+    def _rows(self, source: dict, items: list, author_id: int) -> list:
+        content_type = ContentTypeEnum(source["content_type"])
+        status = ContentStatusEnum(current_app.config.get("FEED_INGEST_STATUS", "Published"))
+        now = datetime.utcnow()
+        rows = {}
+        for item in items:
+            rows[item["guid"][:512]] = {
+                "external_id": item["guid"][:512],
+                "title": item["title"][:256],
+                "body": item["body"] or "",
+                "media_url": (item["media_url"] or "")[:512] or None,
+                "content_type": content_type,
+                "status": status,
+                "author_id": author_id,
+                "category_id": source.get("category_id"),
+                "created_at": item["published_at"] or now,
+                "updated_at": now,
+            }
+        return list(rows.values())
+    def _upsert(self, rows: list) -> None:
+        dialect = db.engine.dialect.name
+        if dialect == "postgresql":
+            insert = postgresql.insert
+        elif dialect == "sqlite":
+            insert = sqlite.insert
+        else:
+            raise FeedError(f"Upsert not supported on {dialect}")
+        batch_size = current_app.config.get("FEED_INGEST_BATCH_SIZE", 500)
+        table = Content.__table__
+        refresh = (
+            update(table)
+            .where(table.c.external_id == bindparam("match_external_id"))
+            .values(
+                title=bindparam("new_title"),
+                body=bindparam("new_body"),
+                media_url=bindparam("new_media_url"),
+                updated_at=bindparam("new_updated_at"),
+            )
+        )
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            inserted = set(db.session.execute(
+                insert(table).values(batch)
+                .on_conflict_do_nothing(index_elements=[table.c.external_id])
+                .returning(table.c.external_id)
+            ).scalars())
+            counters.record(db.session, content_deltas(
+                (row["status"], row["content_type"], row["category_id"], row["author_id"])
+                for row in batch
+                if row["external_id"] in inserted
+            ))
+            stale = [
+                {
+                    "match_external_id": row["external_id"],
+                    "new_title": row["title"],
+                    "new_body": row["body"],
+                    "new_media_url": row["media_url"],
+                    "new_updated_at": row["updated_at"],
+                }
+                for row in batch
+                if row["external_id"] not in inserted
+            ]
+            if stale:
+                db.session.execute(refresh, stale)
+        db.session.commit()
+    def ingest(self, names=None) -> dict:
+        sources = [
+            s for s in current_app.config.get("FEED_SOURCES", [])
+            if names is None or s["name"] in names
+        ]
+        started = time.perf_counter()
+        results = {}
+        author_id = self._system_author_id()
+        workers = max(1, min(current_app.config.get("FEED_INGEST_WORKERS", 4), len(sources) or 1))
+        states = {
+            state.url: state
+            for state in FeedState.query.filter(FeedState.url.in_([s["url"] for s in sources]))
+        }
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="feed-ingest") as pool:
+            futures = []
+            for source in sources:
+                state = states.get(source["url"])
+                validators = (state.etag, state.last_modified) if state else (None, None)
+                futures.append((source, pool.submit(self._fetch, source, *validators)))
+            for source, future in futures:
+                try:
+                    items, validators = future.result()
+                    if items is None:
+                        results[source["name"]] = {"items": 0, "error": None, "not_modified": True}
+                        self._save_state(source["url"], validators, changed=False)
+                        continue
+                    rows = self._rows(source, items, author_id)
+                    self._upsert(rows)
+                    self._save_state(source["url"], validators, changed=True)
+                    results[source["name"]] = {"items": len(rows), "error": None, "not_modified": False}
+                except Exception as exc:
+                    db.session.rollback()
+                    logger.warning("Feed %s failed: %s", source["name"], exc)
+                    results[source["name"]] = {"items": 0, "error": str(exc), "not_modified": False}
+        logger.info(
+            "Ingested %s feed items from %s sources in %.3fs",
+            sum(r["items"] for r in results.values()), len(sources), time.perf_counter() - started,
+        )
+        return results
+    def start_scheduler(self, app, interval_minutes: int) -> None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        def run():
+            with app.app_context():
+                try:
+                    self.ingest()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Scheduled feed ingestion failed")
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(
+            run, "interval", minutes=interval_minutes, id="feed_ingest", max_instances=1, coalesce=True
+        )
+        self._scheduler.start()
+    def shutdown(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+ingestor = FeedIngestor()
@@ -0,0 +1,65 @@
+import logging
+import threading
+from flask import current_app
+logger = logging.getLogger(__name__)
+OAUTH_PROVIDERS = {
+    "github": {
+        "config_prefix": "GITHUB",
+        "access_token_url": "https://github.com/login/oauth/access_token",
+        "authorize_url": "https://github.com/login/oauth/authorize",
+        "api_base_url": "https://api.github.com/",
+        "client_kwargs": {"scope": "user:email"},
+    },
+    "google": {
+        "config_prefix": "GOOGLE",
+        "access_token_url": "https://oauth2.googleapis.com/token",
+        "authorize_url": "https://accounts.google.com/o/oauth2/auth",
+        "api_base_url": "https://www.googleapis.com/oauth2/v1/",
+        "client_kwargs": {"scope": "openid email profile"},
+    },
+}
+class ProviderNotConfigured(Exception):
+    def __init__(self, provider: str):
+        super().__init__(provider)
+        self.provider = provider
+class LazyOAuth:
+    def __init__(self, app=None):
+        self._lock = threading.Lock()
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["lazy_oauth"] = self
+    def _registry(self):
+        app = current_app._get_current_object()
+        registry = app.extensions.get("authlib.integrations.flask_client")
+        if registry is not None:
+            return registry
+        with self._lock:
+            registry = app.extensions.get("authlib.integrations.flask_client")
+            if registry is None:
+                from authlib.integrations.flask_client import OAuth
+                registry = OAuth(app)
+                for name, options in OAUTH_PROVIDERS.items():
+                    options = dict(options)
+                    prefix = options.pop("config_prefix")
+                    client_id = app.config.get(f"{prefix}_CLIENT_ID")
+                    client_secret = app.config.get(f"{prefix}_CLIENT_SECRET")
+                    if client_id and client_secret:
+                        registry.register(name=name, client_id=client_id, client_secret=client_secret, **options)
+                    else:
+                        logger.info("OAuth provider %s has no credentials; not registered", name)
+        return registry
+    def __getattr__(self, name):
+        if name.startswith("_"):
+            raise AttributeError(name)
+        client = self._registry().create_client(name)
+        if client is None:
+            raise ProviderNotConfigured(name)
+        return client
+def get_mail():
+    app = current_app._get_current_object()
+    state = app.extensions.get("mail")
+    if state is None:
+        from flask_mail import Mail
+        state = Mail(app).state
+    return state
@@ -0,0 +1,45 @@
+import logging
+from . import db, hasher
+logger = logging.getLogger(__name__)
+def after_fork(app) -> None:
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+    hasher.init_app(app)
+    from .cache import cache
+    cache.after_fork()
+    from .metrics import metrics
+    metrics.after_fork()
+    from .upstream import upstream
+    upstream.init_app(app)
+    deactivated = app.extensions.get("user_deactivations")
+    if deactivated is not None:
+        deactivated.after_fork()
+    if app.config.get("SCHEDULER_ENABLED") and not app.config.get("TESTING"):
+        from .scheduling import job_runner
+        job_runner.start(app)
+def shutdown(app) -> None:
+    from .audit import audit_writer
+    from .cache import cache
+    from .metrics import metrics
+    from .scheduling import job_runner
+    from .upstream import upstream
+    try:
+        audit_writer.shutdown()
+    except Exception:
+        logger.exception("Failed to flush audit queue on shutdown")
+    job_runner.shutdown()
+    cache.shutdown()
+    if upstream.cache is not None:
+        upstream.cache.shutdown()
+    if upstream.executor is not None:
+        upstream.executor.shutdown(wait=False)
+    hasher.shutdown(wait=False)
+    deactivated = app.extensions.get("user_deactivations")
+    if deactivated is not None:
+        deactivated.shutdown()
+    metrics.shutdown()
+    with app.app_context():
+        db.session.remove()
+        for engine in db.engines.values():
+            engine.dispose()
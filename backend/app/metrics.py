@@ -0,0 +1,298 @@
+import hmac
+import json
+import logging
+import os
+import threading
+import time
+import weakref
+from bisect import bisect_left
+from flask import Response, current_app, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+logger = logging.getLogger(__name__)
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.075, 0.1, 0.25, 0.5, 0.75, 1.0, 2.5, 5.0, 7.5, 10.0)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+class Shard:
+    __slots__ = ("latency", "statuses", "db", "queries", "db_seconds", "started", "mark", "query_started", "__weakref__")
+    def __init__(self):
+        self.latency = {}
+        self.statuses = {}
+        self.db = {}
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.started = None
+        self.mark = (0, 0.0)
+        self.query_started = 0.0
+    def merge(self, other) -> None:
+        for key, hist in list(other.latency.items()):
+            mine = self.latency.setdefault(key, [0] * len(hist[:-1]) + [0.0])
+            for i, value in enumerate(hist):
+                mine[i] += value
+        for key, count in list(other.statuses.items()):
+            self.statuses[key] = self.statuses.get(key, 0) + count
+        for key, (queries, seconds) in list(other.db.items()):
+            mine = self.db.setdefault(key, [0, 0.0])
+            mine[0] += queries
+            mine[1] += seconds
+class _Owner:
+    __slots__ = ("shard", "__weakref__")
+    def __init__(self, shard):
+        self.shard = shard
+class Metrics:
+    def __init__(self, app=None):
+        self._local = threading.local()
+        self._lock = threading.RLock()
+        self._shards = set()
+        self._retired = Shard()
+        self._gauges = []
+        self._multiproc_dir = None
+        self._instance = str(os.getpid())
+        self._flush_seconds = 5.0
+        self._flusher = None
+        self._stop = threading.Event()
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["metrics"] = self
+        self._gauges = []
+        if not app.config.get("METRICS_ENABLED", True):
+            return
+        self._multiproc_dir = app.config.get("METRICS_MULTIPROC_DIR")
+        self._flush_seconds = float(app.config.get("METRICS_FLUSH_SECONDS", 5))
+        if self._multiproc_dir:
+            os.makedirs(self._multiproc_dir, exist_ok=True)
+        app.before_request(self._start)
+        app.after_request(self._record)
+        app.add_url_rule("/metrics", "metrics", self._export)
+        self._register_default_gauges(app)
+    def _shard(self) -> Shard:
+        try:
+            return self._local.owner.shard
+        except AttributeError:
+            shard = Shard()
+            owner = _Owner(shard)
+            with self._lock:
+                self._shards.add(shard)
+            weakref.finalize(owner, self._retire, shard)
+            self._local.owner = owner
+            return shard
+    def _retire(self, shard) -> None:
+        with self._lock:
+            if shard in self._shards:
+                self._shards.remove(shard)
+                self._retired.merge(shard)
+    def _start(self):
+        shard = self._shard()
+        shard.mark = (shard.queries, shard.db_seconds)
+        shard.started = time.perf_counter()
+    def _record(self, response):
+        shard = self._shard()
+        if shard.started is None:
+            return response
+        elapsed = time.perf_counter() - shard.started
+        shard.started = None
+        req = request._get_current_object()
+        rule = req.url_rule
+        key = (req.method, rule.rule if rule is not None else "<unmatched>")
+        hist = shard.latency.get(key)
+        if hist is None:
+            hist = shard.latency[key] = [0] * (len(BUCKETS) + 1) + [0.0]
+        hist[bisect_left(BUCKETS, elapsed)] += 1
+        hist[-1] += elapsed
+        status_key = key + (response.status_code,)
+        shard.statuses[status_key] = shard.statuses.get(status_key, 0) + 1
+        queries = shard.queries - shard.mark[0]
+        if queries:
+            db = shard.db.get(key)
+            if db is None:
+                db = shard.db[key] = [0, 0.0]
+            db[0] += queries
+            db[1] += shard.db_seconds - shard.mark[1]
+        return response
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        self._shard().query_started = time.perf_counter()
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        shard = self._shard()
+        shard.queries += 1
+        shard.db_seconds += time.perf_counter() - shard.query_started
+    def gauge(self, name: str, help_text: str, collect) -> None:
+        self._gauges.append((name, help_text, collect))
+    def _register_default_gauges(self, app):
+        extensions = app.extensions
+        def audit_queue():
+            writer = extensions.get("audit_writer")
+            return {(): writer.depth()} if writer is not None else {}
+        def audit_records():
+            writer = extensions.get("audit_writer")
+            if writer is None:
+                return {}
+            return {(("outcome", "written"),): writer.written, (("outcome", "failed"),): writer.failed}
+        def cache_lookups():
+            cache = extensions.get("cache")
+            if cache is None:
+                return {}
+            counts = cache.stats.as_dict()
+            return {(("result", field),): counts[field] for field in ("local_hits", "shared_hits", "misses")}
+        def identity_lookups():
+            loader = extensions.get("identity_loader")
+            if loader is None:
+                return {}
+            return {(("result", "hit"),): loader.cache.hits, (("result", "miss"),): loader.cache.misses}
+        def upstream_lookups():
+            upstream = extensions.get("upstream")
+            if upstream is None or upstream.cache is None:
+                return {}
+            return {(("result", field),): value for field, value in upstream.cache.stats.items()}
+        def sweeper_rows_removed():
+            sweeper = extensions.get("token_sweeper")
+            if sweeper is None:
+                return {}
+            return {(("table", table),): count for table, count in sweeper.stats.as_dict()["total_removed"].items()}
+        self.gauge("audit_queue_depth", "Audit records waiting to be written.", audit_queue)
+        self.gauge("audit_records", "Audit records processed by the background writer.", audit_records)
+        self.gauge("cache_lookups", "Response cache lookups by result.", cache_lookups)
+        self.gauge("identity_cache_lookups", "JWT identity cache lookups by result.", identity_lookups)
+        self.gauge("upstream_cache_lookups", "Upstream proxy cache lookups by result.", upstream_lookups)
+        self.gauge("sweeper_rows_removed", "Expired token and OTP rows removed by the sweeper.", sweeper_rows_removed)
+    def snapshot(self) -> dict:
+        with self._lock:
+            shards = list(self._shards)
+            total = Shard()
+            total.merge(self._retired)
+        for shard in shards:
+            total.merge(shard)
+        gauges = {}
+        for name, _, collect in self._gauges:
+            try:
+                gauges[name] = [[list(map(list, labels)), value] for labels, value in collect().items()]
+            except Exception:
+                logger.exception("Metrics gauge %s failed", name)
+        return {
+            "pid": os.getpid(),
+            "latency": [list(key) + hist for key, hist in total.latency.items()],
+            "statuses": [list(key) + [count] for key, count in total.statuses.items()],
+            "db": [list(key) + values for key, values in total.db.items()],
+            "gauges": gauges,
+        }
+    def flush(self) -> None:
+        if not self._multiproc_dir:
+            return
+        path = os.path.join(self._multiproc_dir, f"metrics-{self._instance}.json")
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as fh:
+            json.dump(self.snapshot(), fh)
+        os.replace(tmp, path)
+    def _collect(self) -> list:
+        own = self.snapshot()
+        if not self._multiproc_dir:
+            return [own]
+        snapshots = [own]
+        for name in os.listdir(self._multiproc_dir):
+            if not name.startswith("metrics-") or not name.endswith(".json") or name == f"metrics-{self._instance}.json":
+                continue
+            try:
+                with open(os.path.join(self._multiproc_dir, name)) as fh:
+                    snapshot = json.load(fh)
+            except (OSError, ValueError):
+                continue
+            if not _alive(snapshot["pid"]):
+                snapshot["gauges"] = {}
+            snapshots.append(snapshot)
+        return snapshots
+    def render(self) -> str:
+        latency, statuses, db, gauges = {}, {}, {}, {}
+        for snapshot in self._collect():
+            for method, route, *hist in snapshot["latency"]:
+                mine = latency.setdefault((method, route), [0] * (len(hist) - 1) + [0.0])
+                for i, value in enumerate(hist):
+                    mine[i] += value
+            for method, route, status, count in snapshot["statuses"]:
+                statuses[(method, route, status)] = statuses.get((method, route, status), 0) + count
+            for method, route, queries, seconds in snapshot["db"]:
+                mine = db.setdefault((method, route), [0, 0.0])
+                mine[0] += queries
+                mine[1] += seconds
+            for name, samples in snapshot["gauges"].items():
+                series = gauges.setdefault(name, {})
+                for labels, value in samples:
+                    key = tuple(map(tuple, labels))
+                    series[key] = series.get(key, 0) + value
+        lines = [
+            "# HELP http_request_duration_seconds Request latency by route.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route), hist in sorted(latency.items()):
+            labels = f'method="{method}",route="{_escape(route)}"'
+            cumulative = 0
+            for bound, count in zip(BUCKETS + (float("inf"),), hist):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'http_request_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"http_request_duration_seconds_sum{{{labels}}} {hist[-1]}")
+            lines.append(f"http_request_duration_seconds_count{{{labels}}} {cumulative}")
+        lines += ["# HELP http_requests_total Responses by route and status.", "# TYPE http_requests_total counter"]
+        for (method, route, status), count in sorted(statuses.items()):
+            lines.append(f'http_requests_total{{method="{method}",route="{_escape(route)}",status="{status}"}} {count}')
+        lines += ["# HELP http_db_queries_total Database statements issued while serving a route.", "# TYPE http_db_queries_total counter"]
+        for (method, route), (queries, _) in sorted(db.items()):
+            lines.append(f'http_db_queries_total{{method="{method}",route="{_escape(route)}"}} {queries}')
+        lines += ["# HELP http_db_seconds_total Time spent in database statements per route.", "# TYPE http_db_seconds_total counter"]
+        for (method, route), (_, seconds) in sorted(db.items()):
+            lines.append(f'http_db_seconds_total{{method="{method}",route="{_escape(route)}"}} {seconds}')
+        for name, help_text, _ in self._gauges:
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} gauge"]
+            for labels, value in sorted(gauges.get(name, {}).items()):
+                rendered = ",".join(f'{key}="{_escape(str(val))}"' for key, val in labels)
+                lines.append(f"{name}{{{rendered}}} {value}" if rendered else f"{name} {value}")
+        return "\n".join(lines) + "\n"
+    def _export(self):
+        token = current_app.config.get("METRICS_TOKEN")
+        if token:
+            supplied = request.headers.get("Authorization", "")
+            if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                return Response("unauthorized\n", status=401, mimetype="text/plain")
+        return Response(self.render(), content_type=CONTENT_TYPE)
+    def _run_flusher(self) -> None:
+        while not self._stop.wait(self._flush_seconds):
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Failed to write metrics snapshot")
+    def after_fork(self) -> None:
+        self._instance = f"{os.getpid()}-{time.time_ns()}"
+        self.reset()
+        if self._multiproc_dir:
+            self._stop = threading.Event()
+            self._flusher = threading.Thread(target=self._run_flusher, name="metrics-flush", daemon=True)
+            self._flusher.start()
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._multiproc_dir:
+            try:
+                self.flush()
+            except OSError:
+                logger.exception("Failed to write final metrics snapshot")
+    def reset(self) -> None:
+        with self._lock:
+            self._shards = set()
+            self._retired = Shard()
+            self._local = threading.local()
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+def clear_multiproc_dir(path: str) -> None:
+    if not path or not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        if name.startswith("metrics-"):
+            os.remove(os.path.join(path, name))
+metrics = Metrics()
+event.listen(Engine, "before_cursor_execute", metrics._before_cursor_execute)
+event.listen(Engine, "after_cursor_execute", metrics._after_cursor_execute)
@@ -1,3 +1,4 @@
+from datetime import datetime
 from enum import Enum as PyEnum
 from flask import current_app
 from sqlalchemy import event, text, Index, func
@@ -35,7 +36,7 @@ class User(db.Model):
     email = db.Column(db.String(128), unique=True, nullable=False)
     phone_number = db.Column(db.String(20), unique=True, nullable=True)
     name = db.Column(db.String(128), nullable=False)
-    password_hash = db.Column(db.String(256), nullable=False)
+    password_hash = db.Column(db.String(256), nullable=True)
     is_active = db.Column(db.Boolean, default=True, nullable=False)
     created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     updated_at = db.Column(
@@ -51,6 +52,9 @@ class User(db.Model):
     refresh_tokens = db.relationship(
         "RefreshToken", back_populates="user", cascade="all, delete-orphan"
     )
+    identities = db.relationship(
+        "FederatedIdentity", back_populates="user", cascade="all, delete-orphan"
+    )
     subscriptions = db.relationship(
         "Subscription", back_populates="user", cascade="all, delete-orphan"
     )
@@ -68,6 +72,22 @@ class User(db.Model):
     )
     def _repr_(self):
         return f"<User id={self.id} email={self.email} name={self.name}>"
+class FederatedIdentity(db.Model):
+    __tablename__ = "federated_identities"
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(
+        db.Integer, db.ForeignKey("users.id", ondelete="CASCADE"), nullable=False
+    )
+    provider = db.Column(db.String(32), nullable=False)
+    subject = db.Column(db.String(255), nullable=False)
+    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    __table_args__ = (
+        db.UniqueConstraint("provider", "subject", name="uq_federated_identity"),
+        Index("ix_federated_identities_user_id", "user_id"),
+    )
+    user = db.relationship("User", back_populates="identities")
+    def __repr__(self):
+        return f"<FederatedIdentity provider={self.provider} user_id={self.user_id}>"
 class AuditLog(db.Model):
     __tablename__ = "audit_logs"
     id = db.Column(db.Integer, primary_key=True)
@@ -79,6 +99,12 @@ class AuditLog(db.Model):
     target_id = db.Column(db.Integer, nullable=True)
     timestamp = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     details = db.Column(db.JSON, nullable=True)
+    __table_args__ = (
+        Index("ix_audit_logs_user_id_id", "user_id", "id"),
+        Index("ix_audit_logs_target_type_target_id_id", "target_type", "target_id", "id"),
+        Index("ix_audit_logs_action_timestamp", "action", "timestamp"),
+        Index("ix_audit_logs_timestamp", "timestamp"),
+    )
     def __repr__(self):
         return f"<AuditLog id={self.id} action={self.action} user_id={self.user_id}>"
 class UserProfile(db.Model):
@@ -189,6 +215,7 @@ class Content(db.Model):
     title = db.Column(db.String(256), nullable=False)
     body = db.Column(db.Text)
     media_url = db.Column(db.String(512))
+    external_id = db.Column(db.String(512), nullable=True, unique=True)
     content_type = db.Column(db.Enum(ContentTypeEnum), nullable=False)
     status = db.Column(
         db.Enum(ContentStatusEnum),
@@ -201,10 +228,11 @@ class Content(db.Model):
     category_id = db.Column(
         db.Integer, db.ForeignKey("categories.id", ondelete="SET NULL")
     )
-    created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow, server_default=func.now(), nullable=False)
     updated_at = db.Column(
         db.DateTime, server_default=func.now(), onupdate=func.now(), nullable=False
     )
+    flag_count = db.Column(db.Integer, default=0, server_default="0", nullable=False)
     author = db.relationship("User", backref="contents")
     category = db.relationship("Category", back_populates="contents")
     history = db.relationship(
@@ -347,6 +375,9 @@ class Flag(db.Model):
     created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     user = db.relationship("User", backref="flags")
     content = db.relationship("Content", back_populates="flags")
+    __table_args__ = (
+        Index("ix_flags_content_id_id", "content_id", "id"),
+    )
     def __repr__(self):
         return f"<Flag id={self.id} reason={self.reason}>"
 class Notification(db.Model):
@@ -374,6 +405,7 @@ class RefreshToken(db.Model):
     token = db.Column(db.String(36), unique=True, nullable=False)
     expires_at = db.Column(db.DateTime, nullable=False)
     revoked = db.Column(db.Boolean, default=False)
+    revoked_at = db.Column(db.DateTime)
     created_at = db.Column(db.DateTime, server_default=func.now(), nullable=False)
     user = db.relationship("User", back_populates="refresh_tokens")
     def __repr__(self):
@@ -413,6 +445,35 @@ class EmailVerificationToken(db.Model):
     user = db.relationship("User", backref="email_verification_tokens")
     def __repr__(self):
         return f"<EmailVerificationToken id={self.id} user_id={self.user_id}>"
+class FeedState(db.Model):
+    __tablename__ = "feed_states"
+    id = db.Column(db.Integer, primary_key=True)
+    url = db.Column(db.String(1024), unique=True, nullable=False)
+    etag = db.Column(db.String(512), nullable=True)
+    last_modified = db.Column(db.String(64), nullable=True)
+    fetched_at = db.Column(db.DateTime, nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=True)
+    def __repr__(self):
+        return f"<FeedState id={self.id} url={self.url}>"
+class ContentCounter(db.Model):
+    __tablename__ = "content_counters"
+    author_id = db.Column(db.Integer, primary_key=True, default=0, server_default="0")
+    dimension = db.Column(db.String(16), primary_key=True)
+    key = db.Column(db.String(64), primary_key=True)
+    shard = db.Column(db.SmallInteger, primary_key=True, default=0)
+    count = db.Column(db.BigInteger, default=0, server_default="0", nullable=False)
+    def __repr__(self):
+        return f"<ContentCounter {self.author_id}:{self.dimension}:{self.key}[{self.shard}]={self.count}>"
+Index("ix_contents_status_created_at_id", Content.status, Content.created_at, Content.id)
+Index("ix_contents_author_id_status", Content.author_id, Content.status)
+Index("ix_comments_content_id", Comment.content_id)
+Index("ix_reactions_content_id_type", Reaction.content_id, Reaction.type)
 Index("ix_refresh_token_token", RefreshToken.token)
 Index("ix_password_reset_token_token", PasswordResetToken.token)
-Index("ix_email_verification_token_token", EmailVerificationToken.token)
\ No newline at end of file
+Index("ix_email_verification_token_token", EmailVerificationToken.token)
+Index("ix_refresh_token_expires_at", RefreshToken.expires_at)
+Index("ix_refresh_token_revoked_at", RefreshToken.revoked_at)
+Index("ix_password_reset_token_expires_at", PasswordResetToken.expires_at)
+Index("ix_email_verification_token_expires_at", EmailVerificationToken.expires_at)
+Index("ix_phone_otp_expires_at", PhoneOTP.expires_at)
+Index("ix_phone_otp_phone_number_expires_at", PhoneOTP.phone_number, PhoneOTP.expires_at)
\ No newline at end of file
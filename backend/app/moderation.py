@@ -0,0 +1,279 @@
+import logging
+import random
+from datetime import datetime
+from enum import Enum
+import click
+from flask import Blueprint, current_app, jsonify, request
+from flask_jwt_extended import current_user, jwt_required
+from sqlalchemy import and_, delete, event, func, inspect, or_, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from . import db
+from .models import Comment, Content, ContentCounter, ContentStatusEnum, Flag, Reaction
+from .routing import replica_reads
+from .utils import roles_required
+logger = logging.getLogger(__name__)
+moderation_bp = Blueprint("moderation", __name__, url_prefix="/content")
+PENDING_STATUSES = (ContentStatusEnum.Draft, ContentStatusEnum.Pending)
+QUEUES = {
+    "flagged": (ContentStatusEnum.Flagged,),
+    "pending": PENDING_STATUSES,
+}
+CONTENT_DIMENSIONS = (("status", "status"), ("type", "content_type"), ("category", "category_id"))
+SITE = 0
+def _key(value) -> str:
+    if value is None:
+        return "none"
+    return value.value if isinstance(value, Enum) else str(value)
+def add_delta(deltas, dimension, value, amount, author_id=None) -> None:
+    for scope in (SITE, author_id) if author_id else (SITE,):
+        key = (scope, dimension, _key(value))
+        deltas[key] = deltas.get(key, 0) + amount
+def content_deltas(rows, sign=1, deltas=None) -> dict:
+    deltas = {} if deltas is None else deltas
+    for status, content_type, category_id, author_id in rows:
+        add_delta(deltas, "status", status, sign, author_id)
+        add_delta(deltas, "type", content_type, sign, author_id)
+        add_delta(deltas, "category", category_id, sign, author_id)
+    return deltas
+def _original(obj, attr):
+    history = inspect(obj).attrs[attr].history
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, attr)
+class ContentCounters:
+    def __init__(self, app=None):
+        self.shards = 8
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["content_counters"] = self
+        self.shards = max(1, app.config.get("CONTENT_COUNTER_SHARDS", 8))
+        @app.cli.command("rebuild-counters")
+        def rebuild_counters_command():
+            with db.engine.begin() as conn:
+                totals = self.rebuild(conn)
+            for (author_id, dimension, key), count in sorted(totals.items()):
+                if author_id == SITE:
+                    click.echo(f"{dimension:10} {key:24} {count:>10}")
+    def record(self, session, deltas) -> None:
+        pending = session.info.setdefault("counter_deltas", {})
+        for key, amount in deltas.items():
+            pending[key] = pending.get(key, 0) + amount
+    def apply(self, conn, deltas) -> None:
+        shard = random.randrange(self.shards)
+        rows = [
+            {"author_id": author_id, "dimension": dimension, "key": key, "shard": shard, "count": amount}
+            for (author_id, dimension, key), amount in sorted(deltas.items())
+            if amount
+        ]
+        if not rows:
+            return
+        table = ContentCounter.__table__
+        dialect = conn.dialect.name
+        if dialect in ("postgresql", "sqlite"):
+            insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+            stmt = insert(table)
+            stmt = stmt.on_conflict_do_update(
+                index_elements=[table.c.author_id, table.c.dimension, table.c.key, table.c.shard],
+                set_={"count": table.c.count + stmt.excluded["count"]},
+            )
+            conn.execute(stmt, rows)
+            return
+        for row in rows:
+            updated = conn.execute(
+                update(table)
+                .where(
+                    table.c.author_id == row["author_id"],
+                    table.c.dimension == row["dimension"],
+                    table.c.key == row["key"],
+                    table.c.shard == shard,
+                )
+                .values(count=table.c.count + row["count"])
+            ).rowcount
+            if not updated:
+                conn.execute(table.insert().values(**row))
+    def rebuild(self, conn) -> dict:
+        totals = {}
+        for dimension, attr in CONTENT_DIMENSIONS:
+            column = getattr(Content, attr)
+            for author_id, value, count in conn.execute(
+                select(Content.author_id, column, func.count()).group_by(Content.author_id, column)
+            ):
+                add_delta(totals, dimension, value, count, author_id)
+        for author_id, value, count in conn.execute(
+            select(Content.author_id, Reaction.type, func.count())
+            .select_from(Reaction)
+            .join(Content, Content.id == Reaction.content_id)
+            .group_by(Content.author_id, Reaction.type)
+        ):
+            add_delta(totals, "reactions", value, count, author_id)
+        for author_id, count in conn.execute(
+            select(Content.author_id, func.count())
+            .select_from(Comment)
+            .join(Content, Content.id == Comment.content_id)
+            .group_by(Content.author_id)
+        ):
+            add_delta(totals, "comments", "all", count, author_id)
+        flags = select(func.count()).where(Flag.content_id == Content.id).scalar_subquery()
+        conn.execute(update(Content.__table__).values(flag_count=flags))
+        conn.execute(delete(ContentCounter.__table__))
+        rows = [
+            {"author_id": author_id, "dimension": dimension, "key": key, "shard": 0, "count": count}
+            for (author_id, dimension, key), count in totals.items()
+        ]
+        if rows:
+            conn.execute(ContentCounter.__table__.insert(), rows)
+        return totals
+    def totals(self, author_id=SITE) -> dict:
+        rows = db.session.execute(
+            select(ContentCounter.dimension, ContentCounter.key, func.sum(ContentCounter.count))
+            .where(ContentCounter.author_id == author_id)
+            .group_by(ContentCounter.dimension, ContentCounter.key)
+        )
+        return {(dimension, key): int(count) for dimension, key, count in rows}
+counters = ContentCounters()
+def _content_authors(session, content_ids) -> dict:
+    authors = dict(session.connection().execute(
+        select(Content.id, Content.author_id).where(Content.id.in_(content_ids))
+    ).all())
+    for obj in session.deleted:
+        if isinstance(obj, Content) and obj.id in content_ids:
+            authors[obj.id] = _original(obj, "author_id")
+    return authors
+@event.listens_for(Session, "after_flush")
+def _collect_counter_deltas(session, flush_context):
+    deltas = {}
+    children = [
+        obj for obj in list(session.new) + list(session.deleted) + list(session.dirty)
+        if isinstance(obj, (Comment, Reaction))
+    ]
+    authors = _content_authors(session, {obj.content_id for obj in children}) if children else {}
+    for obj in session.new:
+        if isinstance(obj, Content):
+            content_deltas([(obj.status, obj.content_type, obj.category_id, obj.author_id)], 1, deltas)
+        elif isinstance(obj, Comment):
+            add_delta(deltas, "comments", "all", 1, authors.get(obj.content_id))
+        elif isinstance(obj, Reaction):
+            add_delta(deltas, "reactions", obj.type, 1, authors.get(obj.content_id))
+    for obj in session.deleted:
+        if isinstance(obj, Content):
+            original = tuple(_original(obj, attr) for _, attr in CONTENT_DIMENSIONS)
+            content_deltas([original + (_original(obj, "author_id"),)], -1, deltas)
+        elif isinstance(obj, Comment):
+            add_delta(deltas, "comments", "all", -1, authors.get(_original(obj, "content_id")))
+        elif isinstance(obj, Reaction):
+            add_delta(deltas, "reactions", _original(obj, "type"), -1, authors.get(_original(obj, "content_id")))
+    for obj in session.dirty:
+        if isinstance(obj, Content):
+            state = inspect(obj)
+            if state.attrs["author_id"].history.has_changes():
+                original = tuple(_original(obj, attr) for _, attr in CONTENT_DIMENSIONS)
+                content_deltas([original + (_original(obj, "author_id"),)], -1, deltas)
+                content_deltas([(obj.status, obj.content_type, obj.category_id, obj.author_id)], 1, deltas)
+                continue
+            for dimension, attr in CONTENT_DIMENSIONS:
+                history = state.attrs[attr].history
+                if history.deleted and history.added:
+                    add_delta(deltas, dimension, history.deleted[0], -1, obj.author_id)
+                    add_delta(deltas, dimension, history.added[0], 1, obj.author_id)
+        elif isinstance(obj, Reaction):
+            history = inspect(obj).attrs["type"].history
+            if history.deleted and history.added:
+                add_delta(deltas, "reactions", history.deleted[0], -1, authors.get(obj.content_id))
+                add_delta(deltas, "reactions", history.added[0], 1, authors.get(obj.content_id))
+    if deltas:
+        counters.record(session, deltas)
+@event.listens_for(Session, "before_commit")
+def _apply_counter_deltas(session):
+    session.flush()
+    deltas = session.info.pop("counter_deltas", None)
+    if deltas:
+        counters.apply(session.connection(), deltas)
+@event.listens_for(Session, "after_rollback")
+def _discard_counter_deltas(session):
+    session.info.pop("counter_deltas", None)
+def _parse_cursor(raw):
+    created_at, _, content_id = raw.partition("|")
+    return datetime.fromisoformat(created_at), int(content_id)
+@moderation_bp.route("/flagged", methods=["GET"])
+@jwt_required()
+@roles_required("Admin", "TechWriter")
+@replica_reads
+def moderation_queue():
+    queue = request.args.get("queue", "flagged")
+    if queue not in QUEUES:
+        return jsonify({"error": f"queue must be one of {', '.join(QUEUES)}."}), 400
+    limit = request.args.get("limit", type=int, default=current_app.config.get("MODERATION_PER_PAGE", 20))
+    limit = max(1, min(limit, current_app.config.get("MAX_MODERATION_PER_PAGE", 100)))
+    q = (
+        select(
+            Content.id, Content.title, Content.content_type, Content.status, Content.flag_count,
+            Content.author_id, Content.category_id, Content.created_at,
+        )
+        .where(Content.status.in_(QUEUES[queue]))
+        .order_by(Content.created_at.desc(), Content.id.desc())
+        .limit(limit + 1)
+    )
+    if not current_user.has_role("Admin"):
+        q = q.where(Content.author_id == current_user.id)
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            created_at, content_id = _parse_cursor(cursor)
+        except ValueError:
+            return jsonify({"error": "Invalid cursor."}), 400
+        q = q.where(or_(
+            Content.created_at < created_at,
+            and_(Content.created_at == created_at, Content.id < content_id),
+        ))
+    rows = db.session.execute(q).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    reasons = dict(db.session.execute(
+        select(Flag.content_id, Flag.reason)
+        .where(Flag.content_id.in_([row.id for row in rows]))
+        .order_by(Flag.id)
+    ).all()) if rows else {}
+    items = [
+        {
+            "id": row.id,
+            "title": row.title,
+            "type": row.content_type.value,
+            "status": row.status.value,
+            "reason": reasons.get(row.id),
+            "flag_count": row.flag_count,
+            "author_id": row.author_id,
+            "category_id": row.category_id,
+            "created_at": row.created_at.isoformat(),
+        }
+        for row in rows
+    ]
+    last = rows[-1] if rows else None
+    return jsonify({
+        "items": items,
+        "next_cursor": f"{last.created_at.isoformat()}|{last.id}" if has_more else None,
+    }), 200
+@moderation_bp.route("/stats", methods=["GET"])
+@jwt_required()
+@roles_required("Admin", "TechWriter")
+@replica_reads
+def content_stats():
+    totals = counters.totals(SITE if current_user.has_role("Admin") else current_user.id)
+    by_dimension = {}
+    for (dimension, key), count in totals.items():
+        if count:
+            by_dimension.setdefault(dimension, {})[key] = count
+    by_status = by_dimension.get("status", {})
+    reactions = by_dimension.get("reactions", {})
+    return jsonify({
+        "totalPosts": sum(by_status.values()),
+        "postsPending": sum(by_status.get(status.value, 0) for status in PENDING_STATUSES),
+        "flagged": by_status.get(ContentStatusEnum.Flagged.value, 0),
+        "likes": reactions.get("like", 0),
+        "dislikes": reactions.get("dislike", 0),
+        "comments": by_dimension.get("comments", {}).get("all", 0),
+        "byStatus": by_status,
+        "byType": by_dimension.get("type", {}),
+        "byCategory": by_dimension.get("category", {}),
+    }), 200
@@ -6,24 +6,17 @@ from datetime import datetime, timedelta
 from flask import Blueprint, request, jsonify, current_app, url_for
 from marshmallow import Schema, fields, validate, ValidationError, validates_schema
 from sqlalchemy.exc import SQLAlchemyError
-import phonenumbers
-from phonenumbers.phonenumberutil import NumberParseException
-from . import db, bcrypt
+from . import db, hasher
 from .models import User, PhoneOTP, PasswordResetToken
-from .utils import send_email
+from .ratelimit import rate_limit
+from .utils import normalize_phone, send_email
 from twilio.rest import Client as TwilioClient
 logger = logging.getLogger(__name__)
 password_reset_bp = Blueprint("password_reset", __name__, url_prefix="/auth")
 def validate_phone(number: str):
     if re.match(r"^\+\d{10,15}$", number):
         return number
-    try:
-        parsed = phonenumbers.parse(number, None)
-    except NumberParseException:
-        return None
-    if not phonenumbers.is_valid_number(parsed):
-        return None
-    return phonenumbers.format_number(parsed, phonenumbers.PhoneNumberFormat.E164)
+    return normalize_phone(number)
 class RequestPasswordResetSchema(Schema):
     identifier = fields.Str(required=True)
     @validates_schema
@@ -58,6 +51,7 @@ class ResetPasswordSchema(Schema):
 def handle_validation_error(err):
     return jsonify(error=err.messages), 400
 @password_reset_bp.route("/request-password-reset-sms", methods=["POST"])
+@rate_limit("password_reset_sms", identifier_field="identifier")
 def request_password_reset_sms():
     d = RequestPasswordResetSchema().load(request.get_json() or {})
     normalized = validate_phone(d["identifier"])
@@ -136,7 +130,7 @@ def reset_password_sms():
     user = User.query.filter_by(phone_number=normalized).first()
     if not user or not user.is_active:
         return jsonify(error="Invalid request."), 400
-    user.password_hash = bcrypt.generate_password_hash(d["new_password"]).decode()
+    user.password_hash = hasher.generate(d["new_password"])
     try:
         db.session.commit()
     except SQLAlchemyError:
@@ -145,15 +139,15 @@ def reset_password_sms():
         return jsonify(error="Could not reset password."), 500
     return jsonify(message="Password has been reset."), 200
 @password_reset_bp.route("/request-password-reset", methods=["POST"])
+@rate_limit("password_reset_email", identifier_field="identifier")
 def request_password_reset_email():
     from .models import PasswordResetToken
-    db.session.expire_all()
     from marshmallow import ValidationError as MV
     try:
         data = RequestResetSchema().load(request.get_json() or {})
     except MV as err:
         return jsonify(error=err.messages), 400
-    user = User.query.filter_by(email=data["identifier"]).first()
+    user = User.query.filter_by(email=data["identifier"]).execution_options(populate_existing=True).first()
     if not user or not user.is_active:
         return jsonify(message="If that email exists, you will receive reset instructions."), 200
     token = str(uuid.uuid4())
@@ -179,19 +173,22 @@ def request_password_reset_email():
 @password_reset_bp.route("/reset-password", methods=["POST"])
 def reset_password_email():
     from .models import PasswordResetToken
-    db.session.expire_all()
     from marshmallow import ValidationError as MV
     try:
         data = ResetPasswordSchema().load(request.get_json() or {})
     except MV as err:
         return jsonify(error=err.messages), 400
-    prt = PasswordResetToken.query.filter_by(token=data["token"], used=False).first()
+    prt = (
+        PasswordResetToken.query.filter_by(token=data["token"], used=False)
+        .execution_options(populate_existing=True)
+        .first()
+    )
     if not prt or prt.expires_at < datetime.utcnow():
         return jsonify(error="Invalid or expired token."), 400
-    user = User.query.get(prt.user_id)
+    user = db.session.get(User, prt.user_id, populate_existing=True)
     if not user or not user.is_active:
         return jsonify(error="Invalid token."), 400
-    user.password_hash = bcrypt.generate_password_hash(data["new_password"]).decode()
+    user.password_hash = hasher.generate(data["new_password"])
     prt.used = True
     try:
         db.session.commit()
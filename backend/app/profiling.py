@@ -0,0 +1,281 @@
+import hashlib
+import hmac
+import json
+import logging
+import os
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timezone
+from flask import Blueprint, Response, current_app, jsonify, request
+from flask_jwt_extended import jwt_required
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from .utils import roles_required
+logger = logging.getLogger(__name__)
+profiling_bp = Blueprint("profiling", __name__, url_prefix="/admin/profiles")
+MIN_EDGE_SECONDS = 1e-5
+MAX_STACKS = 20000
+def sign(secret: str, expires: int) -> str:
+    digest = hmac.new(secret.encode(), f"profile:{expires}".encode(), hashlib.sha256).hexdigest()
+    return f"{expires}.{digest}"
+def verify(secret: str, value: str, now=None) -> bool:
+    expires, _, _ = value.partition(".")
+    try:
+        expires = int(expires)
+    except ValueError:
+        return False
+    if expires < (now or time.time()):
+        return False
+    return hmac.compare_digest(sign(secret, expires), value)
+def _label(func) -> str:
+    filename, line, name = func
+    if filename == "~":
+        return name.replace(";", ",")
+    return f"{name} ({os.path.basename(filename)}:{line})".replace(";", ",")
+def collapse_pstats(stats) -> dict:
+    children = defaultdict(list)
+    for func, (_, _, _, _, callers) in stats.items():
+        for caller, edge in callers.items():
+            children[caller].append((func, edge[3]))
+    stacks = defaultdict(float)
+    pending = [(func, entry[3], ()) for func, entry in stats.items() if not entry[4]]
+    while pending and len(stacks) < MAX_STACKS:
+        func, budget, path = pending.pop()
+        _, _, tottime, cumtime, _ = stats[func]
+        if cumtime <= 0 or budget < MIN_EDGE_SECONDS:
+            continue
+        scale = min(1.0, budget / cumtime)
+        label = _label(func)
+        path = path + (label,)
+        stacks[";".join(path)] += tottime * scale
+        for child, edge_cumtime in children.get(func, ()):
+            if _label(child) not in path:
+                pending.append((child, edge_cumtime * scale, path))
+    return stacks
+def collapse_frames(root) -> dict:
+    stacks = defaultdict(float)
+    pending = [(root, ())]
+    while pending and len(stacks) < MAX_STACKS:
+        frame, path = pending.pop()
+        path = path + (f"{frame.function} ({frame.file_path_short}:{frame.line_no})".replace(";", ","),)
+        self_time = frame.time - sum(child.time for child in frame.children)
+        if self_time > 0:
+            stacks[";".join(path)] += self_time
+        pending.extend((child, path) for child in frame.children)
+    return stacks
+def _top_functions(stats, limit=30) -> list:
+    rows = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {
+            "function": _label(func),
+            "calls": calls,
+            "tottime_ms": round(tottime * 1000, 3),
+            "cumtime_ms": round(cumtime * 1000, 3),
+        }
+        for func, (_, calls, tottime, cumtime, _) in rows
+    ]
+class _Run:
+    def __init__(self, backend, trigger, interval):
+        self.backend = backend
+        self.trigger = trigger
+        self.sql = []
+        self.query_started = 0.0
+        self.started = time.perf_counter()
+        if backend == "pyinstrument":
+            from pyinstrument import Profiler
+            self.profiler = Profiler(interval=interval, async_mode="disabled")
+            self.profiler.start()
+        else:
+            import cProfile
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+    def stop(self):
+        if self.backend == "pyinstrument":
+            session = self.profiler.stop()
+            return collapse_frames(session.root_frame()), []
+        self.profiler.disable()
+        import pstats
+        stats = pstats.Stats(self.profiler).stats
+        return collapse_pstats(stats), _top_functions(stats)
+class ProfileStore:
+    def __init__(self, max_profiles=50, directory=None):
+        self.max_profiles = max_profiles
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._profiles = deque(maxlen=max_profiles)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+    def add(self, record: dict) -> None:
+        if not self.directory:
+            with self._lock:
+                self._profiles.append(record)
+            return
+        path = os.path.join(self.directory, f"{record['created_at_ns']}-{record['id']}.json")
+        with open(f"{path}.tmp", "w") as fh:
+            json.dump(record, fh)
+        os.replace(f"{path}.tmp", path)
+        for stale in self._files()[:-self.max_profiles]:
+            try:
+                os.remove(os.path.join(self.directory, stale))
+            except OSError:
+                pass
+    def _files(self) -> list:
+        return sorted(name for name in os.listdir(self.directory) if name.endswith(".json"))
+    def all(self) -> list:
+        if not self.directory:
+            with self._lock:
+                return list(reversed(self._profiles))
+        records = []
+        for name in reversed(self._files()):
+            try:
+                with open(os.path.join(self.directory, name)) as fh:
+                    records.append(json.load(fh))
+            except (OSError, ValueError):
+                continue
+        return records
+    def get(self, profile_id: str):
+        if not self.directory:
+            with self._lock:
+                return next((p for p in self._profiles if p["id"] == profile_id), None)
+        for name in self._files():
+            if name.endswith(f"-{profile_id}.json"):
+                with open(os.path.join(self.directory, name)) as fh:
+                    return json.load(fh)
+        return None
+class RequestProfiler:
+    def __init__(self, app=None):
+        self._local = threading.local()
+        self._listening = False
+        self.store = ProfileStore()
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["request_profiler"] = self
+        self.store = ProfileStore(app.config.get("PROFILING_MAX_PROFILES", 50), app.config.get("PROFILING_DIR"))
+        if not app.config.get("PROFILING_ENABLED"):
+            return
+        app.before_request(self._start)
+        app.after_request(self._finish)
+        app.teardown_request(self._abandon)
+        if not self._listening:
+            event.listen(Engine, "before_cursor_execute", self._before_cursor_execute)
+            event.listen(Engine, "after_cursor_execute", self._after_cursor_execute)
+            self._listening = True
+    @staticmethod
+    def backend() -> str:
+        choice = current_app.config.get("PROFILING_BACKEND", "auto")
+        if choice in ("auto", "pyinstrument"):
+            try:
+                import pyinstrument
+                return "pyinstrument"
+            except ImportError:
+                if choice == "pyinstrument":
+                    logger.warning("pyinstrument is not installed; falling back to cProfile")
+        return "cprofile"
+    def secret(self) -> str:
+        return current_app.config.get("PROFILING_SECRET") or current_app.config["SECRET_KEY"]
+    def _trigger(self):
+        header = request.headers.get(current_app.config.get("PROFILING_HEADER", "X-Profile"))
+        if header:
+            return "header" if verify(self.secret(), header) else None
+        rate = current_app.config.get("PROFILING_SAMPLE_RATE", 0.0)
+        if rate and random.random() < rate:
+            return "sample"
+        return None
+    def _start(self):
+        trigger = self._trigger()
+        if trigger is None:
+            return
+        try:
+            self._local.run = _Run(self.backend(), trigger, current_app.config.get("PROFILING_INTERVAL", 0.001))
+        except ValueError:
+            logger.warning("Another profiler is active; skipping %s", request.path)
+    def _finish(self, response):
+        run = getattr(self._local, "run", None)
+        if run is None:
+            return response
+        self._local.run = None
+        duration = time.perf_counter() - run.started
+        stacks, top = run.stop()
+        record = {
+            "id": uuid.uuid4().hex,
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "created_at_ns": time.time_ns(),
+            "endpoint": request.endpoint,
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "status": response.status_code,
+            "duration_ms": round(duration * 1000, 3),
+            "backend": run.backend,
+            "trigger": run.trigger,
+            "pid": os.getpid(),
+            "sql": run.sql,
+            "top": top,
+            "collapsed": [[stack, round(seconds * 1e6)] for stack, seconds in stacks.items() if seconds * 1e6 >= 1],
+        }
+        try:
+            self.store.add(record)
+        except OSError:
+            logger.exception("Failed to store profile for %s", request.path)
+        return response
+    def _abandon(self, exc):
+        run = getattr(self._local, "run", None)
+        if run is not None:
+            self._local.run = None
+            run.stop()
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        run = getattr(self._local, "run", None)
+        if run is not None:
+            run.query_started = time.perf_counter()
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        run = getattr(self._local, "run", None)
+        if run is not None and len(run.sql) < current_app.config.get("PROFILING_MAX_SQL", 200):
+            run.sql.append({
+                "statement": statement,
+                "executemany": executemany,
+                "duration_ms": round((time.perf_counter() - run.query_started) * 1000, 3),
+            })
+request_profiler = RequestProfiler()
+def _summary(record: dict) -> dict:
+    return {key: value for key, value in record.items() if key not in ("sql", "top", "collapsed", "created_at_ns")}
+@profiling_bp.route("", methods=["GET"])
+@jwt_required()
+@roles_required("Admin")
+def list_profiles():
+    endpoint = request.args.get("endpoint")
+    records = [r for r in request_profiler.store.all() if endpoint is None or r["endpoint"] == endpoint]
+    return jsonify([_summary(r) for r in records]), 200
+@profiling_bp.route("/<profile_id>", methods=["GET"])
+@jwt_required()
+@roles_required("Admin")
+def get_profile(profile_id: str):
+    record = request_profiler.store.get(profile_id)
+    if record is None:
+        return jsonify({"error": "Profile not found."}), 404
+    return jsonify(record), 200
+@profiling_bp.route("/<profile_id>/collapsed", methods=["GET"])
+@jwt_required()
+@roles_required("Admin")
+def get_collapsed(profile_id: str):
+    record = request_profiler.store.get(profile_id)
+    if record is None:
+        return jsonify({"error": "Profile not found."}), 404
+    body = "".join(f"{stack} {value}\n" for stack, value in record["collapsed"])
+    return Response(body, mimetype="text/plain")
+@profiling_bp.route("/token", methods=["POST"])
+@jwt_required()
+@roles_required("Admin")
+def create_token():
+    data = request.get_json(silent=True) or {}
+    ttl = data.get("ttl", current_app.config.get("PROFILING_TOKEN_TTL", 300))
+    if not isinstance(ttl, int) or not 0 < ttl <= 86400:
+        return jsonify({"error": "ttl must be between 1 and 86400 seconds."}), 400
+    expires = int(time.time()) + ttl
+    return jsonify({
+        "header": current_app.config.get("PROFILING_HEADER", "X-Profile"),
+        "value": sign(request_profiler.secret(), expires),
+        "expires_at": datetime.fromtimestamp(expires, timezone.utc).isoformat(),
+    }), 201
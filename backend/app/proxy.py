@@ -1,91 +1,193 @@
-import requests
-from flask import Blueprint, jsonify, request
+import time
+from concurrent.futures import wait
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from flask import Blueprint, current_app, jsonify, request
+from .upstream import UpstreamError, upstream
 
 proxy_bp = Blueprint("proxy", __name__, url_prefix="/proxy")
 
+def _rss2json_params(config, feed_url):
+    return {"rss_url": feed_url, "api_key": config["PROXY_RSS2JSON_API_KEY"]}
+
+def _rss2json(feed_url, transform):
+    return upstream.fetch_json(
+        current_app.config["PROXY_RSS2JSON_URL"],
+        params=_rss2json_params(current_app.config, feed_url),
+        transform=transform,
+    )
+
+def _format_videos(data):
+    return [
+        {
+            "guid": item["guid"],
+            "title": item["title"],
+            "link": item["link"],
+            "pubDate": item["pubDate"],
+        }
+        for item in data.get("items", [])
+    ]
+
+def _format_articles(data):
+    return [
+        {
+            "id": article["id"],
+            "title": article["title"],
+            "url": article["url"],
+            "published_at": article["published_at"],
+        }
+        for article in data
+    ]
+
+def _format_podcasts(data):
+    return [
+        {
+            "title": item["title"],
+            "category": "Podcast",
+            "date": item["pubDate"],
+            "audio_url": (item.get("enclosure") or {}).get("url", ""),
+        }
+        for item in data.get("items", [])
+    ]
+
 @proxy_bp.route("/youtube-videos", methods=["GET"])
 def proxy_youtube_videos():
-    RSS2JSON_API_KEY = "qaroytlfmvhtdcvktht1hraeubbedie4ggiogmaz"
-    VIDEO_API = f"https://api.rss2json.com/v1/api.json?rss_url=https://www.youtube.com/feeds/videos.xml?channel_id=UC8butISFwT-Wl7EV0hUK0BQ&api_key={RSS2JSON_API_KEY}"
     try:
-        response = requests.get(VIDEO_API)
-        response.raise_for_status()
-        data = response.json()
-        items = data.get("items", [])
-        formatted_items = [
-            {
-                "guid": item["guid"],
-                "title": item["title"],
-                "link": item["link"],
-                "pubDate": item["pubDate"],
-            }
-            for item in items
-        ]
-        return jsonify({"items": formatted_items}), 200
-    except requests.RequestException as e:
+        items = _rss2json(current_app.config["PROXY_YOUTUBE_FEED_URL"], _format_videos)
+        return jsonify({"items": items}), 200
+    except UpstreamError as e:
         return jsonify({"error": f"Failed to fetch YouTube videos: {str(e)}"}), 500
 
 @proxy_bp.route("/devto-articles", methods=["GET"])
 def proxy_devto_articles():
-    ARTICLE_API = "https://dev.to/api/articles"
     try:
-        response = requests.get(ARTICLE_API)
-        response.raise_for_status()
-        data = response.json()
-        formatted_data = [
-            {
-                "id": article["id"],
-                "title": article["title"],
-                "url": article["url"],
-                "published_at": article["published_at"],
-            }
-            for article in data
-        ]
-        return jsonify(formatted_data), 200
-    except requests.RequestException as e:
+        articles = upstream.fetch_json(
+            f"{current_app.config['PROXY_DEVTO_API_URL']}/articles", transform=_format_articles
+        )
+        return jsonify(articles), 200
+    except UpstreamError as e:
         return jsonify({"error": f"Failed to fetch Dev.to articles: {str(e)}"}), 500
 
 @proxy_bp.route("/devto-article/<int:article_id>", methods=["GET"])
 def proxy_devto_article(article_id):
-    ARTICLE_DETAIL_API = f"https://dev.to/api/articles/{article_id}"
     try:
-        response = requests.get(ARTICLE_DETAIL_API)
-        response.raise_for_status()
-        return jsonify(response.json()), 200
-    except requests.RequestException as e:
+        article = upstream.fetch_json(f"{current_app.config['PROXY_DEVTO_API_URL']}/articles/{article_id}")
+        return jsonify(article), 200
+    except UpstreamError as e:
         return jsonify({"error": f"Failed to fetch Dev.to article: {str(e)}"}), 500
 
 @proxy_bp.route("/devto-comments", methods=["GET"])
 def proxy_devto_comments():
-    article_id = request.args.get("a_id")
+    article_id = request.args.get("a_id", type=int)
     if not article_id:
         return jsonify({"error": "Missing a_id parameter"}), 400
-    COMMENTS_API = f"https://dev.to/api/comments?a_id={article_id}"
     try:
-        response = requests.get(COMMENTS_API)
-        response.raise_for_status()
-        return jsonify(response.json()), 200
-    except requests.RequestException as e:
+        comments = upstream.fetch_json(
+            f"{current_app.config['PROXY_DEVTO_API_URL']}/comments", params={"a_id": article_id}
+        )
+        return jsonify(comments), 200
+    except UpstreamError as e:
         return jsonify({"error": f"Failed to fetch Dev.to comments: {str(e)}"}), 500
 
 @proxy_bp.route("/podcasts", methods=["GET"])
 def proxy_podcasts():
-    RSS2JSON_API_KEY = "qaroytlfmvhtdcvktht1hraeubbedie4ggiogmaz"
-    AUDIO_API = f"https://api.rss2json.com/v1/api.json?rss_url=https://feeds.simplecast.com/4r7G7Z8a&api_key={RSS2JSON_API_KEY}"
     try:
-        response = requests.get(AUDIO_API)
-        response.raise_for_status()
-        data = response.json()
-        items = data.get("items", [])
-        formatted_items = [
-            {
-                "title": item["title"],
-                "category": "Podcast",
-                "date": item["pubDate"],
-                "audio_url": item.get("enclosure", {}).get("url", ""),
-            }
-            for item in items
-        ]
-        return jsonify(formatted_items), 200
-    except requests.RequestException as e:
-        return jsonify({"error": f"Failed to fetch podcasts: {str(e)}"}), 500
\ No newline at end of file
+        podcasts = _rss2json(current_app.config["PROXY_PODCAST_FEED_URL"], _format_podcasts)
+        return jsonify(podcasts), 200
+    except UpstreamError as e:
+        return jsonify({"error": f"Failed to fetch podcasts: {str(e)}"}), 500
+
+def _parse_published(value):
+    if not value:
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        try:
+            parsed = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _feed_item(source, content_type, item_id, title, url, published):
+    return {
+        "source": source,
+        "type": content_type,
+        "id": item_id,
+        "title": title,
+        "url": url,
+        "published_at": published,
+    }
+
+def _youtube_request(config):
+    return upstream.fetch_json_async(
+        config["PROXY_RSS2JSON_URL"],
+        params=_rss2json_params(config, config["PROXY_YOUTUBE_FEED_URL"]),
+        transform=_format_videos,
+    )
+
+def _youtube_items(videos):
+    return [_feed_item("youtube", "video", v["guid"], v["title"], v["link"], v["pubDate"]) for v in videos]
+
+def _devto_request(config):
+    return upstream.fetch_json_async(f"{config['PROXY_DEVTO_API_URL']}/articles", transform=_format_articles)
+
+def _devto_items(articles):
+    return [_feed_item("devto", "article", a["id"], a["title"], a["url"], a["published_at"]) for a in articles]
+
+def _podcast_request(config):
+    return upstream.fetch_json_async(
+        config["PROXY_RSS2JSON_URL"],
+        params=_rss2json_params(config, config["PROXY_PODCAST_FEED_URL"]),
+        transform=_format_podcasts,
+    )
+
+def _podcast_items(podcasts):
+    return [
+        _feed_item("podcasts", "audio", p["audio_url"] or p["title"], p["title"], p["audio_url"], p["date"])
+        for p in podcasts
+    ]
+
+FEED_SOURCES = {
+    "youtube": (_youtube_request, _youtube_items),
+    "devto": (_devto_request, _devto_items),
+    "podcasts": (_podcast_request, _podcast_items),
+}
+
+@proxy_bp.route("/feed", methods=["GET"])
+def proxy_feed():
+    requested = request.args.get("sources")
+    names = [n.strip() for n in requested.split(",") if n.strip()] if requested else list(FEED_SOURCES)
+    unknown = [n for n in names if n not in FEED_SOURCES]
+    if unknown:
+        return jsonify({"error": f"Unknown sources: {', '.join(unknown)}"}), 400
+    config = current_app.config
+    limit = max(1, min(request.args.get("limit", 50, type=int), config["PROXY_FEED_MAX_LIMIT"]))
+    started = time.perf_counter()
+    finished = {}
+    futures = {}
+    for name in names:
+        future = FEED_SOURCES[name][0](config)
+        future.add_done_callback(lambda f, name=name: finished.setdefault(name, time.perf_counter()))
+        futures[future] = name
+    done, _ = wait(futures, timeout=config["PROXY_FEED_TIMEOUT"])
+    statuses = {}
+    items = []
+    for future, name in futures.items():
+        if future not in done:
+            statuses[name] = {"status": "timeout"}
+            continue
+        try:
+            source_items = FEED_SOURCES[name][1](future.result())
+        except UpstreamError as e:
+            statuses[name] = {"status": "error", "error": str(e)}
+            continue
+        elapsed_ms = (finished.get(name, time.perf_counter()) - started) * 1000
+        statuses[name] = {"status": "ok", "count": len(source_items), "elapsed_ms": round(elapsed_ms, 1)}
+        items.extend(source_items)
+    if not any(s["status"] == "ok" for s in statuses.values()):
+        return jsonify({"error": "Failed to fetch feeds", "sources": statuses}), 500
+    items.sort(key=lambda i: _parse_published(i["published_at"]) or datetime.min, reverse=True)
+    return jsonify({"items": items[:limit], "sources": statuses}), 200
@@ -0,0 +1,138 @@
+import logging
+import math
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from functools import wraps
+from flask import current_app, jsonify, request
+from .utils import normalize_phone
+logger = logging.getLogger(__name__)
+_NEVER = float("-inf")
+class MemoryBackend:
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._lock = threading.Lock()
+        self._buckets = OrderedDict()
+    def hit(self, key: str, limit: int, window: float):
+        return self.hit_many([(key, limit, window)])
+    def _bucket(self, key: str, limit: int):
+        bucket = self._buckets.get(key)
+        if bucket is None or len(bucket[0]) != limit:
+            bucket = [[_NEVER] * limit, 0]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+        return bucket
+    def hit_many(self, entries):
+        now = time.monotonic()
+        with self._lock:
+            buckets = [(self._bucket(key, limit), limit, window) for key, limit, window in entries]
+            for (ring, idx), _, window in buckets:
+                elapsed = now - ring[idx]
+                if elapsed < window:
+                    return False, window - elapsed
+            for bucket, limit, _ in buckets:
+                ring, idx = bucket
+                ring[idx] = now
+                bucket[1] = idx + 1 if idx + 1 < limit else 0
+            return True, 0.0
+    def reset(self) -> None:
+        with self._lock:
+            self._buckets.clear()
+class RedisBackend:
+    SCRIPT = """
+local now = tonumber(ARGV[1])
+for i, key in ipairs(KEYS) do
+    local window = tonumber(ARGV[2 + i * 2])
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    if redis.call('ZCARD', key) >= tonumber(ARGV[1 + i * 2]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        return {0, tostring(tonumber(oldest[2]) + window - now)}
+    end
+end
+for i, key in ipairs(KEYS) do
+    redis.call('ZADD', key, now, ARGV[2])
+    redis.call('PEXPIRE', key, math.ceil(tonumber(ARGV[2 + i * 2]) * 1000))
+end
+return {1, '0'}
+"""
+    def __init__(self, url: str, prefix: str = "ratelimit:"):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self._script = self._redis.register_script(self.SCRIPT)
+        self.prefix = prefix
+    def hit(self, key: str, limit: int, window: float):
+        return self.hit_many([(key, limit, window)])
+    def hit_many(self, entries):
+        args = [time.time(), uuid.uuid4().hex]
+        for _, limit, window in entries:
+            args += [limit, window]
+        allowed, retry_after = self._script(keys=[self.prefix + key for key, _, _ in entries], args=args)
+        return bool(allowed), float(retry_after)
+    def reset(self) -> None:
+        for key in self._redis.scan_iter(self.prefix + "*"):
+            self._redis.delete(key)
+class RateLimiter:
+    def __init__(self, app=None):
+        self.backend = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        if app.config.get("RATELIMIT_BACKEND", "memory") == "redis":
+            self.backend = RedisBackend(app.config["RATELIMIT_REDIS_URL"])
+        else:
+            self.backend = MemoryBackend(app.config.get("RATELIMIT_MAX_KEYS", 100000))
+        app.extensions["rate_limiter"] = self
+    def check(self, scope: str, identifier: str = None):
+        rules = current_app.config.get("RATELIMIT_LIMITS", {}).get(scope)
+        if not rules:
+            return None
+        keys = [("ip", request.remote_addr or "unknown")]
+        if identifier:
+            keys.append(("identifier", identifier))
+        entries = [
+            (f"{scope}:{kind}:{value}", rules[kind][0], rules[kind][1])
+            for kind, value in keys
+            if rules.get(kind)
+        ]
+        if not entries:
+            return None
+        allowed, retry_after = self.backend.hit_many(entries)
+        if not allowed:
+            logger.warning("Rate limit hit for %s by %s", scope, ", ".join(f"{kind}={value}" for kind, value in keys))
+            return retry_after
+        return None
+    def reset(self) -> None:
+        self.backend.reset()
+limiter = RateLimiter()
+def _identifier(value: str) -> str:
+    value = value.strip()
+    if "@" not in value:
+        phone = normalize_phone(value, current_app.config.get("PHONE_DEFAULT_REGION"))
+        if phone:
+            return phone
+    return value.lower()
+def rate_limit(scope: str, identifier_field: str = None):
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if current_app.config.get("RATELIMIT_ENABLED", True):
+                identifier = None
+                if identifier_field:
+                    payload = request.get_json(silent=True) or {}
+                    value = payload.get(identifier_field)
+                    if isinstance(value, str):
+                        identifier = _identifier(value)
+                retry_after = limiter.check(scope, identifier)
+                if retry_after is not None:
+                    return (
+                        jsonify(error="Too many requests. Please try again later."),
+                        429,
+                        {"Retry-After": str(max(1, math.ceil(retry_after)))},
+                    )
+            return fn(*args, **kwargs)
+        return wrapper
+    return decorator
@@ -4,10 +4,12 @@ from flask_jwt_extended import jwt_required, get_jwt_identity
 from sqlalchemy import func
 from sqlalchemy.exc import SQLAlchemyError
 from . import db
+from .cache import cached
 from .models import Content, Reaction, ReactionTypeEnum
 logger = logging.getLogger(__name__)
 reactions_bp = Blueprint("reactions", __name__, url_prefix="/content")
 @reactions_bp.route("/<int:content_id>/reactions", methods=["GET"])
+@cached(ttl=60, tags=("reactions:{content_id}",))
 def list_reactions(content_id):
     Content.query.filter_by(id=content_id).first_or_404()
     rows = (
@@ -11,6 +11,7 @@ from .models import(
     ReactionTypeEnum,
     ContentStatusEnum,
 )
+from .routing import replica_reads
 logger = logging.getLogger(__name__)
 recommendations_bp = Blueprint("recommendations", __name__, url_prefix="/recommendations")
 def _fetch_recommendations(user_id: int, page: int, per_page: int):
@@ -40,8 +41,8 @@ def _fetch_recommendations(user_id: int, page: int, per_page: int):
     return q.paginate(page=page, per_page=per_page, error_out=False)
 @recommendations_bp.route("", methods=["GET"])
 @jwt_required()
+@replica_reads
 def get_recommendations():
-    db.session.expire_all()
     try:
         user_id = int(get_jwt_identity())
     except (TypeError, ValueError):
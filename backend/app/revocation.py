@@ -0,0 +1,314 @@
+import hashlib
+import logging
+import math
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from flask import current_app, has_app_context, jsonify
+from sqlalchemy import event, exists, inspect, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from . import db
+from .models import RefreshToken, User
+logger = logging.getLogger(__name__)
+class BloomFilter:
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.001):
+        self.size = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.hashes = max(1, round(self.size / capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+    def add(self, item: str) -> None:
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+    def __contains__(self, item: str) -> bool:
+        bits = self.bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(item))
+class MemoryRevocationStore:
+    def __init__(self, capacity=100000, error_rate=0.001, sync_seconds=5, rebuild_seconds=3600, lru_size=10000,
+                 overlap_seconds=60):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.sync_seconds = sync_seconds
+        self.rebuild_seconds = rebuild_seconds
+        self.lru_size = lru_size
+        self.overlap = timedelta(seconds=overlap_seconds)
+        self._lock = threading.Lock()
+        self._bloom = BloomFilter(capacity, error_rate)
+        self._confirmed = OrderedDict()
+        self._synced_at = None
+        self._next_sync = 0.0
+        self._next_rebuild = 0.0
+    def _remember(self, jti: str, revoked: bool) -> None:
+        with self._lock:
+            self._confirmed[jti] = revoked
+            self._confirmed.move_to_end(jti)
+            while len(self._confirmed) > self.lru_size:
+                self._confirmed.popitem(last=False)
+    def sync(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next_sync:
+            return
+        rebuild = force or now >= self._next_rebuild or self._synced_at is None
+        started = datetime.utcnow()
+        q = db.session.query(RefreshToken.token).filter(
+            RefreshToken.revoked.is_(True),
+            RefreshToken.expires_at > started,
+        )
+        if not rebuild:
+            q = q.filter(RefreshToken.revoked_at >= self._synced_at - self.overlap)
+        rows = q.all()
+        bloom = BloomFilter(self.capacity, self.error_rate) if rebuild else self._bloom
+        for (jti,) in rows:
+            bloom.add(jti)
+        with self._lock:
+            self._bloom = bloom
+            self._synced_at = started
+            self._next_sync = now + self.sync_seconds
+            if rebuild:
+                self._confirmed.clear()
+                self._next_rebuild = now + self.rebuild_seconds
+        for (jti,) in rows:
+            self._remember(jti, True)
+    def add(self, jti: str, expires_at: datetime) -> None:
+        self._bloom.add(jti)
+        self._remember(jti, True)
+    def is_revoked(self, jti: str) -> bool:
+        self.sync()
+        if jti not in self._bloom:
+            return False
+        cached = self._confirmed.get(jti)
+        if cached is not None:
+            return cached
+        revoked = db.session.query(
+            exists().where(RefreshToken.token == jti, RefreshToken.revoked.is_(True))
+        ).scalar()
+        self._remember(jti, revoked)
+        return revoked
+class RedisRevocationStore:
+    def __init__(self, url: str, prefix: str = "revoked-jti:"):
+        import redis
+        self._redis = redis.Redis.from_url(url)
+        self.prefix = prefix
+    def sync(self, force: bool = False) -> None:
+        pass
+    def add(self, jti: str, expires_at: datetime) -> None:
+        ttl = max(1, int((expires_at - datetime.utcnow()).total_seconds()))
+        self._redis.set(self.prefix + jti, 1, ex=ttl)
+    def is_revoked(self, jti: str) -> bool:
+        return bool(self._redis.exists(self.prefix + jti))
+class DeactivatedUsers:
+    def __init__(self, sync_seconds=30):
+        self.sync_seconds = sync_seconds
+        self._lock = threading.Lock()
+        self._ids = frozenset()
+        self._next_sync = 0.0
+        self.on_identity_change = None
+    def load(self) -> None:
+        ids = frozenset(user_id for (user_id,) in db.session.query(User.id).filter(User.is_active.is_(False)))
+        with self._lock:
+            self._ids = ids
+            self._next_sync = time.monotonic() + self.sync_seconds
+    def sync(self) -> None:
+        if self.sync_seconds and time.monotonic() >= self._next_sync:
+            self.load()
+    def _apply(self, user_id: int, active: bool) -> None:
+        with self._lock:
+            self._ids = self._ids - {user_id} if active else self._ids | {user_id}
+    def update(self, user_id: int, active: bool) -> None:
+        self._apply(user_id, active)
+    def publish_identity_change(self, user_ids) -> None:
+        pass
+    def reset(self) -> None:
+        with self._lock:
+            self._ids = frozenset()
+            self._next_sync = time.monotonic() + self.sync_seconds
+    def after_fork(self) -> None:
+        pass
+    def shutdown(self) -> None:
+        pass
+    def __contains__(self, user_id: int) -> bool:
+        self.sync()
+        return user_id in self._ids
+    def __len__(self) -> int:
+        return len(self._ids)
+class RedisDeactivatedUsers(DeactivatedUsers):
+    def __init__(self, client, channel="user-deactivations", sync_seconds=30):
+        super().__init__(sync_seconds)
+        self._redis = client
+        self.channel = channel
+        self._version = None
+        self._subscribe()
+    def _subscribe(self) -> None:
+        self._pubsub = self._redis.pubsub(ignore_subscribe_messages=True)
+        self._pubsub.subscribe(**{
+            self.channel: self._on_message,
+            self.channel + ":identity": self._on_identity_message,
+        })
+        self._listener = self._pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+    @classmethod
+    def from_url(cls, url, channel="user-deactivations", sync_seconds=30):
+        import redis
+        return cls(redis.Redis.from_url(url), channel, sync_seconds)
+    def _on_message(self, message) -> None:
+        data = message["data"]
+        op, _, user_id = (data.decode() if isinstance(data, bytes) else data).partition(":")
+        self._apply(int(user_id), op == "activate")
+    def _on_identity_message(self, message) -> None:
+        data = message["data"]
+        user_ids = [int(user_id) for user_id in (data.decode() if isinstance(data, bytes) else data).split(",")]
+        if self.on_identity_change is not None:
+            self.on_identity_change(*user_ids)
+    def _current_version(self):
+        try:
+            return self._redis.get(self.channel + ":version")
+        except Exception:
+            logger.warning("Could not read deactivation version", exc_info=True)
+            return self._version
+    def load(self) -> None:
+        version = self._current_version()
+        super().load()
+        self._version = version
+    def sync(self) -> None:
+        if not self.sync_seconds or time.monotonic() < self._next_sync:
+            return
+        if self._version is not None and self._current_version() == self._version:
+            self._next_sync = time.monotonic() + self.sync_seconds
+            return
+        self.load()
+    def update(self, user_id: int, active: bool) -> None:
+        self._apply(user_id, active)
+        try:
+            pipe = self._redis.pipeline()
+            pipe.incr(self.channel + ":version")
+            pipe.publish(self.channel, f"{'activate' if active else 'deactivate'}:{user_id}")
+            pipe.execute()
+        except Exception:
+            logger.warning("Could not publish deactivation of user %s", user_id, exc_info=True)
+    def publish_identity_change(self, user_ids) -> None:
+        try:
+            self._redis.publish(self.channel + ":identity", ",".join(str(user_id) for user_id in sorted(user_ids)))
+        except Exception:
+            logger.warning("Could not publish identity change for users %s", sorted(user_ids), exc_info=True)
+    def after_fork(self) -> None:
+        self._redis.connection_pool.reset()
+        self._subscribe()
+        self._version = None
+        self._next_sync = 0.0
+    def shutdown(self) -> None:
+        self._listener.stop()
+        self._pubsub.close()
+class TokenRevocation:
+    def __init__(self, app=None, jwt=None):
+        if app is not None:
+            self.init_app(app, jwt)
+    def init_app(self, app, jwt):
+        previous = app.extensions.get("user_deactivations")
+        if previous is not None:
+            previous.shutdown()
+        sync_seconds = app.config.get("DEACTIVATION_SYNC_SECONDS", 30)
+        if app.config.get("DEACTIVATION_REDIS_URL"):
+            deactivated = RedisDeactivatedUsers.from_url(
+                app.config["DEACTIVATION_REDIS_URL"],
+                app.config.get("DEACTIVATION_CHANNEL", "user-deactivations"),
+                sync_seconds,
+            )
+        else:
+            deactivated = DeactivatedUsers(sync_seconds)
+        with app.app_context():
+            try:
+                deactivated.load()
+            except SQLAlchemyError:
+                db.session.rollback()
+                logger.info("Users table not available yet; deactivation list starts empty")
+        app.extensions["user_deactivations"] = deactivated
+        backend = app.config.get("JWT_REVOCATION_BACKEND", "memory")
+        if backend == "redis":
+            store = RedisRevocationStore(app.config["JWT_REVOCATION_REDIS_URL"])
+        else:
+            store = MemoryRevocationStore(
+                capacity=app.config.get("JWT_REVOCATION_BLOOM_CAPACITY", 100000),
+                error_rate=app.config.get("JWT_REVOCATION_BLOOM_ERROR_RATE", 0.001),
+                sync_seconds=app.config.get("JWT_REVOCATION_SYNC_SECONDS", 5),
+                rebuild_seconds=app.config.get("JWT_REVOCATION_REBUILD_SECONDS", 3600),
+                lru_size=app.config.get("JWT_REVOCATION_LRU_SIZE", 10000),
+                overlap_seconds=app.config.get("JWT_REVOCATION_SYNC_OVERLAP_SECONDS", 60),
+            )
+        app.extensions["token_revocation"] = store
+        jwt.token_in_blocklist_loader(self._check_blocklist)
+        jwt.revoked_token_loader(self._revoked_response)
+    @property
+    def store(self):
+        return current_app.extensions["token_revocation"]
+    @property
+    def deactivated(self):
+        return current_app.extensions["user_deactivations"]
+    def _is_deactivated(self, jwt_payload) -> bool:
+        try:
+            return int(jwt_payload["sub"]) in self.deactivated
+        except (KeyError, TypeError, ValueError):
+            return False
+    def _check_blocklist(self, jwt_header, jwt_payload) -> bool:
+        if self._is_deactivated(jwt_payload):
+            return True
+        if jwt_payload.get("type") != "refresh":
+            return False
+        return self.store.is_revoked(jwt_payload["jti"])
+    def _revoked_response(self, jwt_header, jwt_payload):
+        if self._is_deactivated(jwt_payload):
+            return jsonify({"error": "Account deactivated."}), 401
+        return jsonify({"error": "Token revoked."}), 401
+    def revoke(self, jwt_payload) -> None:
+        jti = jwt_payload["jti"]
+        expires_at = datetime.utcfromtimestamp(jwt_payload["exp"])
+        revoked_at = datetime.utcnow()
+        mark_revoked = (
+            update(RefreshToken).where(RefreshToken.token == jti).values(revoked=True, revoked_at=revoked_at)
+        )
+        if not db.session.execute(mark_revoked).rowcount:
+            db.session.add(RefreshToken(
+                token=jti,
+                user_id=int(jwt_payload["sub"]),
+                expires_at=expires_at,
+                revoked=True,
+                revoked_at=revoked_at,
+            ))
+            try:
+                db.session.flush()
+            except IntegrityError:
+                db.session.rollback()
+                db.session.execute(mark_revoked)
+        db.session.commit()
+        self.store.add(jti, expires_at)
+revocations = TokenRevocation()
+@event.listens_for(Session, "after_flush")
+def _collect_activity_changes(session, flush_context):
+    changes = {}
+    for obj in session.new:
+        if isinstance(obj, User) and obj.is_active is False:
+            changes[obj.id] = False
+    for obj in session.dirty:
+        if isinstance(obj, User) and inspect(obj).attrs.is_active.history.has_changes():
+            changes[obj.id] = bool(obj.is_active)
+    for obj in session.deleted:
+        if isinstance(obj, User):
+            changes[obj.id] = True
+    if changes:
+        session.info.setdefault("activity_changes", {}).update(changes)
+@event.listens_for(Session, "after_commit")
+def _publish_activity_changes(session):
+    changes = session.info.pop("activity_changes", None)
+    if not changes or not has_app_context():
+        return
+    deactivated = current_app.extensions.get("user_deactivations")
+    if deactivated is None:
+        return
+    for user_id, active in changes.items():
+        deactivated.update(user_id, active)
+@event.listens_for(Session, "after_rollback")
+def _discard_activity_changes(session):
+    session.info.pop("activity_changes", None)
@@ -0,0 +1,122 @@
+import logging
+import threading
+import time
+from functools import wraps
+from flask import current_app, g, has_request_context, request
+from flask_jwt_extended import get_jwt_identity, verify_jwt_in_request
+from flask_sqlalchemy.session import Session as FlaskSession
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+logger = logging.getLogger(__name__)
+REPLICA_BIND = "replica"
+class RoutingSession(FlaskSession):
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and g.get("db_use_replica"):
+            engine = self._db.engines.get(REPLICA_BIND)
+            if engine is not None:
+                return engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+class MemoryStickiness:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._until = {}
+    def mark(self, identity: str, seconds: int) -> None:
+        now = time.time()
+        with self._lock:
+            if len(self._until) > 10000:
+                self._until = {key: until for key, until in self._until.items() if until > now}
+            self._until[identity] = now + seconds
+    def is_sticky(self, identity: str) -> bool:
+        with self._lock:
+            return self._until.get(identity, 0) > time.time()
+class RedisStickiness:
+    def __init__(self, client, prefix="db-primary:"):
+        self._redis = client
+        self.prefix = prefix
+    @classmethod
+    def from_url(cls, url, prefix="db-primary:"):
+        import redis
+        return cls(redis.Redis.from_url(url), prefix)
+    def mark(self, identity: str, seconds: int) -> None:
+        try:
+            self._redis.set(self.prefix + identity, 1, ex=max(1, int(seconds)))
+        except Exception:
+            logger.warning("Could not mark %s as sticky to the primary", identity, exc_info=True)
+    def is_sticky(self, identity: str) -> bool:
+        try:
+            return bool(self._redis.exists(self.prefix + identity))
+        except Exception:
+            logger.warning("Could not read primary stickiness for %s", identity, exc_info=True)
+            return True
+def _identity():
+    try:
+        verify_jwt_in_request(optional=True)
+        identity = get_jwt_identity()
+    except Exception:
+        return None
+    return None if identity is None else str(identity)
+def _sticky_to_primary() -> bool:
+    identity = _identity()
+    if identity is not None and current_app.extensions["db_stickiness"].is_sticky(identity):
+        return True
+    raw = request.cookies.get(current_app.config.get("DB_REPLICA_STICKY_COOKIE", "db_primary_until"))
+    if not raw:
+        return False
+    try:
+        return float(raw) > time.time()
+    except ValueError:
+        return False
+def replica_reads(fn):
+    @wraps(fn)
+    def wrapper(*args, **kwargs):
+        engines = current_app.extensions["sqlalchemy"].engines
+        g.db_use_replica = REPLICA_BIND in engines and not _sticky_to_primary()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            g.db_use_replica = False
+    return wrapper
+class DatabaseRouter:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["db_router"] = self
+        if app.config.get("DB_REPLICA_STICKY_REDIS_URL"):
+            app.extensions["db_stickiness"] = RedisStickiness.from_url(app.config["DB_REPLICA_STICKY_REDIS_URL"])
+        else:
+            app.extensions["db_stickiness"] = MemoryStickiness()
+        app.after_request(self._mark_sticky)
+        app.teardown_request(self._end_session)
+    @staticmethod
+    def _mark_sticky(response):
+        if not g.get("db_wrote"):
+            return response
+        if REPLICA_BIND not in current_app.extensions["sqlalchemy"].engines:
+            return response
+        seconds = current_app.config.get("DB_REPLICA_STICKY_SECONDS", 10)
+        identity = _identity()
+        if identity is not None:
+            current_app.extensions["db_stickiness"].mark(identity, seconds)
+        response.set_cookie(
+            current_app.config.get("DB_REPLICA_STICKY_COOKIE", "db_primary_until"),
+            f"{time.time() + seconds:.3f}",
+            max_age=seconds,
+            httponly=True,
+            samesite="Lax",
+        )
+        return response
+    @staticmethod
+    def _end_session(exc):
+        current_app.extensions["sqlalchemy"].session.remove()
+router = DatabaseRouter()
+@event.listens_for(Session, "after_flush")
+def _note_write(session, flush_context):
+    session.info["db_wrote"] = True
+@event.listens_for(Session, "after_commit")
+def _remember_write(session):
+    if session.info.pop("db_wrote", False) and has_request_context():
+        g.db_wrote = True
+@event.listens_for(Session, "after_rollback")
+def _forget_write(session):
+    session.info.pop("db_wrote", None)
@@ -0,0 +1,98 @@
+import logging
+import os
+import tempfile
+import threading
+import click
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+logger = logging.getLogger(__name__)
+def _jobs():
+    from .audit_archive import audit_archive
+    from .ingestion import ingestor
+    from .sweeper import sweeper
+    return [
+        (sweeper, "TOKEN_SWEEP_INTERVAL_MINUTES"),
+        (ingestor, "FEED_INGEST_INTERVAL_MINUTES"),
+        (audit_archive, "AUDIT_PARTITION_INTERVAL_MINUTES"),
+    ]
+class JobRunner:
+    def __init__(self, app=None):
+        self._lock_fd = None
+        self._stop = threading.Event()
+        self._waiter = None
+        self._running = []
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["job_runner"] = self
+        @app.cli.command("run-jobs")
+        def run_jobs_command():
+            if not self._scheduled(app):
+                click.echo("No background jobs are configured.")
+                return
+            if not self.start(app):
+                click.echo("Another process holds the scheduler lock; waiting to take over.")
+            try:
+                self._stop.wait()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                self.shutdown()
+    @property
+    def leader(self) -> bool:
+        return self._lock_fd is not None
+    def _scheduled(self, app):
+        return [(component, app.config.get(key, 0)) for component, key in _jobs() if app.config.get(key, 0)]
+    def _acquire(self, app) -> bool:
+        if fcntl is None:
+            self._lock_fd = -1
+            return True
+        path = app.config.get("SCHEDULER_LOCK_FILE") or os.path.join(tempfile.gettempdir(), "backend-scheduler.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+    def _release(self) -> None:
+        if self._lock_fd is not None and self._lock_fd >= 0:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+            os.close(self._lock_fd)
+        self._lock_fd = None
+    def _run(self, app) -> None:
+        for component, interval in self._scheduled(app):
+            component.start_scheduler(app, interval)
+            self._running.append(component)
+        logger.info("Process %s is running %s background jobs", os.getpid(), len(self._running))
+    def _wait_for_leadership(self, app) -> None:
+        retry = app.config.get("SCHEDULER_LEADER_RETRY_SECONDS", 30)
+        while not self._stop.wait(retry):
+            if self._acquire(app):
+                self._run(app)
+                return
+    def start(self, app) -> bool:
+        if self.leader or not self._scheduled(app):
+            return self.leader
+        self._stop = threading.Event()
+        if self._acquire(app):
+            self._run(app)
+            return True
+        self._waiter = threading.Thread(
+            target=self._wait_for_leadership, args=(app,), name="scheduler-leader", daemon=True
+        )
+        self._waiter.start()
+        return False
+    def shutdown(self) -> None:
+        self._stop.set()
+        if self._waiter is not None:
+            self._waiter.join(timeout=5)
+            self._waiter = None
+        for component in self._running:
+            component.shutdown()
+        self._running = []
+        self._release()
+job_runner = JobRunner()
@@ -0,0 +1,260 @@
+import csv
+import io
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from enum import Enum
+from itertools import accumulate, islice
+import click
+from sqlalchemy import func, select, text
+from . import db, hasher
+from .moderation import counters
+logger = logging.getLogger(__name__)
+BASE_TIME = datetime(2024, 1, 1)
+DEFAULT_PASSWORD = "Bench!Passw0rd"
+SCALES = {
+    "tiny": {"users": 20, "categories": 3, "contents": 40, "comments": 200, "reactions": 200, "subscriptions": 30, "notifications": 100},
+    "small": {"users": 200, "categories": 10, "contents": 1000, "comments": 10000, "reactions": 5000, "subscriptions": 400, "notifications": 2000},
+    "medium": {"users": 2000, "categories": 25, "contents": 10000, "comments": 100000, "reactions": 50000, "subscriptions": 4000, "notifications": 20000},
+    "large": {"users": 20000, "categories": 50, "contents": 100000, "comments": 1000000, "reactions": 1000000, "subscriptions": 40000, "notifications": 200000},
+}
+TABLES = ("users", "categories", "contents", "subscriptions", "comments", "reactions", "notifications")
+CHUNK_SIZE = 10000
+def counts_for(scale="small", **overrides) -> dict:
+    if scale not in SCALES:
+        raise ValueError(f"Unknown scale {scale!r}; expected one of {', '.join(SCALES)}")
+    counts = dict(SCALES[scale])
+    counts.update({key: value for key, value in overrides.items() if value is not None})
+    return counts
+def user_email(user_id: int) -> str:
+    return f"user{user_id}@bench.example"
+def zipf_weights(n: int, s: float, rng) -> list:
+    ranks = list(range(1, n + 1))
+    rng.shuffle(ranks)
+    return [1.0 / rank ** s for rank in ranks]
+def allocate(total: int, weights, cap: int) -> list:
+    weight_sum = sum(weights) or 1.0
+    counts = [min(cap, int(total * w / weight_sum)) for w in weights]
+    remaining = total - sum(counts)
+    for i in sorted(range(len(weights)), key=weights.__getitem__, reverse=True):
+        if remaining <= 0:
+            break
+        extra = min(cap - counts[i], remaining)
+        counts[i] += extra
+        remaining -= extra
+    return counts
+def generate(counts, seed=0, password_hash=None, offsets=None, zipf=1.0, reply_ratio=0.6,
+             max_depth=8, depth_bias=0.5, like_ratio=0.8, read_ratio=0.5) -> dict:
+    from .models import ContentStatusEnum, ContentTypeEnum, ReactionTypeEnum
+    rng = random.Random(seed)
+    offsets = offsets or {}
+    u0, cat0, c0 = offsets.get("users", 0), offsets.get("categories", 0), offsets.get("contents", 0)
+    n_users, n_categories, n_contents = counts["users"], counts["categories"], counts["contents"]
+    users = [
+        {
+            "id": u0 + i,
+            "email": user_email(u0 + i),
+            "name": f"Bench User {u0 + i}",
+            "password_hash": password_hash,
+            "is_active": True,
+            "created_at": BASE_TIME + timedelta(minutes=i),
+        }
+        for i in range(1, n_users + 1)
+    ]
+    categories = [
+        {
+            "id": cat0 + i,
+            "name": f"Category {cat0 + i}",
+            "description": f"Generated category {cat0 + i}",
+            "created_by": u0 + 1,
+            "created_at": BASE_TIME,
+        }
+        for i in range(1, n_categories + 1)
+    ]
+    content_types = list(ContentTypeEnum)
+    authors = max(1, n_users // 10)
+    contents = []
+    for i in range(1, n_contents + 1):
+        contents.append({
+            "id": c0 + i,
+            "title": f"Generated post {c0 + i}",
+            "body": " ".join(f"word{rng.randrange(1000)}" for _ in range(rng.randint(20, 120))),
+            "content_type": rng.choice(content_types),
+            "status": ContentStatusEnum.Published if rng.random() < 0.9 else ContentStatusEnum.Draft,
+            "author_id": u0 + rng.randint(1, authors),
+            "category_id": cat0 + rng.randint(1, n_categories) if n_categories else None,
+            "created_at": BASE_TIME + timedelta(minutes=i * 7),
+        })
+    subscriptions = []
+    seen = set()
+    while len(subscriptions) < min(counts["subscriptions"], n_users * n_categories):
+        pair = (u0 + rng.randint(1, n_users), cat0 + rng.randint(1, n_categories))
+        if pair not in seen:
+            seen.add(pair)
+            subscriptions.append({"user_id": pair[0], "category_id": pair[1], "created_at": BASE_TIME})
+    popularity = zipf_weights(n_contents, zipf, rng)
+    def comment_rows():
+        first = offsets.get("comments", 0) + 1
+        targets = rng.choices(range(n_contents), cum_weights=list(accumulate(popularity)), k=counts["comments"])
+        threads, depth = {}, {}
+        for i, target in enumerate(targets):
+            comment_id = first + i
+            siblings = threads.setdefault(target, [])
+            parent_id = None
+            if siblings and rng.random() < reply_ratio:
+                parent_id = siblings[-1] if rng.random() < depth_bias else rng.choice(siblings)
+                if depth[parent_id] >= max_depth:
+                    parent_id = None
+            depth[comment_id] = depth[parent_id] + 1 if parent_id else 0
+            siblings.append(comment_id)
+            yield {
+                "id": comment_id,
+                "content_id": c0 + target + 1,
+                "user_id": u0 + rng.randint(1, n_users),
+                "parent_id": parent_id,
+                "body": f"Generated comment {comment_id}",
+                "created_at": BASE_TIME + timedelta(seconds=i * 13),
+            }
+    def reaction_rows():
+        reaction_id = offsets.get("reactions", 0)
+        per_content = allocate(counts["reactions"], popularity, n_users)
+        for target, k in enumerate(per_content):
+            for user in rng.sample(range(1, n_users + 1), k):
+                reaction_id += 1
+                yield {
+                    "id": reaction_id,
+                    "user_id": u0 + user,
+                    "content_id": c0 + target + 1,
+                    "type": ReactionTypeEnum.like if rng.random() < like_ratio else ReactionTypeEnum.dislike,
+                    "created_at": BASE_TIME + timedelta(seconds=reaction_id),
+                }
+    def notification_rows():
+        by_category = {}
+        for content in contents:
+            if content["status"] is ContentStatusEnum.Published and content["category_id"] is not None:
+                by_category.setdefault(content["category_id"], []).append(content)
+        audience = [s for s in subscriptions if s["category_id"] in by_category]
+        if not audience:
+            return
+        first = offsets.get("notifications", 0) + 1
+        for i in range(counts["notifications"]):
+            sub = rng.choice(audience)
+            content = rng.choice(by_category[sub["category_id"]])
+            yield {
+                "id": first + i,
+                "user_id": sub["user_id"],
+                "content_id": content["id"],
+                "message": f"New {content['content_type'].value} in Category {sub['category_id']}: {content['title']}",
+                "is_read": rng.random() < read_ratio,
+                "created_at": content["created_at"] + timedelta(minutes=rng.randint(1, 600)),
+            }
+    return {
+        "users": users,
+        "categories": categories,
+        "contents": contents,
+        "subscriptions": subscriptions,
+        "comments": comment_rows(),
+        "reactions": reaction_rows(),
+        "notifications": notification_rows(),
+    }
+def _chunks(rows, size):
+    rows = iter(rows)
+    while True:
+        chunk = list(islice(rows, size))
+        if not chunk:
+            return
+        yield chunk
+def _copy_value(value):
+    if isinstance(value, Enum):
+        return value.name
+    return value
+def _copy(conn, table, chunk) -> None:
+    columns = list(chunk[0])
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in chunk:
+        writer.writerow([_copy_value(row[column]) for column in columns])
+    buffer.seek(0)
+    with conn.connection.dbapi_connection.cursor() as cursor:
+        cursor.copy_expert(
+            f"COPY {table.name} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv)", buffer
+        )
+def _uses_copy(conn) -> bool:
+    return conn.dialect.name == "postgresql" and conn.dialect.driver == "psycopg2"
+def reset_sequences(conn, tables) -> None:
+    if conn.dialect.name != "postgresql":
+        return
+    for table in tables:
+        if "id" not in table.c:
+            continue
+        conn.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 1))"
+        ))
+def write(conn, data, chunk_size=CHUNK_SIZE, use_copy=None) -> dict:
+    if use_copy is None:
+        use_copy = _uses_copy(conn)
+    tables = [db.metadata.tables[name] for name in data]
+    report = {}
+    for table in tables:
+        started = time.perf_counter()
+        rows = 0
+        for chunk in _chunks(data[table.name], chunk_size):
+            if use_copy:
+                _copy(conn, table, chunk)
+            else:
+                conn.execute(table.insert(), chunk)
+            rows += len(chunk)
+        report[table.name] = {"rows": rows, "seconds": time.perf_counter() - started}
+    reset_sequences(conn, tables)
+    if {"contents", "comments", "reactions"} & set(data):
+        counters.rebuild(conn)
+    return report
+def next_offsets(conn) -> dict:
+    offsets = {}
+    for name in TABLES:
+        table = db.metadata.tables[name]
+        if "id" in table.c:
+            offsets[name] = conn.execute(select(func.coalesce(func.max(table.c.id), 0))).scalar()
+    return offsets
+class Seeder:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["seeder"] = self
+        @app.cli.command("seed")
+        @click.option("--scale", type=click.Choice(list(SCALES)), default="small", show_default=True)
+        @click.option("--users", type=int, default=None)
+        @click.option("--categories", type=int, default=None)
+        @click.option("--contents", type=int, default=None)
+        @click.option("--comments", type=int, default=None)
+        @click.option("--reactions", type=int, default=None)
+        @click.option("--subscriptions", type=int, default=None)
+        @click.option("--notifications", type=int, default=None)
+        @click.option("--seed", "seed", type=int, default=0, show_default=True, help="Random seed.")
+        @click.option("--zipf", type=float, default=1.0, show_default=True, help="Popularity skew; 0 is uniform.")
+        @click.option("--reply-ratio", type=float, default=0.6, show_default=True)
+        @click.option("--max-depth", type=int, default=8, show_default=True, help="Deepest comment reply chain.")
+        @click.option("--depth-bias", type=float, default=0.5, show_default=True, help="Chance a reply continues the latest thread.")
+        @click.option("--password", default=DEFAULT_PASSWORD, help="Password shared by every generated user.")
+        @click.option("--chunk-size", type=int, default=CHUNK_SIZE, show_default=True)
+        @click.option("--no-copy", is_flag=True, help="Use INSERT even where COPY is available.")
+        def seed_command(scale, seed, zipf, reply_ratio, max_depth, depth_bias, password, chunk_size, no_copy, **overrides):
+            report = self.seed(
+                counts_for(scale, **overrides), seed=seed, password=password, chunk_size=chunk_size,
+                use_copy=False if no_copy else None, zipf=zipf, reply_ratio=reply_ratio,
+                max_depth=max_depth, depth_bias=depth_bias,
+            )
+            for name, entry in report.items():
+                rate = entry["rows"] / entry["seconds"] if entry["seconds"] else 0.0
+                click.echo(f"{name:14} {entry['rows']:>10} rows  {entry['seconds']:7.2f}s  {rate:>10.0f} rows/s")
+    def seed(self, counts, seed=0, password=DEFAULT_PASSWORD, chunk_size=CHUNK_SIZE, use_copy=None, **options) -> dict:
+        password_hash = hasher.generate(password)
+        with db.engine.begin() as conn:
+            data = generate(counts, seed=seed, password_hash=password_hash, offsets=next_offsets(conn), **options)
+            report = write(conn, data, chunk_size=chunk_size, use_copy=use_copy)
+        logger.info("Seeded %s", {name: entry["rows"] for name, entry in report.items()})
+        return report
+seeder = Seeder()
@@ -0,0 +1,80 @@
+import json
+import logging
+import os
+import subprocess
+import sys
+from collections import defaultdict
+import click
+logger = logging.getLogger(__name__)
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+_PROBE = """
+import json, resource, sys, time
+started = time.perf_counter()
+from backend.app import create_app
+app = create_app({config!r})
+elapsed = time.perf_counter() - started
+print(json.dumps({{
+    "seconds": elapsed,
+    "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+    "blueprints": sorted(app.blueprints),
+}}))
+"""
+def parse_importtime(lines) -> list:
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, raw = line[len("import time:"):].split("|", 2)
+        entries.append({
+            "module": raw.strip(),
+            "self_us": int(self_us),
+            "cumulative_us": int(cumulative_us),
+            "depth": (len(raw) - len(raw.lstrip()) - 1) // 2,
+        })
+    return entries
+def package_totals(entries) -> dict:
+    totals = defaultdict(int)
+    for entry in entries:
+        totals[entry["module"].split(".", 1)[0]] += entry["self_us"]
+    return dict(sorted(totals.items(), key=lambda item: item[1], reverse=True))
+class StartupProfiler:
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["startup_profiler"] = self
+        @app.cli.command("startup-profile")
+        @click.option("--config", "config", default="backend.config.DevConfig", help="Config object to start with.")
+        @click.option("--blueprints", default=None, help="Comma-separated blueprint names (APP_BLUEPRINTS).")
+        @click.option("--top", type=int, default=20, help="Number of imports and packages to list.")
+        def startup_profile_command(config, blueprints, top):
+            report = self.profile(config, blueprints=blueprints)
+            click.echo(
+                f"create_app: {report['seconds'] * 1000:.0f} ms, max RSS {report['max_rss_kb'] / 1024:.1f} MB, "
+                f"{len(report['blueprints'])} blueprints"
+            )
+            click.echo("slowest imports (cumulative):")
+            for entry in sorted(report["imports"], key=lambda e: e["cumulative_us"], reverse=True)[:top]:
+                click.echo(f"  {entry['cumulative_us'] / 1000:8.1f} ms  {entry['module']}")
+            click.echo("packages (self time):")
+            for name, self_us in list(report["packages"].items())[:top]:
+                click.echo(f"  {self_us / 1000:8.1f} ms  {name}")
+    def profile(self, config="backend.config.DevConfig", blueprints=None) -> dict:
+        env = dict(os.environ)
+        env["PYTHONPATH"] = os.pathsep.join(filter(None, [PROJECT_ROOT, env.get("PYTHONPATH")]))
+        if blueprints is not None:
+            env["APP_BLUEPRINTS"] = blueprints
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(config=config)],
+            cwd=PROJECT_ROOT,
+            env=env,
+            capture_output=True,
+            text=True,
+        )
+        if proc.returncode != 0:
+            raise click.ClickException(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "startup failed")
+        report = json.loads(proc.stdout.strip().splitlines()[-1])
+        report["imports"] = parse_importtime(proc.stderr.splitlines())
+        report["packages"] = package_totals(report["imports"])
+        return report
+startup_profiler = StartupProfiler()
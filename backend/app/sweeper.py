@@ -0,0 +1,109 @@
+import logging
+import threading
+import time
+from datetime import datetime
+import click
+from flask import current_app
+from sqlalchemy import or_
+from . import db
+from .models import EmailVerificationToken, PasswordResetToken, PhoneOTP, RefreshToken
+logger = logging.getLogger(__name__)
+def _sweep_targets(now: datetime):
+    return [
+        ("refresh_tokens", RefreshToken, RefreshToken.expires_at < now),
+        (
+            "password_reset_tokens",
+            PasswordResetToken,
+            or_(PasswordResetToken.expires_at < now, PasswordResetToken.used.is_(True)),
+        ),
+        (
+            "email_verification_tokens",
+            EmailVerificationToken,
+            or_(EmailVerificationToken.expires_at < now, EmailVerificationToken.used.is_(True)),
+        ),
+        ("phone_otps", PhoneOTP, PhoneOTP.expires_at < now),
+    ]
+class SweepStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.runs = 0
+        self.last_run_at = None
+        self.last_duration = 0.0
+        self.last_removed = {}
+        self.total_removed = {}
+    def record(self, removed: dict, duration: float) -> None:
+        with self._lock:
+            self.runs += 1
+            self.last_run_at = datetime.utcnow()
+            self.last_duration = duration
+            self.last_removed = dict(removed)
+            for table, count in removed.items():
+                self.total_removed[table] = self.total_removed.get(table, 0) + count
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "runs": self.runs,
+                "last_run_at": self.last_run_at.isoformat() if self.last_run_at else None,
+                "last_duration_seconds": self.last_duration,
+                "last_removed": dict(self.last_removed),
+                "total_removed": dict(self.total_removed),
+            }
+class TokenSweeper:
+    def __init__(self, app=None):
+        self.stats = SweepStats()
+        self._scheduler = None
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        app.extensions["token_sweeper"] = self
+        @app.cli.command("sweep-tokens")
+        @click.option("--batch-size", type=int, default=None, help="Rows deleted per transaction.")
+        @click.option("--max-batches", type=int, default=None, help="Stop each table after this many batches.")
+        def sweep_tokens_command(batch_size, max_batches):
+            removed = self.sweep(batch_size=batch_size, max_batches=max_batches)
+            for table, count in removed.items():
+                click.echo(f"{table}: {count} rows removed")
+    def sweep(self, batch_size=None, max_batches=None, now=None) -> dict:
+        batch_size = batch_size or current_app.config.get("TOKEN_SWEEP_BATCH_SIZE", 1000)
+        now = now or datetime.utcnow()
+        started = time.perf_counter()
+        removed = {}
+        for table, model, condition in _sweep_targets(now):
+            total = 0
+            batches = 0
+            while max_batches is None or batches < max_batches:
+                ids = [row_id for (row_id,) in db.session.query(model.id).filter(condition).limit(batch_size)]
+                if not ids:
+                    break
+                db.session.query(model).filter(model.id.in_(ids)).delete(synchronize_session=False)
+                db.session.commit()
+                total += len(ids)
+                batches += 1
+                if len(ids) < batch_size:
+                    break
+            removed[table] = total
+        duration = time.perf_counter() - started
+        self.stats.record(removed, duration)
+        logger.info(
+            "Token sweep removed %s rows in %.3fs: %s", sum(removed.values()), duration, removed
+        )
+        return removed
+    def start_scheduler(self, app, interval_minutes: int) -> None:
+        from apscheduler.schedulers.background import BackgroundScheduler
+        def run():
+            with app.app_context():
+                try:
+                    self.sweep()
+                except Exception:
+                    db.session.rollback()
+                    logger.exception("Scheduled token sweep failed")
+        self._scheduler = BackgroundScheduler(daemon=True)
+        self._scheduler.add_job(
+            run, "interval", minutes=interval_minutes, id="token_sweep", max_instances=1, coalesce=True
+        )
+        self._scheduler.start()
+    def shutdown(self) -> None:
+        if self._scheduler is not None:
+            self._scheduler.shutdown(wait=False)
+            self._scheduler = None
+sweeper = TokenSweeper()
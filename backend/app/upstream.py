@@ -0,0 +1,215 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeout
+import requests
+from requests.adapters import HTTPAdapter
+logger = logging.getLogger(__name__)
+class UpstreamError(Exception):
+    pass
+class _Entry:
+    __slots__ = ("value", "error", "fresh_until", "stale_until")
+    def __init__(self, value, error, fresh_until, stale_until):
+        self.value = value
+        self.error = error
+        self.fresh_until = fresh_until
+        self.stale_until = stale_until
+class UpstreamCache:
+    def __init__(self, max_entries=1024, ttl=300, stale_ttl=3600, negative_ttl=30, refresh_workers=4, wait_timeout=None):
+        self.max_entries = max_entries
+        self.wait_timeout = wait_timeout
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="upstream-refresh")
+        self.stats = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "negative_hits": 0, "fetches": 0, "errors": 0}
+    def _store(self, key, entry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    def _load(self, key, loader, ttl, future) -> None:
+        try:
+            value = loader()
+        except Exception as exc:
+            now = time.monotonic()
+            with self._lock:
+                self.stats["fetches"] += 1
+                self.stats["errors"] += 1
+                previous = self._entries.get(key)
+                if previous is not None and previous.error is None and previous.stale_until > now:
+                    previous.fresh_until = now + self.negative_ttl
+                else:
+                    self._store(key, _Entry(None, exc, now + self.negative_ttl, now + self.negative_ttl))
+                self._inflight.pop(key, None)
+            future.set_exception(exc)
+            return
+        now = time.monotonic()
+        with self._lock:
+            self.stats["fetches"] += 1
+            self._store(key, _Entry(value, None, now + ttl, now + ttl + self.stale_ttl))
+            self._inflight.pop(key, None)
+        future.set_result(value)
+    def _claim(self, key, loader, ttl):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and now < entry.fresh_until:
+                self._entries.move_to_end(key)
+                done = Future()
+                if entry.error is not None:
+                    self.stats["negative_hits"] += 1
+                    done.set_exception(UpstreamError(str(entry.error)))
+                else:
+                    self.stats["hits"] += 1
+                    done.set_result(entry.value)
+                return done, False
+            future = self._inflight.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._inflight[key] = future
+            if entry is not None and entry.error is None and now < entry.stale_until:
+                self.stats["stale_hits"] += 1
+                if leader:
+                    self._refresher.submit(self._load, key, loader, ttl, future)
+                done = Future()
+                done.set_result(entry.value)
+                return done, False
+            if leader:
+                self.stats["misses"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        return future, leader
+    def get(self, key, loader, ttl=None):
+        ttl = self.ttl if ttl is None else ttl
+        future, leader = self._claim(key, loader, ttl)
+        if leader:
+            self._load(key, loader, ttl, future)
+        try:
+            return future.result(timeout=self.wait_timeout)
+        except FutureTimeout:
+            raise UpstreamError("Timed out waiting for an in-flight upstream request") from None
+    def submit(self, key, loader, executor, ttl=None) -> Future:
+        ttl = self.ttl if ttl is None else ttl
+        future, leader = self._claim(key, loader, ttl)
+        if leader:
+            executor.submit(self._load, key, loader, ttl, future)
+        return future
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            for key in list(self.stats):
+                self.stats[key] = 0
+    def shutdown(self) -> None:
+        self._refresher.shutdown(wait=False)
+class Upstream:
+    def __init__(self, app=None):
+        self.session = None
+        self.cache = None
+        self.executor = None
+        self.timeout = (3.05, 10)
+        self._validators = OrderedDict()
+        self._validators_lock = threading.Lock()
+        self.not_modified = 0
+        if app is not None:
+            self.init_app(app)
+    def init_app(self, app):
+        if self.cache is not None:
+            self.cache.shutdown()
+        pool_size = app.config.get("UPSTREAM_POOL_SIZE", 20)
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=0)
+        self.session = requests.Session()
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self.session.headers["User-Agent"] = app.config.get("UPSTREAM_USER_AGENT", "moringa-daily-dev/1.0")
+        self.session.headers["Accept-Encoding"] = "gzip, deflate"
+        self._validators = OrderedDict()
+        self.not_modified = 0
+        self.timeout = (
+            app.config.get("UPSTREAM_CONNECT_TIMEOUT", 3.05),
+            app.config.get("UPSTREAM_READ_TIMEOUT", 10),
+        )
+        if self.executor is not None:
+            self.executor.shutdown(wait=False)
+        self.executor = ThreadPoolExecutor(
+            max_workers=app.config.get("UPSTREAM_FANOUT_WORKERS", 8), thread_name_prefix="upstream-fanout"
+        )
+        self.cache = UpstreamCache(
+            max_entries=app.config.get("UPSTREAM_CACHE_MAX_ENTRIES", 1024),
+            ttl=app.config.get("UPSTREAM_CACHE_TTL", 300),
+            stale_ttl=app.config.get("UPSTREAM_CACHE_STALE_TTL", 3600),
+            negative_ttl=app.config.get("UPSTREAM_CACHE_NEGATIVE_TTL", 30),
+            refresh_workers=app.config.get("UPSTREAM_REFRESH_WORKERS", 4),
+            wait_timeout=app.config.get("UPSTREAM_WAIT_TIMEOUT") or sum(self.timeout),
+        )
+        app.extensions["upstream"] = self
+    @staticmethod
+    def conditional_headers(etag=None, last_modified=None) -> dict:
+        headers = {}
+        if etag:
+            headers["If-None-Match"] = etag
+        if last_modified:
+            headers["If-Modified-Since"] = last_modified
+        return headers
+    def get(self, url, params=None, headers=None, stream=False):
+        try:
+            response = self.session.get(url, params=params, headers=headers, timeout=self.timeout, stream=stream)
+            if response.status_code != 304:
+                response.raise_for_status()
+            return response
+        except requests.RequestException as exc:
+            logger.warning("Upstream request to %s failed: %s", url, exc)
+            raise UpstreamError(str(exc)) from exc
+    def get_json(self, url, params=None):
+        try:
+            return self.get(url, params).json()
+        except ValueError as exc:
+            logger.warning("Upstream response from %s is not JSON: %s", url, exc)
+            raise UpstreamError(str(exc)) from exc
+    def _remember_validators(self, key, response, value) -> None:
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        with self._validators_lock:
+            if not etag and not last_modified:
+                self._validators.pop(key, None)
+                return
+            self._validators[key] = (etag, last_modified, value)
+            self._validators.move_to_end(key)
+            while len(self._validators) > self.cache.max_entries:
+                self._validators.popitem(last=False)
+    def _json_loader(self, key, url, params, transform):
+        def load():
+            with self._validators_lock:
+                known = self._validators.get(key)
+            headers = self.conditional_headers(*known[:2]) if known else None
+            response = self.get(url, params, headers=headers)
+            if response.status_code == 304 and known:
+                self.not_modified += 1
+                return known[2]
+            try:
+                data = response.json()
+            except ValueError as exc:
+                logger.warning("Upstream response from %s is not JSON: %s", url, exc)
+                raise UpstreamError(str(exc)) from exc
+            if transform is not None:
+                try:
+                    data = transform(data)
+                except (KeyError, TypeError, AttributeError) as exc:
+                    logger.warning("Unexpected payload from %s: %r", url, exc)
+                    raise UpstreamError("Unexpected upstream response") from exc
+            self._remember_validators(key, response, data)
+            return data
+        return load
+    def fetch_json(self, url, params=None, transform=None, ttl=None):
+        key = (url, tuple(sorted((params or {}).items())))
+        return self.cache.get(key, self._json_loader(key, url, params, transform), ttl=ttl)
+    def fetch_json_async(self, url, params=None, transform=None, ttl=None) -> Future:
+        key = (url, tuple(sorted((params or {}).items())))
+        return self.cache.submit(key, self._json_loader(key, url, params, transform), self.executor, ttl=ttl)
+upstream = Upstream()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from backend.benchmarks.common import make_app, summarize
+def run(async_audit, requests):
+    from backend.app.models import AuditLog
+    app = make_app(AUDIT_ASYNC=async_audit)
+    client = app.test_client()
+    creds = {"email": "bench.audit@example.com", "password": "Bench!Pass#2024"}
+    client.post("/auth/register", json=dict(creds, name="Bench", confirm_password=creds["password"], role="TechWriter"))
+    token = client.post("/auth/login", json=creds).get_json()["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+    cid = client.post("/content", json={"title": "Bench", "content_type": "article"}, headers=headers).get_json()["id"]
+    samples = []
+    start = time.perf_counter()
+    for i in range(requests):
+        t0 = time.perf_counter()
+        r = client.put(f"/content/{cid}", json={"title": f"Bench {i}"}, headers=headers)
+        samples.append(time.perf_counter() - t0)
+        assert r.status_code == 200
+    stats = summarize(samples, time.perf_counter() - start)
+    writer = app.extensions["audit_writer"]
+    writer.flush()
+    with app.app_context():
+        stats["audit_rows"] = AuditLog.query.count()
+    writer.shutdown()
+    return stats
+def main():
+    parser = argparse.ArgumentParser(description="PUT /content/<id> latency with sync vs async audit logging")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+    print(f"{'audit mode':<10} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'rows':>6}")
+    for label, async_audit in (("sync", False), ("async", True)):
+        stats = run(async_audit, args.requests)
+        print(f"{label:<10} {stats['rps']:>8.0f} {stats['p50_ms']:>8.3f} {stats['p99_ms']:>8.3f} {stats['audit_rows']:>6}")
+if __name__ == "__main__":
+    main()
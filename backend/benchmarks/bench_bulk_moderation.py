@@ -0,0 +1,53 @@
+import argparse
+import time
+from backend.benchmarks.common import make_app
+def setup(items):
+    from sqlalchemy import select, update
+    from backend.app import db
+    from backend.app.models import Content, ContentStatusEnum
+    from backend.app.seeding import counts_for, seeder
+    app = make_app(ADMIN_BULK_MAX_IDS=max(items, 1000))
+    with app.app_context():
+        seeder.seed(counts_for("tiny", contents=items, comments=0, reactions=0, notifications=0), seed=1)
+        ids = list(db.session.execute(select(Content.id).order_by(Content.id)).scalars())
+    client = app.test_client()
+    creds = {"email": "bench.moderator@example.com", "password": "Bench!Pass#2024"}
+    client.post("/auth/register", json=dict(creds, name="Moderator", confirm_password=creds["password"], role="Admin"))
+    token = client.post("/auth/login", json=creds).get_json()["access_token"]
+    def reset():
+        with app.app_context():
+            db.session.execute(update(Content).values(status=ContentStatusEnum.Draft))
+            db.session.commit()
+    return app, client, {"Authorization": f"Bearer {token}"}, ids, reset
+def per_item(client, headers, ids):
+    start = time.perf_counter()
+    for cid in ids:
+        assert client.post(f"/admin/contents/{cid}/approve", headers=headers).status_code == 200
+    return time.perf_counter() - start
+def bulk(client, headers, ids, batch):
+    start = time.perf_counter()
+    for i in range(0, len(ids), batch):
+        r = client.post("/admin/contents/bulk/approve", json={"ids": ids[i:i + batch]}, headers=headers)
+        assert r.status_code == 200
+    return time.perf_counter() - start
+def main():
+    parser = argparse.ArgumentParser(description="Approving N drafts one request at a time vs. the bulk endpoint")
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--batch", type=int, default=1000, help="ids per bulk request")
+    args = parser.parse_args()
+    from backend.app import db
+    from backend.app.models import Notification
+    app, client, headers, ids, reset = setup(args.items)
+    reset()
+    single = per_item(client, headers, ids)
+    reset()
+    batched = bulk(client, headers, ids, args.batch)
+    with app.app_context():
+        notified = db.session.query(Notification).count()
+    print(f"{'path':<22} {'total ms':>10} {'per item us':>12} {'requests':>9}")
+    print(f"{'per-item approve':<22} {single * 1000:>10.1f} {single / len(ids) * 1e6:>12.1f} {len(ids):>9}")
+    requests = -(-len(ids) // args.batch)
+    print(f"{'bulk approve':<22} {batched * 1000:>10.1f} {batched / len(ids) * 1e6:>12.1f} {requests:>9}")
+    print(f"speedup {single / batched:.1f}x; bulk path also fanned out {notified} notifications")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,63 @@
+import argparse
+import random
+import time
+from backend.benchmarks.common import make_app, summarize
+def seed(app, contents, categories, reactions):
+    from backend.app import db
+    from backend.app.models import Category, Content, ContentTypeEnum, Reaction, ReactionTypeEnum, User
+    with app.app_context():
+        users = [User(email=f"cache{i}@example.com", name=f"User {i}", password_hash=None) for i in range(reactions)]
+        db.session.add_all(users)
+        db.session.flush()
+        db.session.add_all(Category(name=f"Category {i}", created_by=users[0].id) for i in range(categories))
+        items = [
+            Content(title=f"Post {i}", body="lorem " * 200, content_type=ContentTypeEnum.article, author_id=users[0].id)
+            for i in range(contents)
+        ]
+        db.session.add_all(items)
+        db.session.flush()
+        for content in items[:50]:
+            for user in users:
+                db.session.add(Reaction(
+                    user_id=user.id,
+                    content_id=content.id,
+                    type=ReactionTypeEnum.like if user.id % 3 else ReactionTypeEnum.dislike,
+                ))
+        db.session.commit()
+        return [c.id for c in items[:50]]
+def main():
+    parser = argparse.ArgumentParser(description="Read latency of cached endpoints with the cache off and on")
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--contents", type=int, default=500)
+    parser.add_argument("--categories", type=int, default=50)
+    parser.add_argument("--reactions", type=int, default=40, help="Reactions per hot content item")
+    args = parser.parse_args()
+    app = make_app(CACHE_ENABLED=True)
+    hot_ids = seed(app, args.contents, args.categories, args.reactions)
+    client = app.test_client()
+    rng = random.Random(7)
+    endpoints = {
+        "get_content": lambda: f"/content/{rng.choice(hot_ids)}",
+        "list_categories": lambda: "/categories",
+        "list_reactions": lambda: f"/content/{rng.choice(hot_ids)}/reactions",
+    }
+    from backend.app.cache import cache
+    for name, path in endpoints.items():
+        for enabled in (False, True):
+            app.config["CACHE_ENABLED"] = enabled
+            cache.clear()
+            cache.stats.reset()
+            samples = []
+            start = time.perf_counter()
+            for _ in range(args.requests):
+                t0 = time.perf_counter()
+                client.get(path())
+                samples.append(time.perf_counter() - t0)
+            stats = summarize(samples, time.perf_counter() - start)
+            ratio = cache.stats.as_dict()["hit_ratio"]
+            print(
+                f"{name} cache={'on ' if enabled else 'off'}: p50={stats['p50_ms']:.2f}ms "
+                f"p99={stats['p99_ms']:.2f}ms rps={stats['rps']:.0f} hit_ratio={ratio:.2f}"
+            )
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+import argparse
+import time
+from backend.benchmarks.common import make_app, summarize
+def group_by_stats():
+    from sqlalchemy import func, select
+    from backend.app import db
+    from backend.app.models import Comment, Content, Reaction
+    stats = {}
+    for attr in ("status", "content_type", "category_id"):
+        column = getattr(Content, attr)
+        stats[attr] = dict(db.session.execute(select(column, func.count()).group_by(column)).all())
+    stats["reactions"] = dict(db.session.execute(select(Reaction.type, func.count()).group_by(Reaction.type)).all())
+    stats["comments"] = db.session.execute(select(func.count()).select_from(Comment)).scalar()
+    return stats
+def timed_requests(fn, requests):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+def main():
+    parser = argparse.ArgumentParser(description="GET /content/stats from maintained counters vs. full-table GROUP BYs")
+    parser.add_argument("--contents", type=int, default=1000000)
+    parser.add_argument("--requests", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    from backend.app import db
+    from backend.app.seeding import counts_for, seeder
+    app = make_app()
+    started = time.perf_counter()
+    with app.app_context():
+        seeder.seed(
+            counts_for("medium", contents=args.contents, comments=args.contents, reactions=args.contents),
+            seed=args.seed,
+        )
+    print(f"seeded {args.contents} contents in {time.perf_counter() - started:.1f}s")
+    client = app.test_client()
+    creds = {"email": "bench.stats@example.com", "password": "Bench!Pass#2024"}
+    client.post("/auth/register", json=dict(creds, name="Stats", confirm_password=creds["password"], role="Admin"))
+    headers = {"Authorization": f"Bearer {client.post('/auth/login', json=creds).get_json()['access_token']}"}
+    def counters_endpoint():
+        assert client.get("/content/stats", headers=headers).status_code == 200
+    def group_by():
+        with app.app_context():
+            group_by_stats()
+            db.session.remove()
+    print(f"{'source':<22} {'p50 ms':>10} {'p99 ms':>10}")
+    for label, fn in (("maintained counters", counters_endpoint), ("GROUP BY scans", group_by)):
+        stats = timed_requests(fn, args.requests)
+        print(f"{label:<22} {stats['p50_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
+    body = client.get("/content/stats", headers=headers).get_json()
+    print(f"totalPosts={body['totalPosts']} likes={body['likes']} comments={body['comments']}")
+if __name__ == "__main__":
+    main()
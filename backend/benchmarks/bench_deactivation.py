@@ -0,0 +1,34 @@
+import argparse
+import time
+from backend.benchmarks.common import make_app
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost of the deactivated-user check")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--deactivated", type=int, default=100000, help="user ids preloaded into the set")
+    args = parser.parse_args()
+    from backend.app import db
+    from backend.app.models import User
+    from backend.app.revocation import revocations
+    app = make_app()
+    with app.app_context():
+        db.session.add(User(email="bench.active@example.com", name="Bench", password_hash=None))
+        db.session.commit()
+        deactivated = app.extensions["user_deactivations"]
+        for user_id in range(10 ** 9, 10 ** 9 + args.deactivated):
+            deactivated.update(user_id, active=False)
+        payloads = [{"sub": "1", "type": "access"}, {"sub": str(10 ** 9), "type": "access"}]
+        for payload in payloads:
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                revocations._check_blocklist({}, payload)
+            per_check = (time.perf_counter() - start) / args.iterations * 1e6
+            state = "deactivated" if revocations._check_blocklist({}, payload) else "active"
+            print(f"blocklist check ({state} user, {len(deactivated)} ids): {per_check:.3f} us")
+        iterations = max(1, args.iterations // 100)
+        start = time.perf_counter()
+        for _ in range(iterations):
+            db.session.query(User.is_active).filter(User.id == 1).scalar()
+        per_query = (time.perf_counter() - start) / iterations * 1e6
+        print(f"naive is_active query: {per_query:.3f} us")
+if __name__ == "__main__":
+    main()
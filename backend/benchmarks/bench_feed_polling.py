@@ -0,0 +1,91 @@
+import argparse
+import gzip
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import requests
+from backend.benchmarks.bench_ingest import build_rss
+from backend.benchmarks.common import make_app
+class FeedServer:
+    def __init__(self, items):
+        self.items = items
+        self.version = 0
+        self.bytes_sent = 0
+        self.responses = {}
+        self._publish()
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                body, etag = server.body, server.etag
+                if self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.end_headers()
+                    server.responses[304] = server.responses.get(304, 0) + 1
+                    return
+                if "gzip" in self.headers.get("Accept-Encoding", ""):
+                    body = server.gzipped
+                    self.send_response(200)
+                    self.send_header("Content-Encoding", "gzip")
+                else:
+                    self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+                server.bytes_sent += len(body)
+                server.responses[200] = server.responses.get(200, 0) + 1
+            def log_message(self, *a):
+                pass
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.httpd.server_address[1]}/feed.xml"
+        threading.Thread(target=self.httpd.serve_forever, daemon=True).start()
+    def _publish(self):
+        self.body = build_rss(self.version, self.items)
+        self.gzipped = gzip.compress(self.body)
+        self.etag = '"%s"' % hashlib.sha1(self.body).hexdigest()
+    def publish(self):
+        self.version += 1
+        self._publish()
+    def reset(self):
+        self.version = 0
+        self.bytes_sent = 0
+        self.responses = {}
+        self._publish()
+def main():
+    parser = argparse.ArgumentParser(description="Bytes and time spent polling a feed for a simulated day")
+    parser.add_argument("--items", type=int, default=500)
+    parser.add_argument("--poll-minutes", type=int, default=5)
+    parser.add_argument("--change-minutes", type=int, default=60)
+    args = parser.parse_args()
+    polls = 24 * 60 // args.poll_minutes
+    every = max(1, args.change_minutes // args.poll_minutes)
+    server = FeedServer(args.items)
+    app = make_app()
+    from backend.app.ingestion import ingestor, parse_feed
+    source = {"name": "bench", "url": server.url, "content_type": "audio"}
+    def naive(state):
+        response = requests.get(server.url, headers={"Accept-Encoding": "identity"}, timeout=10)
+        return parse_feed(response.content), state
+    def conditional(state):
+        items, validators = ingestor._fetch(source, *state)
+        return items, validators
+    with app.app_context():
+        for label, poll in (("unconditional, identity", naive), ("conditional + gzip", conditional)):
+            server.reset()
+            state = (None, None)
+            parsed = 0
+            start = time.perf_counter()
+            for i in range(polls):
+                if i and i % every == 0:
+                    server.publish()
+                items, state = poll(state)
+                parsed += len(items or [])
+            elapsed = time.perf_counter() - start
+            print(
+                f"{label}: {polls} polls, {server.bytes_sent / 1e6:.2f} MB sent, "
+                f"{elapsed:.2f}s wall, {parsed} items parsed, responses={server.responses}"
+            )
+    server.httpd.shutdown()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import time
+from sqlalchemy import event
+from backend.benchmarks.common import make_app, summarize
+def main():
+    parser = argparse.ArgumentParser(description="SQL statements and latency of the content write endpoints")
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--identity-ttl", type=int, default=30)
+    args = parser.parse_args()
+    app = make_app(IDENTITY_CACHE_TTL=args.identity_ttl)
+    from backend.app import db, hasher
+    from backend.app.models import Role, User, UserRole
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        writer = User(email="writer@example.com", name="Writer", password_hash=hasher.generate("Pw!12345678"))
+        db.session.add(writer)
+        db.session.flush()
+        role = Role.query.filter_by(name="TechWriter").first() or Role(name="TechWriter")
+        db.session.add(role)
+        db.session.flush()
+        db.session.add(UserRole(user_id=writer.id, role_id=role.id))
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(writer.id))}"}
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(1))
+    client = app.test_client()
+    payload = {"title": "Bench", "body": "x", "content_type": "article", "status": "Draft"}
+    endpoints = {
+        "create_content": lambda cid: client.post("/content", json=payload, headers=headers),
+        "update_content": lambda cid: client.put(f"/content/{cid}", json={"title": "Edited"}, headers=headers),
+        "delete_content": lambda cid: client.delete(f"/content/{cid}", headers=headers),
+    }
+    ids = []
+    for name, call in endpoints.items():
+        samples = []
+        counts = []
+        start = time.perf_counter()
+        for i in range(args.iterations):
+            before = len(statements)
+            t0 = time.perf_counter()
+            resp = call(None if name == "create_content" else ids[i])
+            samples.append(time.perf_counter() - t0)
+            counts.append(len(statements) - before)
+            assert resp.status_code in (200, 201), resp.get_json()
+            if name == "create_content":
+                ids.append(resp.get_json()["id"])
+        stats = summarize(samples, time.perf_counter() - start)
+        print(
+            f"{name}: {sum(counts) / len(counts):.1f} statements/request "
+            f"(first {counts[0]}, steady {counts[-1]}), p50={stats['p50_ms']:.2f}ms"
+        )
+if __name__ == "__main__":
+    main()
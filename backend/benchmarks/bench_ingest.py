@@ -0,0 +1,53 @@
+import argparse
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from xml.sax.saxutils import escape
+from backend.benchmarks.common import make_app
+def build_rss(source: int, items: int) -> bytes:
+    entries = "".join(
+        f"<item><title>{escape(f'Item {source}-{i}')}</title><guid>src{source}-{i}</guid>"
+        f"<link>https://feeds.example/{source}/{i}</link><description>{'lorem ipsum ' * 20}</description>"
+        f"<pubDate>Mon, 05 Jan 2026 10:{i % 60:02d}:00 +0000</pubDate>"
+        f"<enclosure url=\"https://cdn.example/{source}/{i}.mp3\" type=\"audio/mpeg\"/></item>"
+        for i in range(items)
+    )
+    return f"<?xml version=\"1.0\"?><rss version=\"2.0\"><channel><title>Feed {source}</title>{entries}</channel></rss>".encode()
+def main():
+    parser = argparse.ArgumentParser(description="Feed ingestion throughput from local fixture feeds")
+    parser.add_argument("--sources", type=int, default=8)
+    parser.add_argument("--items", type=int, default=2000, help="Items per feed")
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+    documents = {f"/feed{s}.xml": build_rss(s, args.items) for s in range(args.sources)}
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = documents[self.path]
+            self.send_response(200)
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        def log_message(self, *a):
+            pass
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    app = make_app(
+        FEED_INGEST_WORKERS=args.workers,
+        FEED_SOURCES=[
+            {"name": f"feed{s}", "url": f"{base}/feed{s}.xml", "content_type": "audio"}
+            for s in range(args.sources)
+        ],
+    )
+    from backend.app.ingestion import ingestor
+    total = args.sources * args.items
+    with app.app_context():
+        for label in ("initial insert", "re-ingest (upsert)"):
+            start = time.perf_counter()
+            results = ingestor.ingest()
+            elapsed = time.perf_counter() - start
+            assert all(r["error"] is None for r in results.values()), results
+            print(f"{label}: {total} items in {elapsed:.2f}s ({total / elapsed:,.0f} items/s)")
+    server.shutdown()
+if __name__ == "__main__":
+    main()
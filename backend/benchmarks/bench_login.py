@@ -0,0 +1,44 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.benchmarks.common import make_app, summarize
+EMAIL = "bench.login@example.com"
+PASSWORD = "Bench!Pass#2024"
+def run(app, clients, duration):
+    samples = []
+    deadline = time.perf_counter() + duration
+    def worker():
+        client = app.test_client()
+        local = []
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            r = client.post("/auth/login", json={"email": EMAIL, "password": PASSWORD})
+            if r.status_code == 200:
+                local.append(time.perf_counter() - start)
+        return local
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        for local in pool.map(lambda _: worker(), range(clients)):
+            samples.extend(local)
+    return summarize(samples, time.perf_counter() - start)
+def main():
+    parser = argparse.ArgumentParser(description="Login throughput by bcrypt cost and pool size")
+    parser.add_argument("--costs", default="4,8,10,12")
+    parser.add_argument("--pools", default="1,2,4,8")
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=5.0)
+    args = parser.parse_args()
+    from backend.app import db, hasher
+    from backend.app.models import User
+    print(f"{'cost':>4} {'pool':>4} {'logins/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for cost in [int(c) for c in args.costs.split(",")]:
+        for pool in [int(p) for p in args.pools.split(",")]:
+            app = make_app(BCRYPT_LOG_ROUNDS=cost, PASSWORD_HASH_WORKERS=pool)
+            with app.app_context():
+                db.session.add(User(email=EMAIL, name="Bench", password_hash=hasher.generate(PASSWORD)))
+                db.session.commit()
+            stats = run(app, args.clients, args.duration)
+            print(f"{cost:>4} {pool:>4} {stats['rps']:>9.1f} {stats['p50_ms']:>8.1f} {stats['p99_ms']:>8.1f}")
+            hasher.shutdown()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import argparse
+import time
+from flask import Response
+from backend.benchmarks.common import make_app
+def per_call_us(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return (time.perf_counter() - start) / iterations * 1e6
+def main():
+    parser = argparse.ArgumentParser(description="Per-request cost of the metrics hooks")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--routes", type=int, default=40, help="distinct routes already recorded")
+    args = parser.parse_args()
+    from backend.app import db
+    from backend.app.metrics import metrics
+    app = make_app()
+    response = Response("ok")
+    for i in range(args.routes):
+        with app.test_request_context(f"/content/{i}"):
+            metrics._start()
+            metrics._record(response)
+    with app.test_request_context("/content/1"):
+        hooks = per_call_us(lambda: metrics._record(response) if metrics._start() is None else None, args.iterations)
+        print(f"before_request + after_request hooks: {hooks:.3f} us/request")
+    with app.app_context():
+        conn = db.engine.connect()
+        cursor_events = per_call_us(
+            lambda: (metrics._before_cursor_execute(conn, None, "", (), None, False),
+                     metrics._after_cursor_execute(conn, None, "", (), None, False)),
+            args.iterations,
+        )
+        conn.close()
+        print(f"cursor execute events: {cursor_events:.3f} us/statement")
+    start = time.perf_counter()
+    metrics.render()
+    print(f"render /metrics ({args.routes} routes): {(time.perf_counter() - start) * 1000:.2f} ms")
+    disabled = make_app(METRICS_ENABLED=False)
+    enabled = make_app()
+    for label, target in (("disabled", disabled), ("enabled", enabled)):
+        client = target.test_client()
+        for _ in range(200):
+            client.get("/content/1/reactions")
+        samples = []
+        for _ in range(args.requests):
+            t0 = time.perf_counter()
+            client.get("/content/1/reactions")
+            samples.append(time.perf_counter() - t0)
+        samples.sort()
+        print(f"GET 404 via test client, metrics {label}: p50={samples[len(samples) // 2] * 1e6:.1f} us")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+from backend.benchmarks.common import make_app, summarize
+PAYLOADS = {
+    "yt": {"items": [{"guid": f"v{i}", "title": f"Video {i}", "link": f"https://yt/{i}", "pubDate": f"2026-01-{i % 28 + 1:02d} 09:00:00"} for i in range(15)]},
+    "pod": {"items": [{"title": f"Ep {i}", "pubDate": f"2026-01-{i % 28 + 1:02d} 10:00:00", "enclosure": {"url": f"https://a/{i}.mp3"}} for i in range(10)]},
+    "/api/articles": [{"id": i, "title": f"Post {i}", "url": f"https://dev.to/{i}", "published_at": f"2026-01-{i % 28 + 1:02d}T11:00:00Z"} for i in range(30)],
+}
+def start_stub(delays):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            key = parse_qs(parsed.query).get("rss_url", [parsed.path])[0]
+            time.sleep(delays.get(key, 0))
+            payload = json.dumps(PAYLOADS[key]).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        def log_message(self, *a):
+            pass
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+def run(client, paths, iterations):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        for path in paths:
+            client.get(path)
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+def main():
+    parser = argparse.ArgumentParser(description="Sequential proxy calls vs the /proxy/feed fan-in")
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--youtube-delay", type=float, default=0.2)
+    parser.add_argument("--devto-delay", type=float, default=0.3)
+    parser.add_argument("--podcast-delay", type=float, default=0.25)
+    parser.add_argument("--slow-delay", type=float, default=3.0, help="Podcast delay for the slow-upstream run")
+    args = parser.parse_args()
+    delays = {"yt": args.youtube_delay, "/api/articles": args.devto_delay, "pod": args.podcast_delay}
+    server, base = start_stub(delays)
+    app = make_app(
+        UPSTREAM_CACHE_TTL=0,
+        UPSTREAM_CACHE_STALE_TTL=0,
+        PROXY_RSS2JSON_URL=base + "/rss",
+        PROXY_DEVTO_API_URL=base + "/api",
+        PROXY_YOUTUBE_FEED_URL="yt",
+        PROXY_PODCAST_FEED_URL="pod",
+    )
+    client = app.test_client()
+    sequential = ["/proxy/youtube-videos", "/proxy/devto-articles", "/proxy/podcasts"]
+    for label, paths in (("sequential (3 calls)", sequential), ("fan-in /proxy/feed", ["/proxy/feed"])):
+        stats = run(client, paths, args.iterations)
+        print(f"{label}: p50={stats['p50_ms']:.0f}ms p95={stats['p95_ms']:.0f}ms")
+    delays["pod"] = args.slow_delay
+    stats = run(client, sequential, max(1, args.iterations // 4))
+    print(f"sequential with slow podcasts ({args.slow_delay}s): p50={stats['p50_ms']:.0f}ms")
+    stats = run(client, ["/proxy/feed"], max(1, args.iterations // 4))
+    print(f"fan-in with slow podcasts: p50={stats['p50_ms']:.0f}ms (PROXY_FEED_TIMEOUT={app.config['PROXY_FEED_TIMEOUT']}s)")
+    server.shutdown()
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+import argparse
+import time
+from backend.benchmarks.common import make_app
+def main():
+    parser = argparse.ArgumentParser(description="Per-request overhead of the rate limiter")
+    parser.add_argument("--iterations", type=int, default=200000)
+    parser.add_argument("--keys", type=int, default=10000)
+    args = parser.parse_args()
+    from flask import jsonify
+    from backend.app.ratelimit import MemoryBackend, limiter, rate_limit
+    backend = MemoryBackend()
+    keys = [f"login:ip:10.0.{i // 256}.{i % 256}" for i in range(args.keys)]
+    start = time.perf_counter()
+    for i in range(args.iterations):
+        backend.hit(keys[i % args.keys], 30, 60)
+    per_hit = (time.perf_counter() - start) / args.iterations * 1e6
+    print(f"backend hit: {per_hit:.2f} us")
+    app = make_app(RATELIMIT_ENABLED=True, RATELIMIT_LIMITS={
+        "bench": {"ip": (30, 1e-6), "identifier": (10, 1e-6)},
+    })
+    def view():
+        return "ok"
+    limited = rate_limit("bench", identifier_field="email")(view)
+    with app.test_request_context("/auth/login", method="POST", json={"email": "bench@example.com"}):
+        limiter.reset()
+        for fn, label in ((view, "undecorated view"), (limited, "rate-limited view")):
+            start = time.perf_counter()
+            for _ in range(args.iterations):
+                fn()
+            elapsed = (time.perf_counter() - start) / args.iterations * 1e6
+            print(f"{label}: {elapsed:.2f} us")
+            if fn is view:
+                baseline = elapsed
+        print(f"limiter overhead per request: {elapsed - baseline:.2f} us (budget 50 us)")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+import argparse
+import time
+from sqlalchemy import event
+from backend.benchmarks.common import make_app, summarize
+def main():
+    parser = argparse.ArgumentParser(description="/auth/refresh requests per second")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--revoked", type=int, default=10000, help="revoked JTIs preloaded into the store")
+    args = parser.parse_args()
+    from backend.app import db
+    app = make_app()
+    client = app.test_client()
+    creds = {"email": "bench.refresh@example.com", "password": "Bench!Pass#2024"}
+    client.post("/auth/register", json=dict(creds, name="Bench", confirm_password=creds["password"]))
+    rt = client.post("/auth/login", json=creds).get_json()["refresh_token"]
+    headers = {"Authorization": f"Bearer {rt}"}
+    with app.app_context():
+        store = app.extensions["token_revocation"]
+        for i in range(args.revoked):
+            store.add(f"revoked-{i}", None)
+        engine = db.engine
+    queries = []
+    event.listen(engine, "before_cursor_execute", lambda *a: queries.append(1))
+    samples = []
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        t0 = time.perf_counter()
+        r = client.post("/auth/refresh", headers=headers)
+        samples.append(time.perf_counter() - t0)
+        assert r.status_code == 200, r.get_json()
+    stats = summarize(samples, time.perf_counter() - start)
+    print(f"refresh: {stats['rps']:.0f} req/s  p50={stats['p50_ms']:.3f}ms  p99={stats['p99_ms']:.3f}ms")
+    print(f"db queries per request: {len(queries) / args.requests:.4f}")
+if __name__ == "__main__":
+    main()
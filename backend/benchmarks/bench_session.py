@@ -0,0 +1,78 @@
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from sqlalchemy import event
+from backend.benchmarks.common import make_app, summarize
+def main():
+    parser = argparse.ArgumentParser(description="Read-path cost with a crowded identity map")
+    parser.add_argument("--iterations", type=int, default=100)
+    parser.add_argument("--objects", type=int, default=5000, help="objects loaded into the session before each request")
+    args = parser.parse_args()
+    app = make_app()
+    from backend.app import db, hasher
+    from backend.app.models import Category, Content, ContentStatusEnum, ContentTypeEnum, PasswordResetToken, User
+    from flask_jwt_extended import create_access_token
+    with app.app_context():
+        user = User(email="reader@example.com", name="Reader", password_hash=hasher.generate("Pw!12345678"))
+        category = Category(name="Bench")
+        db.session.add_all([user, category])
+        db.session.flush()
+        db.session.bulk_insert_mappings(Content, [
+            {
+                "title": f"Post {i}",
+                "body": "x" * 200,
+                "content_type": ContentTypeEnum.article,
+                "status": ContentStatusEnum.Published,
+                "author_id": user.id,
+                "category_id": category.id,
+            }
+            for i in range(args.objects)
+        ])
+        tokens = [str(uuid.uuid4()) for _ in range(args.iterations)]
+        db.session.bulk_insert_mappings(PasswordResetToken, [
+            {"user_id": user.id, "token": token, "expires_at": datetime.utcnow() + timedelta(hours=1)}
+            for token in tokens
+        ])
+        db.session.commit()
+        headers = {"Authorization": f"Bearer {create_access_token(identity=str(user.id))}"}
+        user_id = user.id
+    client = app.test_client()
+    endpoints = {
+        "recommendations": lambda i: client.get("/recommendations?per_page=20", headers=headers),
+        "request_password_reset": lambda i: client.post(
+            "/auth/request-password-reset", json={"email": "reader@example.com"}
+        ),
+        "reset_password": lambda i: client.post("/auth/reset-password", json={
+            "token": tokens[i], "new_password": "Newpass!123",
+        }),
+    }
+    with app.app_context():
+        statements = []
+        event.listen(db.engine, "before_cursor_execute", lambda *a: statements.append(1))
+        for name, call in endpoints.items():
+            samples = []
+            counts = []
+            reloads = []
+            for i in range(args.iterations):
+                loaded = Content.query.all()
+                db.session.get(User, user_id)
+                before = len(statements)
+                t0 = time.perf_counter()
+                resp = call(i)
+                samples.append(time.perf_counter() - t0)
+                counts.append(len(statements) - before)
+                assert resp.status_code == 200, (name, resp.get_json())
+                before = len(statements)
+                sum(len(c.title) for c in loaded)
+                reloads.append(len(statements) - before)
+                db.session.remove()
+            stats = summarize(samples, sum(samples))
+            print(
+                f"{name}: {sum(counts) / len(counts):.1f} statements/request, "
+                f"p50={stats['p50_ms']:.2f}ms p95={stats['p95_ms']:.2f}ms, "
+                f"{sum(reloads) / len(reloads):.0f} reloads of previously loaded objects "
+                f"({args.objects} objects in the identity map)"
+            )
+if __name__ == "__main__":
+    main()
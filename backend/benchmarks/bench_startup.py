@@ -0,0 +1,49 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from backend.benchmarks.common import PROJECT_ROOT
+PROBE = """
+import json, os, resource, time
+started = time.perf_counter()
+from backend.app import create_app
+from backend.config import TestConfig
+config = type("ProbeConfig", (TestConfig,), {
+    "DB_MIGRATIONS_ENABLED": os.environ["DB_MIGRATIONS_ENABLED"] == "true",
+    "BLUEPRINTS": os.environ["APP_BLUEPRINTS"].split(",") if os.environ.get("APP_BLUEPRINTS") else None,
+})
+app = create_app(config)
+print(json.dumps({"seconds": time.perf_counter() - started,
+                  "max_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "blueprints": len(app.blueprints)}))
+"""
+def run(env_overrides, runs):
+    env = dict(os.environ, PYTHONPATH=PROJECT_ROOT, **env_overrides)
+    samples = []
+    for _ in range(runs):
+        proc = subprocess.run([sys.executable, "-c", PROBE], cwd=PROJECT_ROOT, env=env, capture_output=True, text=True)
+        if proc.returncode != 0:
+            raise SystemExit(proc.stderr)
+        samples.append(json.loads(proc.stdout.strip().splitlines()[-1]))
+    return samples
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start time and RSS of create_app in a fresh interpreter")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--public-blueprints", default="content,categories,comments,reactions,recommendations,proxy")
+    args = parser.parse_args()
+    profiles = {
+        "full app": {"DB_MIGRATIONS_ENABLED": "true"},
+        "public API worker": {"APP_BLUEPRINTS": args.public_blueprints, "DB_MIGRATIONS_ENABLED": "false"},
+    }
+    for label, overrides in profiles.items():
+        samples = run(overrides, args.runs)
+        seconds = [s["seconds"] * 1000 for s in samples]
+        rss = [s["max_rss_kb"] / 1024 for s in samples]
+        print(
+            f"{label}: {samples[0]['blueprints']} blueprints, create_app median {statistics.median(seconds):.0f} ms "
+            f"(min {min(seconds):.0f}), max RSS median {statistics.median(rss):.1f} MB"
+        )
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+import argparse
+import time
+import uuid
+from datetime import datetime, timedelta
+from backend.benchmarks.common import make_app, summarize
+CHUNK = 50000
+def populate(db, model, rows, factory):
+    table = model.__table__
+    for start in range(0, rows, CHUNK):
+        batch = [factory(i) for i in range(start, min(rows, start + CHUNK))]
+        db.session.execute(table.insert(), batch)
+        db.session.commit()
+def measure(fn, repeat):
+    samples = []
+    start = time.perf_counter()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - t0)
+    return summarize(samples, time.perf_counter() - start)
+def main():
+    parser = argparse.ArgumentParser(description="Token/OTP lookup latency before and after a sweep")
+    parser.add_argument("--rows", type=int, default=500000, help="stale rows per table (5000000 for the full run)")
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--batch-size", type=int, default=10000)
+    args = parser.parse_args()
+    from backend.app import db
+    from backend.app.models import PasswordResetToken, PhoneOTP, RefreshToken, User
+    from backend.app.sweeper import sweeper
+    app = make_app()
+    now = datetime.utcnow()
+    past = now - timedelta(days=1)
+    with app.app_context():
+        db.session.add(User(id=1, email="bench.sweep@example.com", name="Bench", password_hash=None))
+        db.session.commit()
+        print(f"populating {args.rows} stale rows per table ...")
+        populate(db, RefreshToken, args.rows, lambda i: {"token": str(uuid.UUID(int=i)), "user_id": 1, "expires_at": past, "revoked": True, "created_at": past})
+        populate(db, PasswordResetToken, args.rows, lambda i: {"token": f"prt-{i}", "user_id": 1, "expires_at": past, "used": i % 2 == 0, "created_at": past})
+        populate(db, PhoneOTP, args.rows, lambda i: {"phone_number": f"+2547{i % 1000:08d}", "otp_code": f"{i % 1000000:06d}", "expires_at": past, "created_at": past})
+        db.session.add(PhoneOTP(phone_number="+254700000001", otp_code="123456", expires_at=now + timedelta(minutes=10)))
+        db.session.add(PasswordResetToken(user_id=1, token="live-token", expires_at=now + timedelta(hours=1)))
+        db.session.commit()
+        def otp_lookup():
+            (
+                PhoneOTP.query
+                .filter_by(phone_number="+254700000001", otp_code="123456")
+                .filter(PhoneOTP.expires_at > datetime.utcnow())
+                .order_by(PhoneOTP.created_at.desc())
+                .first()
+            )
+        def reset_lookup():
+            PasswordResetToken.query.filter_by(token="live-token", used=False).first()
+        def revocation_sync():
+            app.extensions["token_revocation"].sync(force=True)
+        lookups = [("phone otp", otp_lookup), ("reset token", reset_lookup), ("revocation sync", revocation_sync)]
+        before = {name: measure(fn, args.repeat) for name, fn in lookups}
+        started = time.perf_counter()
+        removed = sweeper.sweep(batch_size=args.batch_size)
+        print(f"sweep removed {sum(removed.values())} rows in {time.perf_counter() - started:.1f}s: {removed}")
+        db.session.execute(db.text("VACUUM"))
+        after = {name: measure(fn, args.repeat) for name, fn in lookups}
+    print(f"{'lookup':<16} {'before p50 ms':>14} {'after p50 ms':>13} {'before p99 ms':>14} {'after p99 ms':>13}")
+    for name, _ in lookups:
+        b, a = before[name], after[name]
+        print(f"{name:<16} {b['p50_ms']:>14.3f} {a['p50_ms']:>13.3f} {b['p99_ms']:>14.3f} {a['p99_ms']:>13.3f}")
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from backend.benchmarks.bench_proxy_fanin import start_stub
+from backend.benchmarks.common import make_app, summarize
+def burst(app, concurrency):
+    def fetch(_):
+        started = time.perf_counter()
+        status = app.test_client().get("/proxy/devto-articles").status_code
+        return status, time.perf_counter() - started
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(fetch, range(concurrency)))
+    assert {status for status, _ in results} == {200}
+    return summarize([elapsed for _, elapsed in results], time.perf_counter() - start)
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent cold misses vs warm hits on the upstream cache")
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--devto-delay", type=float, default=0.2)
+    args = parser.parse_args()
+    server, base = start_stub({"/api/articles": args.devto_delay})
+    app = make_app(PROXY_DEVTO_API_URL=base + "/api")
+    from backend.app.upstream import upstream
+    print(f"{'burst':<8} {'p50 ms':>10} {'p99 ms':>10}")
+    for label in ("cold", "warm"):
+        stats = burst(app, args.concurrency)
+        print(f"{label:<8} {stats['p50_ms']:>10.2f} {stats['p99_ms']:>10.2f}")
+    print(f"upstream delay={args.devto_delay * 1000:.0f}ms cache stats={upstream.cache.stats}")
+    server.shutdown()
+if __name__ == "__main__":
+    main()
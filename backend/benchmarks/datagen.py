@@ -0,0 +1,11 @@
+from backend.app import seeding
+from backend.app.seeding import BASE_TIME, CHUNK_SIZE, DEFAULT_PASSWORD, SCALES, counts_for, user_email
+def generate(counts, seed=0, password_hash=None, **options) -> dict:
+    data = seeding.generate(counts, seed=seed, password_hash=password_hash, **options)
+    return {name: list(rows) for name, rows in data.items()}
+def load(conn, data, chunk_size=CHUNK_SIZE) -> dict:
+    return {name: entry["rows"] for name, entry in seeding.write(conn, data, chunk_size=chunk_size).items()}
+def populate(app, scale="small", seed=0, password=DEFAULT_PASSWORD, **overrides) -> dict:
+    with app.app_context():
+        report = seeding.seeder.seed(counts_for(scale, **overrides), seed=seed, password=password)
+    return {name: entry["rows"] for name, entry in report.items()}
@@ -0,0 +1,218 @@
+import argparse
+import json
+import os
+import platform
+import random
+import signal
+import subprocess
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timezone
+from itertools import accumulate
+import requests
+from backend.benchmarks import datagen
+from backend.benchmarks.common import PROJECT_ROOT, summarize
+def list_content(http, base, ctx, rng):
+    return http.get(f"{base}/content", params={"page": rng.randint(1, 5), "per_page": 20})
+def get_content(http, base, ctx, rng):
+    return http.get(f"{base}/content/{rng.choice(ctx['content_ids'])}")
+def list_comments(http, base, ctx, rng):
+    return http.get(f"{base}/content/{rng.choice(ctx['content_ids'])}/comments")
+def list_reactions(http, base, ctx, rng):
+    return http.get(f"{base}/content/{rng.choice(ctx['content_ids'])}/reactions")
+def list_categories(http, base, ctx, rng):
+    return http.get(f"{base}/categories")
+def recommendations(http, base, ctx, rng):
+    return http.get(f"{base}/recommendations", params={"per_page": 20})
+def my_profile(http, base, ctx, rng):
+    return http.get(f"{base}/users/me/profile")
+def post_comment(http, base, ctx, rng):
+    content_id = rng.choice(ctx["content_ids"])
+    return http.post(f"{base}/content/{content_id}/comments", json={"body": f"load test {rng.random():.6f}"})
+TASKS = {
+    "GET /content": (False, list_content),
+    "GET /content/<id>": (False, get_content),
+    "GET /content/<id>/comments": (False, list_comments),
+    "GET /content/<id>/reactions": (False, list_reactions),
+    "GET /categories": (False, list_categories),
+    "GET /recommendations": (True, recommendations),
+    "GET /users/me/profile": (True, my_profile),
+    "POST /content/<id>/comments": (True, post_comment),
+}
+SCENARIOS = {
+    "browse": {
+        "GET /content": 4,
+        "GET /content/<id>": 3,
+        "GET /content/<id>/comments": 3,
+        "GET /content/<id>/reactions": 1,
+        "GET /categories": 1,
+    },
+    "member": {
+        "GET /content": 3,
+        "GET /content/<id>": 3,
+        "GET /content/<id>/comments": 3,
+        "GET /recommendations": 2,
+        "GET /users/me/profile": 1,
+        "POST /content/<id>/comments": 1,
+    },
+}
+def discover(base) -> dict:
+    r = requests.get(f"{base}/content", params={"per_page": 50}, timeout=10)
+    r.raise_for_status()
+    ids = [item["id"] for item in r.json()]
+    if not ids:
+        raise SystemExit(f"{base} has no content to exercise; seed it first")
+    return {"content_ids": ids}
+def login(http, base, email, password):
+    r = http.post(f"{base}/auth/login", json={"email": email, "password": password}, timeout=30)
+    if r.status_code != 200:
+        return False
+    http.headers["Authorization"] = f"Bearer {r.json()['access_token']}"
+    return True
+def run(base, scenario, users, duration, seed=0, think_ms=0, password=datagen.DEFAULT_PASSWORD, ramp_up=0.0):
+    ctx = discover(base)
+    samples = defaultdict(list)
+    errors = defaultdict(int)
+    lock = threading.Lock()
+    weights = SCENARIOS[scenario]
+    needs_login = any(TASKS[name][0] for name in weights)
+    window = {}
+    barrier = threading.Barrier(users + 1, action=lambda: window.update(stop=time.monotonic() + duration))
+    def virtual_user(index):
+        rng = random.Random(seed + index)
+        http = requests.Session()
+        authed = needs_login and login(http, base, datagen.user_email(index + 1), password)
+        names = [name for name in weights if authed or not TASKS[name][0]]
+        cum_weights = list(accumulate(weights[name] for name in names))
+        local, failed = defaultdict(list), defaultdict(int)
+        barrier.wait()
+        if ramp_up:
+            time.sleep(ramp_up * index / users)
+        while time.monotonic() < window["stop"]:
+            name = rng.choices(names, cum_weights=cum_weights)[0]
+            t0 = time.perf_counter()
+            try:
+                ok = TASKS[name][1](http, base, ctx, rng).status_code < 400
+            except requests.RequestException:
+                ok = False
+            local[name].append(time.perf_counter() - t0)
+            failed[name] += not ok
+            if think_ms:
+                time.sleep(rng.uniform(0, 2 * think_ms) / 1000)
+        with lock:
+            for name, values in local.items():
+                samples[name].extend(values)
+                errors[name] += failed[name]
+    threads = [threading.Thread(target=virtual_user, args=(i,), daemon=True) for i in range(users)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+    endpoints = {
+        name: dict(summarize(values, elapsed), errors=errors[name])
+        for name, values in sorted(samples.items())
+    }
+    overall = dict(
+        summarize([v for values in samples.values() for v in values], elapsed),
+        errors=sum(errors.values()),
+    )
+    return {"overall": overall, "endpoints": endpoints}
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+def print_report(report):
+    meta = report["meta"]
+    print(f"{meta['scenario']} @ {meta['commit']}: {meta['users']} users for {meta['duration']}s against {meta['base_url']}")
+    print(f"{'endpoint':32} {'count':>7} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'errors':>7}")
+    for name, stats in list(report["endpoints"].items()) + [("TOTAL", report["overall"])]:
+        print(
+            f"{name:32} {stats['count']:7d} {stats['rps']:8.1f} {stats['p50_ms']:8.1f} "
+            f"{stats['p95_ms']:8.1f} {stats['p99_ms']:8.1f} {stats['errors']:7d}"
+        )
+def print_comparison(baseline, report):
+    print(f"\ncompared with {baseline['meta']['commit']} ({baseline['meta']['timestamp']}):")
+    print(f"{'endpoint':32} {'rps':>16} {'p50':>16} {'p95':>16} {'p99':>16}")
+    current = dict(report["endpoints"], TOTAL=report["overall"])
+    previous = dict(baseline["endpoints"], TOTAL=baseline["overall"])
+    for name, stats in current.items():
+        old = previous.get(name)
+        if old is None:
+            continue
+        cells = []
+        for key in ("rps", "p50_ms", "p95_ms", "p99_ms"):
+            delta = (stats[key] - old[key]) / old[key] * 100 if old[key] else 0.0
+            cells.append(f"{stats[key]:7.1f} ({delta:+5.1f}%)")
+        print(f"{name:32} " + " ".join(f"{cell:>16}" for cell in cells))
+def start_local(scale, seed, worker_class, workers, threads):
+    from backend.benchmarks.common import make_app
+    from backend.benchmarks.loadtest_workers import start_server
+    app = make_app()
+    datagen.populate(app, scale, seed=seed)
+    db_path = app.config["SQLALCHEMY_DATABASE_URI"][len("sqlite:///"):]
+    proc, base = start_server(worker_class, workers, threads, db_path)
+    return proc, base, db_path
+def main():
+    parser = argparse.ArgumentParser(description="Scenario-based HTTP load runner with comparable JSON reports")
+    parser.add_argument("--base-url", help="target server; a local gunicorn over generated data is started when omitted")
+    parser.add_argument("--scenario", choices=sorted(SCENARIOS), default="browse")
+    parser.add_argument("--users", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--warmup", type=float, default=3)
+    parser.add_argument("--ramp-up", type=float, default=0.0)
+    parser.add_argument("--think-ms", type=float, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--password", default=datagen.DEFAULT_PASSWORD)
+    parser.add_argument("--scale", choices=sorted(datagen.SCALES), default="small")
+    parser.add_argument("--worker-class", default="gthread")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="baseline JSON report to diff against")
+    args = parser.parse_args()
+    proc = db_path = None
+    base = args.base_url
+    if base is None:
+        proc, base, db_path = start_local(args.scale, args.seed, args.worker_class, args.workers, args.threads)
+    try:
+        if args.warmup:
+            run(base, args.scenario, args.users, args.warmup, seed=args.seed, password=args.password)
+        result = run(
+            base, args.scenario, args.users, args.duration,
+            seed=args.seed, think_ms=args.think_ms, password=args.password, ramp_up=args.ramp_up,
+        )
+    finally:
+        if proc is not None:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(30)
+            os.remove(db_path)
+    report = {
+        "meta": {
+            "commit": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "scenario": args.scenario,
+            "users": args.users,
+            "duration": args.duration,
+            "think_ms": args.think_ms,
+            "seed": args.seed,
+            "base_url": args.base_url or f"local {args.worker_class} x{args.workers} ({args.scale})",
+            "python": platform.python_version(),
+        },
+        **result,
+    }
+    print_report(report)
+    if args.compare:
+        with open(args.compare) as fh:
+            print_comparison(json.load(fh), report)
+    if args.output:
+        with open(args.output, "w") as fh:
+            json.dump(report, fh, indent=2)
+if __name__ == "__main__":
+    main()
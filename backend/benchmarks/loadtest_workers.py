@@ -0,0 +1,124 @@
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import requests
+from backend.benchmarks.common import PROJECT_ROOT, summarize
+BACKEND_DIR = os.path.join(PROJECT_ROOT, "backend")
+def seed(path, rows):
+    from sqlalchemy import create_engine
+    from backend.app import db
+    from backend.app.models import Content, ContentStatusEnum, ContentTypeEnum, User
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        author_id = conn.execute(User.__table__.insert().values(email="load@example.com", name="Load")).inserted_primary_key[0]
+        conn.execute(Content.__table__.insert(), [
+            {
+                "title": f"Post {i}",
+                "body": "x" * 500,
+                "content_type": ContentTypeEnum.article.name,
+                "status": ContentStatusEnum.Published.name,
+                "author_id": author_id,
+            }
+            for i in range(rows)
+        ])
+    engine.dispose()
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+def start_server(worker_class, workers, threads, db_path):
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=PROJECT_ROOT,
+        APP_CONFIG="backend.config.ProdConfig",
+        DATABASE_URL=f"sqlite:///{db_path}",
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKER_CLASS=worker_class,
+        GUNICORN_WORKERS=str(workers),
+        GUNICORN_THREADS=str(threads),
+        GUNICORN_LOG_LEVEL="warning",
+        DB_MIGRATIONS_ENABLED="false",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(BACKEND_DIR, "gunicorn.conf.py"), "backend.wsgi:app"],
+        cwd=PROJECT_ROOT,
+        env=env,
+    )
+    base = f"http://127.0.0.1:{port}"
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            requests.get(base + "/categories", timeout=1)
+            return proc, base
+        except requests.ConnectionError:
+            time.sleep(0.1)
+    proc.kill()
+    raise SystemExit(f"{worker_class} server did not start")
+def load(url, concurrency, duration):
+    samples = []
+    errors = []
+    lock = threading.Lock()
+    stop = time.monotonic() + duration
+    def client():
+        session = requests.Session()
+        local, failed = [], 0
+        while time.monotonic() < stop:
+            t0 = time.perf_counter()
+            try:
+                ok = session.get(url, timeout=10).status_code == 200
+            except requests.RequestException:
+                ok = False
+            local.append(time.perf_counter() - t0)
+            failed += not ok
+        with lock:
+            samples.extend(local)
+            errors.append(failed)
+    started = time.perf_counter()
+    pool = [threading.Thread(target=client) for _ in range(concurrency)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return summarize(samples, time.perf_counter() - started), sum(errors)
+def main():
+    parser = argparse.ArgumentParser(description="Compare gunicorn worker models on GET /content")
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--rows", type=int, default=2000)
+    parser.add_argument("--models", default="sync,gthread,gevent")
+    parser.add_argument("--path", default="/content?per_page=20")
+    args = parser.parse_args()
+    fd, db_path = tempfile.mkstemp(prefix="loadtest_", suffix=".db")
+    os.close(fd)
+    seed(db_path, args.rows)
+    for model in args.models.split(","):
+        if model == "gevent":
+            try:
+                import gevent
+            except ImportError:
+                print("gevent: not installed, skipped")
+                continue
+        proc, base = start_server(model, args.workers, args.threads, db_path)
+        try:
+            load(base + args.path, args.concurrency, 1)
+            stats, errors = load(base + args.path, args.concurrency, args.duration)
+        finally:
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(30)
+        print(
+            f"{model}: {stats['rps']:.0f} req/s  p50={stats['p50_ms']:.1f}ms  p99={stats['p99_ms']:.1f}ms  "
+            f"errors={errors}  exit={proc.returncode}"
+        )
+    os.remove(db_path)
+if __name__ == "__main__":
+    main()
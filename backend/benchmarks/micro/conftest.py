@@ -0,0 +1,20 @@
+import os
+import sys
+import pytest
+PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", ".."))
+if PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, PROJECT_ROOT)
+from backend.benchmarks import datagen
+from backend.benchmarks.common import make_app
+def pytest_addoption(parser):
+    parser.addoption("--bench-scale", default="small", choices=sorted(datagen.SCALES), help="datagen scale for micro-benchmarks")
+    parser.addoption("--bench-seed", type=int, default=0, help="datagen seed for micro-benchmarks")
+@pytest.fixture(scope="session")
+def bench_app(request):
+    app = make_app()
+    datagen.populate(app, request.config.getoption("--bench-scale"), seed=request.config.getoption("--bench-seed"))
+    return app
+@pytest.fixture
+def bench_ctx(bench_app):
+    with bench_app.app_context():
+        yield bench_app
@@ -0,0 +1,38 @@
+import pytest
+from sqlalchemy import func
+pytest.importorskip("pytest_benchmark")
+from backend.app import db
+from backend.app.comments import _build_comment_tree
+from backend.app.content import _send_notifications
+from backend.app.models import Comment, Content, Notification, Subscription
+from backend.app.recommendations import _fetch_recommendations
+def test_build_comment_tree(benchmark, bench_ctx):
+    comments = Comment.query.order_by(Comment.created_at).all()
+    threads = benchmark(_build_comment_tree, comments)
+    assert sum(1 for c in comments if c.parent_id is None) == len(threads)
+def test_build_comment_tree_single_content(benchmark, bench_ctx):
+    content_id, _ = (
+        db.session.query(Comment.content_id, func.count(Comment.id))
+        .group_by(Comment.content_id)
+        .order_by(func.count(Comment.id).desc())
+        .first()
+    )
+    comments = Comment.query.filter_by(content_id=content_id).order_by(Comment.created_at).all()
+    assert benchmark(_build_comment_tree, comments)
+@pytest.mark.parametrize("per_page", [10, 50])
+def test_fetch_recommendations(benchmark, bench_ctx, per_page):
+    page = benchmark(_fetch_recommendations, 1, 1, per_page)
+    assert len(page.items) == min(per_page, page.total)
+def test_send_notifications(benchmark, bench_ctx):
+    category_id, subscribers = (
+        db.session.query(Subscription.category_id, func.count())
+        .group_by(Subscription.category_id)
+        .order_by(func.count().desc())
+        .first()
+    )
+    content = Content.query.filter_by(category_id=category_id).first()
+    def clear():
+        Notification.query.delete()
+        db.session.commit()
+    benchmark.pedantic(_send_notifications, args=(content,), setup=clear, rounds=20)
+    assert Notification.query.count() == subscribers
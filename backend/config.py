@@ -4,6 +4,26 @@ from dotenv import load_dotenv
 from sqlalchemy.pool import StaticPool
 basedir = os.path.abspath(os.path.dirname(__file__))
 load_dotenv(os.path.join(basedir, ".env"))
+def engine_options(url=None) -> dict:
+    options = {
+        "pool_pre_ping": os.getenv("DB_POOL_PRE_PING", "true").lower() == "true",
+        "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", 1800)),
+    }
+    if url and not url.startswith("sqlite"):
+        options.update(
+            pool_size=int(os.getenv("DB_POOL_SIZE", 10)),
+            max_overflow=int(os.getenv("DB_MAX_OVERFLOW", 20)),
+            pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", 10)),
+        )
+    timeout_ms = int(os.getenv("DB_STATEMENT_TIMEOUT_MS", 5000))
+    if url and url.startswith("postgresql") and timeout_ms:
+        options["connect_args"] = {"options": f"-c statement_timeout={timeout_ms}"}
+    return options
+def replica_binds(url=None) -> dict:
+    url = url or os.getenv("DATABASE_REPLICA_URL")
+    if not url:
+        return {}
+    return {"replica": dict(engine_options(url), url=url)}
 class BaseConfig:
     SECRET_KEY = os.getenv("SECRET_KEY", "devkey")
     JWT_SECRET_KEY = os.getenv("JWT_SECRET_KEY", "secret-jwt-key")
@@ -13,7 +33,30 @@ class BaseConfig:
     JWT_REFRESH_TOKEN_EXPIRES = timedelta(
         days=int(os.getenv("JWT_REFRESH_EXPIRES_DAYS", 30))
     )
+    JWT_REVOCATION_BACKEND = os.getenv("JWT_REVOCATION_BACKEND", "memory")
+    JWT_REVOCATION_REDIS_URL = os.getenv("JWT_REVOCATION_REDIS_URL", os.getenv("REDIS_URL"))
+    JWT_REVOCATION_BLOOM_CAPACITY = int(os.getenv("JWT_REVOCATION_BLOOM_CAPACITY", 100000))
+    JWT_REVOCATION_BLOOM_ERROR_RATE = float(os.getenv("JWT_REVOCATION_BLOOM_ERROR_RATE", 0.001))
+    JWT_REVOCATION_SYNC_SECONDS = int(os.getenv("JWT_REVOCATION_SYNC_SECONDS", 5))
+    JWT_REVOCATION_REBUILD_SECONDS = int(os.getenv("JWT_REVOCATION_REBUILD_SECONDS", 3600))
+    JWT_REVOCATION_SYNC_OVERLAP_SECONDS = int(os.getenv("JWT_REVOCATION_SYNC_OVERLAP_SECONDS", 60))
+    JWT_REVOCATION_LRU_SIZE = int(os.getenv("JWT_REVOCATION_LRU_SIZE", 10000))
+    DEACTIVATION_SYNC_SECONDS = int(os.getenv("DEACTIVATION_SYNC_SECONDS", 30))
+    DEACTIVATION_REDIS_URL = os.getenv("DEACTIVATION_REDIS_URL", os.getenv("REDIS_URL"))
+    DEACTIVATION_CHANNEL = os.getenv("DEACTIVATION_CHANNEL", "user-deactivations")
+    IDENTITY_CACHE_TTL = int(os.getenv("IDENTITY_CACHE_TTL", 30))
+    IDENTITY_CACHE_MAX_ENTRIES = int(os.getenv("IDENTITY_CACHE_MAX_ENTRIES", 10000))
     SQLALCHEMY_TRACK_MODIFICATIONS = False
+    DB_MIGRATIONS_ENABLED = os.getenv("DB_MIGRATIONS_ENABLED", "true").lower() == "true"
+    BLUEPRINTS = [name.strip() for name in os.getenv("APP_BLUEPRINTS", "").split(",") if name.strip()] or None
+    DB_REPLICA_STICKY_SECONDS = int(os.getenv("DB_REPLICA_STICKY_SECONDS", 10))
+    DB_REPLICA_STICKY_COOKIE = os.getenv("DB_REPLICA_STICKY_COOKIE", "db_primary_until")
+    DB_REPLICA_STICKY_REDIS_URL = os.getenv("DB_REPLICA_STICKY_REDIS_URL", os.getenv("REDIS_URL"))
+    BCRYPT_LOG_ROUNDS = int(os.getenv("BCRYPT_LOG_ROUNDS", 12))
+    PASSWORD_HASH_EXECUTOR = os.getenv("PASSWORD_HASH_EXECUTOR", "thread")
+    PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+    PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+    PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", 5))
     GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
     GOOGLE_CLIENT_SECRET = os.getenv("GOOGLE_CLIENT_SECRET")
     GITHUB_CLIENT_ID = os.getenv("GITHUB_CLIENT_ID")
@@ -21,22 +64,115 @@ class BaseConfig:
     TWILIO_ACCOUNT_SID = os.getenv("TWILIO_ACCOUNT_SID")
     TWILIO_AUTH_TOKEN = os.getenv("TWILIO_AUTH_TOKEN")
     TWILIO_VERIFY_SERVICE_SID = os.getenv("TWILIO_VERIFY_SERVICE_SID")
+    PHONE_DEFAULT_REGION = os.getenv("PHONE_DEFAULT_REGION", "KE")
     MAIL_DEFAULT_SENDER = os.getenv("MAIL_DEFAULT_SENDER")
+    AUDIT_ASYNC = os.getenv("AUDIT_ASYNC", "true").lower() == "true"
+    AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", 10000))
+    AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", 500))
+    AUDIT_FLUSH_INTERVAL = float(os.getenv("AUDIT_FLUSH_INTERVAL", 1.0))
     AUDIT_LOG_DEFAULT_LIMIT = int(os.getenv("AUDIT_LOG_DEFAULT_LIMIT", 50))
     AUDIT_LOG_MAX_LIMIT = int(os.getenv("AUDIT_LOG_MAX_LIMIT", 200))
+    AUDIT_PARTITION_MONTHS_AHEAD = int(os.getenv("AUDIT_PARTITION_MONTHS_AHEAD", 3))
+    AUDIT_PARTITION_INTERVAL_MINUTES = int(os.getenv("AUDIT_PARTITION_INTERVAL_MINUTES", 1440))
+    AUDIT_ARCHIVE_DIR = os.getenv("AUDIT_ARCHIVE_DIR", os.path.join(basedir, "audit_archive"))
+    AUDIT_ARCHIVE_AFTER_MONTHS = int(os.getenv("AUDIT_ARCHIVE_AFTER_MONTHS", 6))
+    AUDIT_ARCHIVE_FORMAT = os.getenv("AUDIT_ARCHIVE_FORMAT", "ndjson")
+    AUDIT_ARCHIVE_BATCH_SIZE = int(os.getenv("AUDIT_ARCHIVE_BATCH_SIZE", 5000))
+    PROXY_FIX_X_FOR = int(os.getenv("PROXY_FIX_X_FOR", 0))
+    PROXY_FIX_X_PROTO = int(os.getenv("PROXY_FIX_X_PROTO", 0))
+    RATELIMIT_ENABLED = os.getenv("RATELIMIT_ENABLED", "true").lower() == "true"
+    RATELIMIT_BACKEND = os.getenv("RATELIMIT_BACKEND", "memory")
+    RATELIMIT_REDIS_URL = os.getenv("RATELIMIT_REDIS_URL", os.getenv("REDIS_URL"))
+    RATELIMIT_MAX_KEYS = int(os.getenv("RATELIMIT_MAX_KEYS", 100000))
+    RATELIMIT_LIMITS = {
+        "login": {"ip": (30, 60), "identifier": (10, 300)},
+        "password_reset": {"ip": (10, 900), "identifier": (3, 900)},
+        "password_reset_email": {"ip": (10, 900), "identifier": (3, 900)},
+        "password_reset_sms": {"ip": (10, 900), "identifier": (3, 900)},
+    }
+    TOKEN_SWEEP_INTERVAL_MINUTES = int(os.getenv("TOKEN_SWEEP_INTERVAL_MINUTES", 0))
+    TOKEN_SWEEP_BATCH_SIZE = int(os.getenv("TOKEN_SWEEP_BATCH_SIZE", 1000))
+    CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() == "true"
+    CACHE_DEFAULT_TTL = int(os.getenv("CACHE_DEFAULT_TTL", 60))
+    CACHE_LOCAL_MAX_ENTRIES = int(os.getenv("CACHE_LOCAL_MAX_ENTRIES", 2048))
+    CACHE_LOCAL_TTL = int(os.getenv("CACHE_LOCAL_TTL", 5))
+    CACHE_REDIS_URL = os.getenv("CACHE_REDIS_URL", os.getenv("REDIS_URL"))
+    CACHE_KEY_PREFIX = os.getenv("CACHE_KEY_PREFIX", "cache:")
+    UPSTREAM_CONNECT_TIMEOUT = float(os.getenv("UPSTREAM_CONNECT_TIMEOUT", 3.05))
+    UPSTREAM_READ_TIMEOUT = float(os.getenv("UPSTREAM_READ_TIMEOUT", 10))
+    UPSTREAM_POOL_SIZE = int(os.getenv("UPSTREAM_POOL_SIZE", 20))
+    UPSTREAM_CACHE_TTL = int(os.getenv("UPSTREAM_CACHE_TTL", 300))
+    UPSTREAM_CACHE_STALE_TTL = int(os.getenv("UPSTREAM_CACHE_STALE_TTL", 3600))
+    UPSTREAM_CACHE_NEGATIVE_TTL = int(os.getenv("UPSTREAM_CACHE_NEGATIVE_TTL", 30))
+    UPSTREAM_CACHE_MAX_ENTRIES = int(os.getenv("UPSTREAM_CACHE_MAX_ENTRIES", 1024))
+    UPSTREAM_REFRESH_WORKERS = int(os.getenv("UPSTREAM_REFRESH_WORKERS", 4))
+    UPSTREAM_FANOUT_WORKERS = int(os.getenv("UPSTREAM_FANOUT_WORKERS", 8))
+    UPSTREAM_WAIT_TIMEOUT = float(os.getenv("UPSTREAM_WAIT_TIMEOUT", 0)) or None
+    PROXY_FEED_TIMEOUT = float(os.getenv("PROXY_FEED_TIMEOUT", 2.5))
+    PROXY_FEED_MAX_LIMIT = int(os.getenv("PROXY_FEED_MAX_LIMIT", 200))
+    PROXY_RSS2JSON_URL = os.getenv("PROXY_RSS2JSON_URL", "https://api.rss2json.com/v1/api.json")
+    PROXY_RSS2JSON_API_KEY = os.getenv("PROXY_RSS2JSON_API_KEY", "qaroytlfmvhtdcvktht1hraeubbedie4ggiogmaz")
+    PROXY_YOUTUBE_FEED_URL = os.getenv(
+        "PROXY_YOUTUBE_FEED_URL",
+        "https://www.youtube.com/feeds/videos.xml?channel_id=UC8butISFwT-Wl7EV0hUK0BQ",
+    )
+    PROXY_PODCAST_FEED_URL = os.getenv("PROXY_PODCAST_FEED_URL", "https://feeds.simplecast.com/4r7G7Z8a")
+    PROXY_DEVTO_API_URL = os.getenv("PROXY_DEVTO_API_URL", "https://dev.to/api")
+    FEED_SOURCES = [
+        {"name": "youtube", "url": PROXY_YOUTUBE_FEED_URL, "content_type": "video"},
+        {"name": "podcasts", "url": PROXY_PODCAST_FEED_URL, "content_type": "audio"},
+        {"name": "devto", "url": os.getenv("FEED_DEVTO_URL", "https://dev.to/feed"), "content_type": "article"},
+    ]
+    FEED_INGEST_INTERVAL_MINUTES = int(os.getenv("FEED_INGEST_INTERVAL_MINUTES", 0))
+    SCHEDULER_ENABLED = os.getenv("SCHEDULER_ENABLED", "true").lower() == "true"
+    SCHEDULER_LOCK_FILE = os.getenv("SCHEDULER_LOCK_FILE")
+    SCHEDULER_LEADER_RETRY_SECONDS = int(os.getenv("SCHEDULER_LEADER_RETRY_SECONDS", 30))
+    FEED_INGEST_WORKERS = int(os.getenv("FEED_INGEST_WORKERS", 4))
+    FEED_INGEST_BATCH_SIZE = int(os.getenv("FEED_INGEST_BATCH_SIZE", 500))
+    FEED_INGEST_STATUS = os.getenv("FEED_INGEST_STATUS", "Published")
+    FEED_SYSTEM_USER_EMAIL = os.getenv("FEED_SYSTEM_USER_EMAIL", "feeds@moringa-daily.dev")
     RECOMMEND_PER_PAGE = int(os.getenv("RECOMMEND_PER_PAGE", 20))
     MAX_RECOMMEND_PER_PAGE = int(os.getenv("MAX_RECOMMEND_PER_PAGE", 50))
+    ADMIN_BULK_MAX_IDS = int(os.getenv("ADMIN_BULK_MAX_IDS", 1000))
+    MODERATION_PER_PAGE = int(os.getenv("MODERATION_PER_PAGE", 20))
+    MAX_MODERATION_PER_PAGE = int(os.getenv("MAX_MODERATION_PER_PAGE", 100))
+    CONTENT_COUNTER_SHARDS = int(os.getenv("CONTENT_COUNTER_SHARDS", 8))
+    METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+    METRICS_MULTIPROC_DIR = os.getenv("METRICS_MULTIPROC_DIR")
+    METRICS_FLUSH_SECONDS = float(os.getenv("METRICS_FLUSH_SECONDS", 5))
+    METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+    PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "false").lower() == "true"
+    PROFILING_SAMPLE_RATE = float(os.getenv("PROFILING_SAMPLE_RATE", 0.0))
+    PROFILING_SECRET = os.getenv("PROFILING_SECRET")
+    PROFILING_HEADER = os.getenv("PROFILING_HEADER", "X-Profile")
+    PROFILING_TOKEN_TTL = int(os.getenv("PROFILING_TOKEN_TTL", 300))
+    PROFILING_BACKEND = os.getenv("PROFILING_BACKEND", "auto")
+    PROFILING_INTERVAL = float(os.getenv("PROFILING_INTERVAL", 0.001))
+    PROFILING_MAX_PROFILES = int(os.getenv("PROFILING_MAX_PROFILES", 50))
+    PROFILING_MAX_SQL = int(os.getenv("PROFILING_MAX_SQL", 200))
+    PROFILING_DIR = os.getenv("PROFILING_DIR")
 class DevConfig(BaseConfig):
     DEBUG = True
     SQLALCHEMY_DATABASE_URI = os.getenv(
         "DATABASE_URL", "postgresql://localhost/daily_dev"
     )
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds()
 class TestConfig(BaseConfig):
     TESTING = True
+    DB_MIGRATIONS_ENABLED = False
+    BCRYPT_LOG_ROUNDS = 4
+    RATELIMIT_ENABLED = False
+    AUDIT_ASYNC = False
+    CACHE_ENABLED = False
+    DEACTIVATION_SYNC_SECONDS = 0
+    IDENTITY_CACHE_TTL = 0
     SQLALCHEMY_DATABASE_URI = "sqlite:///:memory:"
     SQLALCHEMY_ENGINE_OPTIONS = {
         "poolclass": StaticPool,
         "connect_args": {"check_same_thread": False},
     }
 class ProdConfig(BaseConfig):
-    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
\ No newline at end of file
+    SQLALCHEMY_DATABASE_URI = os.getenv("DATABASE_URL")
+    SQLALCHEMY_ENGINE_OPTIONS = engine_options(SQLALCHEMY_DATABASE_URI)
+    SQLALCHEMY_BINDS = replica_binds()
\ No newline at end of file
@@ -0,0 +1,26 @@
+"""record when refresh tokens are revoked
+
+Revision ID: 0a9d3e6f5c21
+Revises: f1c4d7e2a9b6
+Create Date: 2026-10-20 09:15:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a9d3e6f5c21'
+down_revision = 'f1c4d7e2a9b6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('refresh_tokens', sa.Column('revoked_at', sa.DateTime(), nullable=True))
+    op.create_index('ix_refresh_token_revoked_at', 'refresh_tokens', ['revoked_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_refresh_token_revoked_at', table_name='refresh_tokens')
+    op.drop_column('refresh_tokens', 'revoked_at')
@@ -0,0 +1,32 @@
+"""audit log filter indexes
+
+Revision ID: 3c9a1f2e7b41
+Revises: 1b7d4e9a2c60
+Create Date: 2026-10-19 14:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3c9a1f2e7b41'
+down_revision = '1b7d4e9a2c60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.create_index('ix_audit_logs_user_id_id', ['user_id', 'id'], unique=False)
+        batch_op.create_index('ix_audit_logs_target_type_target_id_id', ['target_type', 'target_id', 'id'], unique=False)
+        batch_op.create_index('ix_audit_logs_action_timestamp', ['action', 'timestamp'], unique=False)
+        batch_op.create_index('ix_audit_logs_timestamp', ['timestamp'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('audit_logs', schema=None) as batch_op:
+        batch_op.drop_index('ix_audit_logs_timestamp')
+        batch_op.drop_index('ix_audit_logs_action_timestamp')
+        batch_op.drop_index('ix_audit_logs_target_type_target_id_id')
+        batch_op.drop_index('ix_audit_logs_user_id_id')
@@ -0,0 +1,28 @@
+"""add content external_id for ingested feed items
+
+Revision ID: 5f3b9c1d7e20
+Revises: 8d2e6b0c4a17
+Create Date: 2026-10-19 18:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f3b9c1d7e20'
+down_revision = '8d2e6b0c4a17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('contents', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('external_id', sa.String(length=512), nullable=True))
+        batch_op.create_unique_constraint('uq_contents_external_id', ['external_id'])
+
+
+def downgrade():
+    with op.batch_alter_table('contents', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_contents_external_id', type_='unique')
+        batch_op.drop_column('external_id')
@@ -0,0 +1,69 @@
+"""keep content counters per author alongside the site-wide rows
+
+Revision ID: 7b2e5c8f1d94
+Revises: 0a9d3e6f5c21
+Create Date: 2026-10-20 11:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e5c8f1d94'
+down_revision = '0a9d3e6f5c21'
+branch_labels = None
+depends_on = None
+
+COUNTS = (
+    ("'status'", "CAST(contents.status AS VARCHAR(64))", "contents", "contents.status"),
+    ("'type'", "CAST(contents.content_type AS VARCHAR(64))", "contents", "contents.content_type"),
+    ("'category'", "COALESCE(CAST(contents.category_id AS VARCHAR(64)), 'none')", "contents", "contents.category_id"),
+    (
+        "'reactions'",
+        "CAST(reactions.type AS VARCHAR(64))",
+        "reactions JOIN contents ON contents.id = reactions.content_id",
+        "reactions.type",
+    ),
+    ("'comments'", "'all'", "comments JOIN contents ON contents.id = comments.content_id", None),
+)
+
+
+def _create_counters(columns, primary_key):
+    op.create_table('content_counters',
+    *columns,
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint(*primary_key)
+    )
+
+
+def _backfill(per_author):
+    for dimension, key, source, group in COUNTS:
+        scopes = [("0", group)]
+        if per_author:
+            scopes.append(("contents.author_id", ", ".join(filter(None, ["contents.author_id", group]))))
+        for author, group_by in scopes:
+            columns = "author_id, dimension, key, shard, count" if per_author else "dimension, key, shard, count"
+            selected = f"{author}, {dimension}, {key}, 0, COUNT(*)" if per_author else f"{dimension}, {key}, 0, COUNT(*)"
+            op.execute(
+                f"INSERT INTO content_counters ({columns}) SELECT {selected} FROM {source}"
+                + (f" GROUP BY {group_by}" if group_by else "")
+            )
+
+
+def upgrade():
+    op.drop_table('content_counters')
+    _create_counters(
+        [sa.Column('author_id', sa.Integer(), server_default='0', nullable=False)],
+        ['author_id', 'dimension', 'key', 'shard'],
+    )
+    _backfill(per_author=True)
+
+
+def downgrade():
+    op.drop_table('content_counters')
+    _create_counters([], ['dimension', 'key', 'shard'])
+    _backfill(per_author=False)
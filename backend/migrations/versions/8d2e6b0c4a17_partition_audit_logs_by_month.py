@@ -0,0 +1,102 @@
+"""partition audit_logs by month
+
+Revision ID: 8d2e6b0c4a17
+Revises: 3c9a1f2e7b41
+Create Date: 2026-10-19 16:40:00.000000
+
+"""
+from datetime import datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8d2e6b0c4a17'
+down_revision = '3c9a1f2e7b41'
+branch_labels = None
+depends_on = None
+
+
+INDEXES = [
+    ('ix_audit_logs_user_id_id', 'user_id, id'),
+    ('ix_audit_logs_target_type_target_id_id', 'target_type, target_id, id'),
+    ('ix_audit_logs_action_timestamp', 'action, timestamp'),
+    ('ix_audit_logs_timestamp', 'timestamp'),
+]
+
+
+def _add_months(value, months):
+    index = value.year * 12 + value.month - 1 + months
+    return datetime(index // 12, index % 12 + 1, 1)
+
+
+def _drop_indexes():
+    for name, _ in INDEXES:
+        op.execute(f'DROP INDEX IF EXISTS {name}')
+
+
+def _create_indexes():
+    for name, columns in INDEXES:
+        op.execute(f'CREATE INDEX {name} ON audit_logs ({columns})')
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    _drop_indexes()
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_unpartitioned')
+    op.execute('ALTER SEQUENCE audit_logs_id_seq RENAME TO audit_logs_unpartitioned_id_seq')
+    op.execute(
+        'CREATE TABLE audit_logs ('
+        ' id SERIAL NOT NULL,'
+        ' user_id INTEGER REFERENCES users (id) ON DELETE SET NULL,'
+        ' action VARCHAR(128) NOT NULL,'
+        ' target_type VARCHAR(64),'
+        ' target_id INTEGER,'
+        ' timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,'
+        ' details JSON,'
+        ' PRIMARY KEY (id, timestamp)'
+        ') PARTITION BY RANGE (timestamp)'
+    )
+    _create_indexes()
+    oldest = bind.execute(sa.text('SELECT min(timestamp) FROM audit_logs_unpartitioned')).scalar()
+    now = datetime.utcnow()
+    month = datetime((oldest or now).year, (oldest or now).month, 1)
+    last = _add_months(datetime(now.year, now.month, 1), 3)
+    while month <= last:
+        end = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE audit_logs_y{month.year:04d}m{month.month:02d} PARTITION OF audit_logs "
+            f"FOR VALUES FROM ('{month:%Y-%m-%d}') TO ('{end:%Y-%m-%d}')"
+        )
+        month = end
+    op.execute('CREATE TABLE audit_logs_default PARTITION OF audit_logs DEFAULT')
+    op.execute('INSERT INTO audit_logs SELECT id, user_id, action, target_type, target_id, timestamp, details FROM audit_logs_unpartitioned')
+    op.execute("SELECT setval('audit_logs_id_seq', COALESCE((SELECT max(id) FROM audit_logs), 0) + 1, false)")
+    op.execute('DROP TABLE audit_logs_unpartitioned')
+
+
+def downgrade():
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        return
+    _drop_indexes()
+    op.execute('ALTER TABLE audit_logs RENAME TO audit_logs_partitioned')
+    op.execute('ALTER SEQUENCE audit_logs_id_seq RENAME TO audit_logs_partitioned_id_seq')
+    op.execute(
+        'CREATE TABLE audit_logs ('
+        ' id SERIAL PRIMARY KEY,'
+        ' user_id INTEGER REFERENCES users (id) ON DELETE SET NULL,'
+        ' action VARCHAR(128) NOT NULL,'
+        ' target_type VARCHAR(64),'
+        ' target_id INTEGER,'
+        ' timestamp TIMESTAMP WITHOUT TIME ZONE DEFAULT now() NOT NULL,'
+        ' details JSON'
+        ')'
+    )
+    op.execute('INSERT INTO audit_logs SELECT id, user_id, action, target_type, target_id, timestamp, details FROM audit_logs_partitioned')
+    op.execute("SELECT setval('audit_logs_id_seq', COALESCE((SELECT max(id) FROM audit_logs), 0) + 1, false)")
+    op.execute('DROP TABLE audit_logs_partitioned CASCADE')
+    _create_indexes()
@@ -0,0 +1,33 @@
+"""add feed_states for conditional feed fetches
+
+Revision ID: a41e7c9b2d53
+Revises: 5f3b9c1d7e20
+Create Date: 2026-10-19 19:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41e7c9b2d53'
+down_revision = '5f3b9c1d7e20'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('feed_states',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('url', sa.String(length=1024), nullable=False),
+    sa.Column('etag', sa.String(length=512), nullable=True),
+    sa.Column('last_modified', sa.String(length=64), nullable=True),
+    sa.Column('fetched_at', sa.DateTime(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('url')
+    )
+
+
+def downgrade():
+    op.drop_table('feed_states')
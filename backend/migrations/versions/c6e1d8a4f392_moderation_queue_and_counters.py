@@ -0,0 +1,61 @@
+"""persist flag counts, index the moderation queue and add content counters
+
+Revision ID: c6e1d8a4f392
+Revises: a41e7c9b2d53
+Create Date: 2026-10-19 21:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c6e1d8a4f392'
+down_revision = 'a41e7c9b2d53'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column('contents', sa.Column('flag_count', sa.Integer(), server_default='0', nullable=False))
+    op.create_index('ix_contents_status_created_at_id', 'contents', ['status', 'created_at', 'id'], unique=False)
+    op.create_index('ix_flags_content_id_id', 'flags', ['content_id', 'id'], unique=False)
+    op.create_table('content_counters',
+    sa.Column('dimension', sa.String(length=16), nullable=False),
+    sa.Column('key', sa.String(length=64), nullable=False),
+    sa.Column('shard', sa.SmallInteger(), nullable=False),
+    sa.Column('count', sa.BigInteger(), server_default='0', nullable=False),
+    sa.PrimaryKeyConstraint('dimension', 'key', 'shard')
+    )
+    op.execute(
+        "UPDATE contents SET flag_count = "
+        "(SELECT COUNT(*) FROM flags WHERE flags.content_id = contents.id)"
+    )
+    op.execute(
+        "INSERT INTO content_counters (dimension, key, shard, count) "
+        "SELECT 'status', CAST(status AS VARCHAR(64)), 0, COUNT(*) FROM contents GROUP BY status"
+    )
+    op.execute(
+        "INSERT INTO content_counters (dimension, key, shard, count) "
+        "SELECT 'type', CAST(content_type AS VARCHAR(64)), 0, COUNT(*) FROM contents GROUP BY content_type"
+    )
+    op.execute(
+        "INSERT INTO content_counters (dimension, key, shard, count) "
+        "SELECT 'category', COALESCE(CAST(category_id AS VARCHAR(64)), 'none'), 0, COUNT(*) "
+        "FROM contents GROUP BY category_id"
+    )
+    op.execute(
+        "INSERT INTO content_counters (dimension, key, shard, count) "
+        "SELECT 'reactions', CAST(type AS VARCHAR(64)), 0, COUNT(*) FROM reactions GROUP BY type"
+    )
+    op.execute(
+        "INSERT INTO content_counters (dimension, key, shard, count) "
+        "SELECT 'comments', 'all', 0, COUNT(*) FROM comments"
+    )
+
+
+def downgrade():
+    op.drop_table('content_counters')
+    op.drop_index('ix_flags_content_id_id', table_name='flags')
+    op.drop_index('ix_contents_status_created_at_id', table_name='contents')
+    op.drop_column('contents', 'flag_count')
@@ -0,0 +1,32 @@
+"""index token and otp expiry for the sweeper
+
+Revision ID: e3f7a2b9c815
+Revises: c6e1d8a4f392
+Create Date: 2026-10-19 22:30:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f7a2b9c815'
+down_revision = 'c6e1d8a4f392'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_refresh_token_expires_at', 'refresh_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_password_reset_token_expires_at', 'password_reset_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_email_verification_token_expires_at', 'email_verification_tokens', ['expires_at'], unique=False)
+    op.create_index('ix_phone_otp_expires_at', 'phone_otp', ['expires_at'], unique=False)
+    op.create_index('ix_phone_otp_phone_number_expires_at', 'phone_otp', ['phone_number', 'expires_at'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_phone_otp_phone_number_expires_at', table_name='phone_otp')
+    op.drop_index('ix_phone_otp_expires_at', table_name='phone_otp')
+    op.drop_index('ix_email_verification_token_expires_at', table_name='email_verification_tokens')
+    op.drop_index('ix_password_reset_token_expires_at', table_name='password_reset_tokens')
+    op.drop_index('ix_refresh_token_expires_at', table_name='refresh_tokens')
@@ -0,0 +1,28 @@
+"""index contents by author and comments/reactions by content
+
+Revision ID: f1c4d7e2a9b6
+Revises: e3f7a2b9c815
+Create Date: 2026-10-19 23:05:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f1c4d7e2a9b6'
+down_revision = 'e3f7a2b9c815'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_contents_author_id_status', 'contents', ['author_id', 'status'], unique=False)
+    op.create_index('ix_comments_content_id', 'comments', ['content_id'], unique=False)
+    op.create_index('ix_reactions_content_id_type', 'reactions', ['content_id', 'type'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_reactions_content_id_type', table_name='reactions')
+    op.drop_index('ix_comments_content_id', table_name='comments')
+    op.drop_index('ix_contents_author_id_status', table_name='contents')
@@ -4,4 +4,7 @@ if __name__ == "__main__":
     for rule in app.url_map.iter_rules():
         methods = ",".join(sorted(rule.methods - {"HEAD", "OPTIONS"}))
         print(f"{rule.endpoint:30s} {methods:20s} {rule.rule}")
+    if app.config.get("SCHEDULER_ENABLED"):
+        from .app.scheduling import job_runner
+        job_runner.start(app)
     app.run(host="0.0.0.0", port=5000)
\ No newline at end of file
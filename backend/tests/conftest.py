@@ -23,6 +23,7 @@ def _db_setup(app):
     yield
     with app.app_context():
         _db.drop_all()
+    app.extensions["user_deactivations"].reset()
 def get_tokens(client, email="emma.watson@example.com", password="Gt9@Xy2!QpL8#ZmR"):
     r = client.post("/auth/register", json={
         "name": "Emma Watson",
@@ -1,7 +1,10 @@
 import pytest
 from flask import Flask
 from backend.app import db
-from backend.app.models import User, Role, UserRole, Category, Content, ContentStatusEnum
+from backend.app.models import (
+    AuditLog, Category, Comment, Content, ContentStatusEnum, ContentTypeEnum, Notification, Reaction,
+    ReactionTypeEnum, Role, Subscription, User, UserRole,
+)
 from backend.tests.utils import register, login, auth_header
 ADMIN_USERS_URL = "/admin/users"
 ADMIN_DEACTIVATE_URL = "/admin/users/{uid}/deactivate"
@@ -10,6 +13,7 @@ ADMIN_CATEGORIES_URL = "/admin/categories"
 ADMIN_APPROVE_URL = "/admin/contents/{cid}/approve"
 ADMIN_FLAG_URL = "/admin/contents/{cid}/flag"
 ADMIN_DELETE_URL = "/admin/contents/{cid}"
+ADMIN_BULK_URL = "/admin/contents/bulk/{action}"
 @pytest.fixture(autouse=True)
 def seed_roles(app: Flask):
     with app.app_context():
@@ -221,4 +225,106 @@ class TestContentModeration:
             ADMIN_APPROVE_URL.format(cid=sample_content),
             headers=auth_header(tok)
         )
-        assert r2.status_code == 403
\ No newline at end of file
+        assert r2.status_code == 403
+@pytest.fixture
+def draft_batch(app):
+    with app.app_context():
+        author = User(email="bulk.author@example.com", name="Bulk Author", password_hash="x")
+        reader = User(email="bulk.reader@example.com", name="Bulk Reader", password_hash="x")
+        category = Category(name="Bulk")
+        db.session.add_all([author, reader, category])
+        db.session.flush()
+        db.session.add(Subscription(user_id=reader.id, category_id=category.id))
+        contents = [
+            Content(title=f"Draft {i}", content_type=ContentTypeEnum.article, author_id=author.id,
+                    category_id=category.id, status=ContentStatusEnum.Draft)
+            for i in range(3)
+        ]
+        db.session.add_all(contents)
+        db.session.flush()
+        contents[0].status = ContentStatusEnum.Published
+        db.session.add(Comment(content_id=contents[1].id, user_id=reader.id, body="hi"))
+        db.session.add(Reaction(content_id=contents[1].id, user_id=reader.id, type=ReactionTypeEnum.like))
+        db.session.commit()
+        return [c.id for c in contents]
+class TestBulkContentModeration:
+    def test_bulk_approve_reports_per_id_and_notifies_once(self, client, admin_token, draft_batch, app):
+        ids = draft_batch + [98765]
+        r = client.post(ADMIN_BULK_URL.format(action="approve"), json={"ids": ids}, headers=auth_header(admin_token))
+        assert r.status_code == 200
+        body = r.get_json()
+        assert body["approved"] == 2
+        assert body["notified"] == 2
+        assert [x["result"] for x in body["results"]] == ["unchanged", "approved", "approved", "not_found"]
+        with app.app_context():
+            statuses = {c.status for c in Content.query.filter(Content.id.in_(draft_batch))}
+            assert statuses == {ContentStatusEnum.Published}
+            assert Notification.query.count() == 2
+            logs = AuditLog.query.filter_by(action="bulk_approve_content").all()
+            assert len(logs) == 1
+            assert logs[0].details == {"requested": 4, "ids": draft_batch[1:]}
+    def test_bulk_flag_requires_reason(self, client, admin_token, draft_batch, app):
+        url = ADMIN_BULK_URL.format(action="flag")
+        assert client.post(url, json={"ids": draft_batch}, headers=auth_header(admin_token)).status_code == 400
+        r = client.post(url, json={"ids": draft_batch, "reason": "spam"}, headers=auth_header(admin_token))
+        assert r.status_code == 200
+        assert r.get_json()["flagged"] == 3
+        with app.app_context():
+            assert Content.query.filter_by(status=ContentStatusEnum.Flagged).count() == 3
+    def test_bulk_delete_removes_dependents(self, client, admin_token, draft_batch, app):
+        r = client.post(
+            ADMIN_BULK_URL.format(action="delete"), json={"ids": draft_batch[1:] + [98765]},
+            headers=auth_header(admin_token),
+        )
+        assert r.status_code == 200
+        assert r.get_json()["deleted"] == 2
+        with app.app_context():
+            assert [c.id for c in Content.query.all()] == draft_batch[:1]
+            assert Comment.query.count() == 0
+            assert Reaction.query.count() == 0
+    @pytest.mark.parametrize("payload", [{}, {"ids": []}, {"ids": ["1"]}, {"ids": list(range(1, 1002))}])
+    def test_bulk_invalid_payload(self, client, admin_token, payload):
+        r = client.post(ADMIN_BULK_URL.format(action="approve"), json=payload, headers=auth_header(admin_token))
+        assert r.status_code == 400
+    def test_bulk_delete_is_admin_only(self, client, draft_batch):
+        creds = {
+            "name": "Nora Price",
+            "email": "nora.price@example.com",
+            "password": "Qm7#Vd3@Lp9!XsR",
+            "role": "User",
+        }
+        register(client, creds)
+        tok = login(client, creds["email"], creds["password"]).get_json()["access_token"]
+        r = client.post(ADMIN_BULK_URL.format(action="delete"), json={"ids": draft_batch}, headers=auth_header(tok))
+        assert r.status_code == 403
+    def test_bulk_approve_by_tech_writer_is_limited_to_own_content(self, client, draft_batch, app):
+        creds = {
+            "name": "Ivy Moreno",
+            "email": "ivy.moreno@example.com",
+            "password": "Wz6@Hc1#Tb8!MqK",
+            "role": "TechWriter",
+        }
+        register(client, creds)
+        tok = login(client, creds["email"], creds["password"]).get_json()["access_token"]
+        with app.app_context():
+            writer_id = User.query.filter_by(email=creds["email"]).one().id
+            own = Content(title="Own draft", content_type=ContentTypeEnum.article, author_id=writer_id)
+            db.session.add(own)
+            db.session.commit()
+            own_id = own.id
+        r = client.post(
+            ADMIN_BULK_URL.format(action="approve"), json={"ids": [draft_batch[1], own_id]},
+            headers=auth_header(tok),
+        )
+        assert r.status_code == 200
+        assert [x["result"] for x in r.get_json()["results"]] == ["forbidden", "approved"]
+        r = client.post(
+            ADMIN_BULK_URL.format(action="flag"), json={"ids": [draft_batch[2]], "reason": "spam"},
+            headers=auth_header(tok),
+        )
+        assert r.get_json()["results"] == [{"id": draft_batch[2], "result": "forbidden"}]
+        with app.app_context():
+            assert db.session.get(Content, draft_batch[1]).status == ContentStatusEnum.Draft
+            assert db.session.get(Content, draft_batch[2]).flag_count == 0
+            assert db.session.get(Content, own_id).status == ContentStatusEnum.Published
+            assert Notification.query.count() == 0
@@ -0,0 +1,132 @@
+from datetime import datetime, timedelta
+import pytest
+from backend.app import db
+from backend.app.audit import AuditWriter, build_log_query
+from backend.app.models import AuditLog
+from backend.tests.utils import auth_header, get_tokens
+@pytest.fixture
+def user_token(client):
+    token, _ = get_tokens(client, email="omar.reed@example.com", password="Lp4!Wd7#Zr2@Kc5")
+    return token
+@pytest.fixture
+def async_writer(app, monkeypatch):
+    monkeypatch.setitem(app.config, "AUDIT_ASYNC", True)
+    monkeypatch.setitem(app.config, "AUDIT_BATCH_SIZE", 10)
+    monkeypatch.setitem(app.config, "AUDIT_FLUSH_INTERVAL", 0.05)
+    monkeypatch.setitem(app.extensions, "audit_writer", app.extensions["audit_writer"])
+    writer = AuditWriter(app)
+    yield writer
+    writer.shutdown()
+def _row(i):
+    return {"user_id": None, "action": f"action-{i}", "target_type": "Test", "target_id": i, "details": None}
+def test_sync_mode_writes_immediately(client, app, user_token):
+    client.get("/users/me/profile", headers=auth_header(user_token))
+    with app.app_context():
+        assert [log.action for log in AuditLog.query.all()] == ["get_profile"]
+def test_async_writer_batches_by_size(app, async_writer, monkeypatch):
+    sizes = []
+    original = async_writer._write_batch
+    def spy(rows):
+        sizes.append(len(rows))
+        original(rows)
+    monkeypatch.setattr(async_writer, "_write_batch", spy)
+    for i in range(25):
+        async_writer.submit(_row(i))
+    async_writer.flush()
+    assert sum(sizes) == 25
+    assert max(sizes) <= 10
+    with app.app_context():
+        assert AuditLog.query.count() == 25
+def test_async_audit_from_request(client, app, user_token, async_writer):
+    r = client.put("/users/me/profile", json={"bio": "hello"}, headers=auth_header(user_token))
+    assert r.status_code == 200
+    async_writer.flush()
+    with app.app_context():
+        log = AuditLog.query.one()
+        assert log.action == "update_profile"
+        assert log.timestamp is not None
+def test_full_queue_falls_back_to_sync_write(app, monkeypatch):
+    monkeypatch.setitem(app.config, "AUDIT_QUEUE_SIZE", 1)
+    monkeypatch.setitem(app.extensions, "audit_writer", app.extensions["audit_writer"])
+    writer = AuditWriter(app)
+    writer.enabled = True
+    monkeypatch.setattr(writer, "_ensure_started", lambda: None)
+    with app.app_context():
+        writer.submit(_row(1))
+        writer.submit(_row(2))
+        assert writer.overflowed == 1
+        assert [log.action for log in AuditLog.query.all()] == ["action-2"]
+    writer.shutdown()
+    with app.app_context():
+        assert AuditLog.query.count() == 2
+@pytest.fixture
+def seeded_logs(app):
+    base = datetime(2026, 1, 1)
+    with app.app_context():
+        db.session.execute(AuditLog.__table__.insert(), [
+            {
+                "user_id": 1 + i % 3,
+                "action": "update_content" if i % 2 else "create_content",
+                "target_type": "Content",
+                "target_id": i % 5,
+                "details": {"n": i},
+                "timestamp": base + timedelta(hours=i),
+            }
+            for i in range(30)
+        ])
+        db.session.commit()
+def test_list_logs_filters_and_hides_details(client, user_token, seeded_logs):
+    r = client.get("/audit/logs?user_id=2&action=update_content", headers=auth_header(user_token))
+    assert r.status_code == 200
+    items = r.get_json()["items"]
+    assert items and all(i["user_id"] == 2 and i["action"] == "update_content" for i in items)
+    assert "details" not in items[0]
+    r = client.get("/audit/logs?target_type=Content&target_id=3&include_details=1", headers=auth_header(user_token))
+    items = r.get_json()["items"]
+    assert items and all(i["target_id"] == 3 for i in items)
+    assert items[0]["details"] == {"n": 28}
+def test_list_logs_time_range(client, user_token, seeded_logs):
+    r = client.get(
+        "/audit/logs?since=2026-01-01T05:00:00&until=2026-01-01T10:00:00",
+        headers=auth_header(user_token),
+    )
+    stamps = [i["timestamp"] for i in r.get_json()["items"]]
+    assert stamps == [f"2026-01-01T{h:02d}:00:00" for h in range(9, 4, -1)]
+    r = client.get("/audit/logs?since=yesterday", headers=auth_header(user_token))
+    assert r.status_code == 400
+def test_list_logs_keyset_pagination(client, user_token, seeded_logs):
+    seen = []
+    cursor = None
+    while True:
+        url = "/audit/logs?limit=7" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=auth_header(user_token)).get_json()
+        seen.extend(i["id"] for i in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert len(seen) == 30
+    assert seen == sorted(seen, reverse=True)
+def _query_plan(app, **filters):
+    with app.app_context():
+        stmt = build_log_query(**filters).limit(51).statement
+        compiled = stmt.compile(dialect=db.engine.dialect)
+        params = tuple(compiled.params[name] for name in compiled.positiontup)
+        with db.engine.connect() as conn:
+            rows = conn.exec_driver_sql("EXPLAIN QUERY PLAN " + str(compiled), params).fetchall()
+    return " | ".join(row[-1] for row in rows)
+@pytest.mark.parametrize("filters, index, ordered_by_index", [
+    ({}, "SCAN audit_logs", True),
+    ({"before_id": 100}, "INTEGER PRIMARY KEY", True),
+    ({"user_id": 1}, "ix_audit_logs_user_id_id", True),
+    ({"user_id": 1, "before_id": 100}, "ix_audit_logs_user_id_id", True),
+    ({"target_type": "Content", "target_id": 3}, "ix_audit_logs_target_type_target_id_id", True),
+    ({"target_type": "Content", "target_id": 3, "before_id": 100}, "ix_audit_logs_target_type_target_id_id", True),
+    ({"action": "update_content"}, "ix_audit_logs_action_timestamp", False),
+    ({"action": "update_content", "since": datetime(2026, 1, 1)}, "ix_audit_logs_action_timestamp", False),
+    ({"since": datetime(2026, 1, 1), "until": datetime(2026, 2, 1)}, "ix_audit_logs_timestamp", False),
+])
+def test_list_log_filters_are_index_served(app, filters, index, ordered_by_index):
+    plan = _query_plan(app, **filters)
+    assert index in plan, plan
+    if ordered_by_index:
+        assert "TEMP B-TREE" not in plan, plan
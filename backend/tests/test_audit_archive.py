@@ -0,0 +1,118 @@
+import gzip
+import json
+from datetime import datetime, timedelta
+import pytest
+from backend.app import db
+from backend.app.audit_archive import add_months, audit_archive, move_from_default_ddl, partition_ddl
+from backend.app.models import AuditLog
+from backend.tests.utils import auth_header, get_tokens
+@pytest.fixture
+def user_token(client):
+    token, _ = get_tokens(client, email="ines.park@example.com", password="Qw7!Rt4#Yu1@Op3")
+    return token
+@pytest.fixture
+def archive_dir(app, tmp_path, monkeypatch):
+    monkeypatch.setitem(app.config, "AUDIT_ARCHIVE_DIR", str(tmp_path))
+    return tmp_path
+@pytest.fixture
+def monthly_logs(app):
+    with app.app_context():
+        db.session.execute(AuditLog.__table__.insert(), [
+            {
+                "user_id": 1 + i % 2,
+                "action": "update_content",
+                "target_type": "Content",
+                "target_id": i,
+                "details": {"n": i},
+                "timestamp": datetime(2026, 1 + i // 10, 1) + timedelta(hours=i),
+            }
+            for i in range(40)
+        ])
+        db.session.commit()
+def test_add_months_and_partition_ddl():
+    assert add_months(datetime(2026, 11, 1), 3) == datetime(2027, 2, 1)
+    assert add_months(datetime(2026, 1, 1), -1) == datetime(2025, 12, 1)
+    assert partition_ddl(datetime(2026, 12, 1)) == (
+        "CREATE TABLE IF NOT EXISTS audit_logs_y2026m12 PARTITION OF audit_logs "
+        "FOR VALUES FROM ('2026-12-01') TO ('2027-01-01')"
+    )
+def test_rows_in_default_partition_are_moved_before_attaching():
+    create, move, attach = move_from_default_ddl(datetime(2027, 2, 1))
+    assert create.startswith("CREATE TABLE audit_logs_y2027m02 (LIKE audit_logs")
+    assert move == (
+        "WITH moved AS (DELETE FROM audit_logs_default WHERE timestamp >= '2027-02-01' AND timestamp < '2027-03-01' "
+        "RETURNING *) INSERT INTO audit_logs_y2027m02 SELECT * FROM moved"
+    )
+    assert attach == (
+        "ALTER TABLE audit_logs ATTACH PARTITION audit_logs_y2027m02 FOR VALUES FROM ('2027-02-01') TO ('2027-03-01')"
+    )
+def test_archive_moves_old_months_to_compressed_files(app, archive_dir, monthly_logs):
+    with app.app_context():
+        entries = audit_archive.archive(older_than_months=2, now=datetime(2026, 5, 15))
+        assert [e["month"] for e in entries] == ["2026-01", "2026-02"]
+        assert [e["rows"] for e in entries] == [10, 10]
+        assert AuditLog.query.count() == 20
+        assert db.session.query(db.func.min(AuditLog.timestamp)).scalar() >= datetime(2026, 3, 1)
+        assert audit_archive.load_index() == entries
+    with gzip.open(archive_dir / "audit_logs_2026_01.ndjson.gz", "rt") as fh:
+        rows = [json.loads(line) for line in fh]
+    assert [r["target_id"] for r in rows] == list(range(9, -1, -1))
+    assert rows[0]["details"] == {"n": 9}
+def test_archive_is_noop_when_nothing_is_old(app, archive_dir, monthly_logs):
+    with app.app_context():
+        assert audit_archive.archive(older_than_months=12, now=datetime(2026, 5, 15)) == []
+        assert AuditLog.query.count() == 40
+    assert not (archive_dir / "index.json").exists()
+def test_late_rows_for_archived_month_get_a_second_part(app, archive_dir, monthly_logs):
+    with app.app_context():
+        audit_archive.archive(older_than_months=3, now=datetime(2026, 5, 15))
+        db.session.add(AuditLog(action="late", target_type="Content", target_id=1, timestamp=datetime(2026, 1, 20)))
+        db.session.commit()
+        entries = audit_archive.archive(older_than_months=3, now=datetime(2026, 5, 15))
+        assert [(e["month"], e["path"], e["rows"]) for e in entries] == [
+            ("2026-01", "audit_logs_2026_01.1.ndjson.gz", 1),
+        ]
+def test_list_logs_streams_archived_months(client, app, user_token, archive_dir, monthly_logs):
+    with app.app_context():
+        audit_archive.archive(older_than_months=2, now=datetime(2026, 5, 15))
+    r = client.get(
+        "/audit/logs?since=2026-01-01T00:00:00&until=2026-02-01T00:00:00&user_id=1&include_details=1",
+        headers=auth_header(user_token),
+    )
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [item["target_id"] for item in body["items"]] == [8, 6, 4, 2, 0]
+    assert body["items"][0]["details"] == {"n": 8}
+    assert body["next_cursor"] is None
+def test_list_logs_pages_from_hot_table_into_archive(client, app, user_token, archive_dir, monthly_logs):
+    with app.app_context():
+        audit_archive.archive(older_than_months=3, now=datetime(2026, 5, 15))
+    seen = []
+    cursor = None
+    while True:
+        url = "/audit/logs?limit=7&since=2026-01-01T00:00:00" + (f"&cursor={cursor}" if cursor else "")
+        body = client.get(url, headers=auth_header(user_token)).get_json()
+        seen.extend(item["target_id"] for item in body["items"])
+        assert all("details" not in item for item in body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == list(range(39, -1, -1))
+def test_archive_cli_command(app, runner, archive_dir, monthly_logs):
+    result = runner.invoke(args=["archive-audit-logs", "--older-than-months", "0"])
+    assert result.exit_code == 0, result.output
+    assert "2026-04: 10 rows -> audit_logs_2026_04.ndjson.gz" in result.output
+    with app.app_context():
+        assert AuditLog.query.count() == 0
+def test_partitions_command_is_noop_on_sqlite(runner):
+    result = runner.invoke(args=["audit-partitions"])
+    assert result.exit_code == 0
+    assert "not partitioned" in result.output
+def test_parquet_archive_round_trip(app, archive_dir, monthly_logs, monkeypatch):
+    pytest.importorskip("pyarrow")
+    monkeypatch.setitem(app.config, "AUDIT_ARCHIVE_FORMAT", "parquet")
+    with app.app_context():
+        entries = audit_archive.archive(older_than_months=3, now=datetime(2026, 5, 15))
+        assert entries[0]["path"] == "audit_logs_2026_01.parquet"
+        rows = list(audit_archive.iter_logs(target_id=3, include_details=True))
+    assert [(r["target_id"], r["details"]) for r in rows] == [(3, {"n": 3})]
@@ -0,0 +1,109 @@
+import time
+import pytest
+from backend.app import db
+from backend.app.cache import Cache, LRUTier, RedisTier, cache
+from backend.app.models import Category, Content, ContentTypeEnum
+from backend.tests.utils import auth_header, get_tokens, user_id_from_token
+@pytest.fixture
+def enabled_cache(app, monkeypatch):
+    monkeypatch.setitem(app.config, "CACHE_ENABLED", True)
+    cache.clear()
+    cache.stats.reset()
+    yield cache
+    cache.clear()
+@pytest.fixture
+def author(app, client):
+    token, _ = get_tokens(client, email="nia.brooks@example.com", password="Zx8!Cv5#Bn2@Mq7")
+    with app.app_context():
+        return token, user_id_from_token(token)
+@pytest.fixture
+def article(app, author):
+    with app.app_context():
+        content = Content(title="Original", body="b", content_type=ContentTypeEnum.article, author_id=author[1])
+        db.session.add(content)
+        db.session.commit()
+        return content.id
+def test_lru_tier_evicts_least_recently_used():
+    tier = LRUTier(max_entries=2)
+    tier.set("a", 1, 60)
+    tier.set("b", 2, 60)
+    tier.get("a")
+    tier.set("c", 3, 60)
+    assert tier.get("b") is None
+    assert tier.get("a") == 1 and tier.get("c") == 3
+    assert tier.stats.as_dict()["evictions"] == 1
+def test_lru_tier_expires_and_invalidates_by_tag():
+    tier = LRUTier()
+    tier.set("short", 1, 0.01)
+    tier.set("x", 1, 60, tags=("content:1",))
+    tier.set("y", 2, 60, tags=("content:1", "categories"))
+    tier.set("z", 3, 60, tags=("categories",))
+    time.sleep(0.02)
+    assert tier.get("short") is None
+    assert tier.invalidate_tags(["content:1"]) == 2
+    assert tier.get("x") is None and tier.get("y") is None and tier.get("z") == 3
+def test_shared_tier_serves_other_processes():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first, second = Cache(), Cache()
+    first.shared = RedisTier(fakeredis.FakeRedis(server=server))
+    second.shared = RedisTier(fakeredis.FakeRedis(server=server))
+    second.shared.subscribe(second.local.invalidate_tags)
+    try:
+        first.set("k", {"body": "1"}, ttl=60, tags=("content:1",))
+        assert second.get("k") == {"body": "1"}
+        assert second.stats.as_dict()["shared_hits"] == 1
+        assert second.get("k") == {"body": "1"}
+        assert second.stats.as_dict()["local_hits"] == 1
+        first.invalidate_tags("content:1")
+        assert first.get("k") is None
+        deadline = time.monotonic() + 5
+        while second.local.get("k") is not None:
+            assert time.monotonic() < deadline, "invalidation was not broadcast"
+            time.sleep(0.01)
+        assert second.get("k") is None
+    finally:
+        second.shutdown()
+def test_local_ttl_is_capped_without_shared_tier():
+    local = Cache()
+    local.local_ttl = 5
+    local.set("k", {"body": "1"}, ttl=600)
+    expires_at = local.local._entries["k"][0]
+    assert expires_at - time.monotonic() <= 5
+def test_get_content_is_cached_and_invalidated_on_update(client, enabled_cache, author, article):
+    r1 = client.get(f"/content/{article}")
+    r2 = client.get(f"/content/{article}")
+    assert r1.get_json() == r2.get_json()
+    assert r2.get_json()["title"] == "Original"
+    assert enabled_cache.stats.as_dict()["local_hits"] == 1
+    r = client.put(f"/content/{article}", json={"title": "Edited"}, headers=auth_header(author[0]))
+    assert r.status_code == 200
+    assert client.get(f"/content/{article}").get_json()["title"] == "Edited"
+    assert client.get("/content/999999").status_code == 404
+def test_reactions_are_invalidated_on_write(client, enabled_cache, author, article):
+    assert client.get(f"/content/{article}/reactions").get_json() == {}
+    client.post(f"/content/{article}/reactions", json={"type": "like"}, headers=auth_header(author[0]))
+    assert client.get(f"/content/{article}/reactions").get_json() == {"like": 1}
+    client.delete(f"/content/{article}/reactions", headers=auth_header(author[0]))
+    assert client.get(f"/content/{article}/reactions").get_json() == {}
+def test_categories_are_invalidated_on_commit(app, client, enabled_cache, author):
+    assert client.get("/categories").get_json() == []
+    with app.app_context():
+        db.session.add(Category(name="Python", created_by=author[1]))
+        db.session.commit()
+    assert [c["name"] for c in client.get("/categories").get_json()] == ["Python"]
+def test_rolled_back_changes_do_not_invalidate(app, client, enabled_cache, author, article):
+    client.get(f"/content/{article}")
+    enabled_cache.stats.reset()
+    with app.app_context():
+        db.session.get(Content, article).title = "Never saved"
+        db.session.flush()
+        db.session.rollback()
+    assert client.get(f"/content/{article}").get_json()["title"] == "Original"
+    assert enabled_cache.stats.as_dict()["invalidations"] == 0
+    assert enabled_cache.stats.as_dict()["local_hits"] == 1
+def test_disabled_cache_passes_through(client, author, article):
+    cache.stats.reset()
+    client.get(f"/content/{article}")
+    client.get(f"/content/{article}")
+    assert cache.stats.as_dict()["misses"] == 0
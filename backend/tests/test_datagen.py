@@ -0,0 +1,42 @@
+from datetime import datetime
+from types import SimpleNamespace
+import pytest
+from backend.app import db
+from backend.app.comments import _build_comment_tree
+from backend.app.models import Comment, Content, Reaction, Subscription, User
+from backend.benchmarks import datagen
+def _comment(id, parent_id=None):
+    return SimpleNamespace(id=id, user_id=1, body=f"c{id}", parent_id=parent_id, created_at=datetime(2024, 1, 1))
+def test_build_comment_tree_nests_replies_and_drops_orphans():
+    threads = _build_comment_tree([_comment(1), _comment(2, 1), _comment(3, 2), _comment(4), _comment(5, 99)])
+    assert [t["id"] for t in threads] == [1, 4]
+    assert threads[0]["replies"][0]["id"] == 2
+    assert threads[0]["replies"][0]["replies"][0]["id"] == 3
+def test_generate_is_deterministic_and_consistent():
+    counts = datagen.counts_for("tiny", comments=500)
+    first = datagen.generate(counts, seed=7)
+    assert first == datagen.generate(counts, seed=7)
+    assert first != datagen.generate(counts, seed=8)
+    assert {name: len(rows) for name, rows in first.items()} == counts
+    owner = {c["id"]: c["content_id"] for c in first["comments"]}
+    replies = [c for c in first["comments"] if c["parent_id"]]
+    assert replies
+    assert all(c["parent_id"] < c["id"] and owner[c["parent_id"]] == c["content_id"] for c in replies)
+    assert len({(r["user_id"], r["content_id"]) for r in first["reactions"]}) == counts["reactions"]
+    assert len({(s["user_id"], s["category_id"]) for s in first["subscriptions"]}) == counts["subscriptions"]
+def test_counts_for_rejects_unknown_scale():
+    with pytest.raises(ValueError):
+        datagen.counts_for("galactic")
+def test_populate_loads_rows_the_api_can_serve(app, client):
+    loaded = datagen.populate(app, "tiny", seed=1)
+    with app.app_context():
+        assert User.query.count() == loaded["users"]
+        assert Content.query.count() == loaded["contents"]
+        assert Reaction.query.count() == loaded["reactions"]
+        assert Subscription.query.count() == loaded["subscriptions"]
+        content_id = db.session.query(Comment.content_id).filter(Comment.parent_id.isnot(None)).first()[0]
+    r = client.get(f"/content/{content_id}/comments")
+    assert r.status_code == 200
+    assert any(thread["replies"] for thread in r.get_json())
+    r = client.post("/auth/login", json={"email": datagen.user_email(1), "password": datagen.DEFAULT_PASSWORD})
+    assert r.status_code == 200
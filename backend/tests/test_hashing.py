@@ -0,0 +1,47 @@
+import bcrypt as _bcrypt
+import pytest
+from backend.app import db, hasher
+from backend.app.hashing import HashingBusy
+from backend.app.models import User
+from backend.tests.utils import login
+EMAIL = "nora.hughes@example.com"
+PASSWORD = "Qw8!Lz3#Vn6@Tb1$"
+def _legacy_hash(password, rounds=5):
+    return _bcrypt.hashpw(password.encode(), _bcrypt.gensalt(rounds)).decode()
+@pytest.fixture
+def legacy_user(app):
+    with app.app_context():
+        user = User(email=EMAIL, name="Nora Hughes", password_hash=_legacy_hash(PASSWORD))
+        db.session.add(user)
+        db.session.commit()
+        return user.id
+def test_generate_uses_configured_cost(app):
+    pw_hash = hasher.generate(PASSWORD)
+    assert hasher.cost_of(pw_hash) == app.config["BCRYPT_LOG_ROUNDS"]
+    assert hasher.check(pw_hash, PASSWORD)
+    assert not hasher.check(pw_hash, "wrong-password")
+    assert not hasher.needs_rehash(pw_hash)
+def test_unusable_hash_never_matches():
+    assert not hasher.is_usable(None)
+    assert not hasher.check(None, PASSWORD)
+    assert not hasher.check("!", PASSWORD)
+def test_login_rehashes_when_cost_differs(client, app, legacy_user):
+    r = login(client, EMAIL, PASSWORD)
+    assert r.status_code == 200
+    with app.app_context():
+        user = db.session.get(User, legacy_user)
+        assert hasher.cost_of(user.password_hash) == app.config["BCRYPT_LOG_ROUNDS"]
+        assert hasher.check(user.password_hash, PASSWORD)
+def test_failed_login_keeps_stored_hash(client, app, legacy_user):
+    r = login(client, EMAIL, "not-the-password")
+    assert r.status_code == 401
+    with app.app_context():
+        user = db.session.get(User, legacy_user)
+        assert hasher.cost_of(user.password_hash) == 5
+def test_saturated_pool_returns_503(client, monkeypatch, legacy_user):
+    def busy(*args):
+        raise HashingBusy()
+    monkeypatch.setattr(hasher, "_run", busy)
+    r = login(client, EMAIL, PASSWORD)
+    assert r.status_code == 503
+    assert r.headers["Retry-After"] == "1"
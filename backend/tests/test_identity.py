@@ -0,0 +1,84 @@
+import time
+import pytest
+from backend.app import db
+from backend.app.identity import IdentityCache, identity_loader
+from backend.app.models import Role, User, UserRole
+from backend.app.revocation import RedisDeactivatedUsers
+from backend.tests.utils import auth_header, count_queries, get_tokens, user_id_from_token
+@pytest.fixture
+def identity_cache(app, monkeypatch):
+    monkeypatch.setitem(app.config, "IDENTITY_CACHE_TTL", 30)
+    identity_loader.cache.clear()
+    yield identity_loader.cache
+    identity_loader.cache.clear()
+@pytest.fixture
+def tokens(app, client):
+    admin_token, _ = get_tokens(client, email="rhea.admin@example.com", password="Ad9!Mn4#Rt7@Qw2")
+    user_token, _ = get_tokens(client, email="sam.user@example.com", password="Us3!Er8#Xz5@Kl1")
+    with app.app_context():
+        admin_id = user_id_from_token(admin_token)
+        user_id = user_id_from_token(user_token)
+        role = Role.query.filter_by(name="Admin").first() or Role(name="Admin")
+        db.session.add(role)
+        db.session.flush()
+        db.session.add(UserRole(user_id=admin_id, role_id=role.id))
+        if not Role.query.filter_by(name="TechWriter").first():
+            db.session.add(Role(name="TechWriter"))
+        db.session.commit()
+    return {"admin": admin_token, "user": user_token, "user_id": user_id}
+def test_me_loads_identity_in_one_query_then_from_cache(app, client, tokens, identity_cache):
+    r, statements = count_queries(app, lambda: client.get("/auth/me", headers=auth_header(tokens["admin"])))
+    assert r.status_code == 200
+    assert "Admin" in r.get_json()["roles"]
+    assert len(statements) == 1
+    r, statements = count_queries(app, lambda: client.get("/auth/me", headers=auth_header(tokens["admin"])))
+    assert r.status_code == 200
+    assert statements == []
+def test_promotion_invalidates_cached_roles(client, tokens, identity_cache):
+    assert "TechWriter" not in client.get("/auth/me", headers=auth_header(tokens["user"])).get_json()["roles"]
+    r = client.post(f"/admin/users/{tokens['user_id']}/promote/TechWriter", headers=auth_header(tokens["admin"]))
+    assert r.status_code == 200
+    assert "TechWriter" in client.get("/auth/me", headers=auth_header(tokens["user"])).get_json()["roles"]
+    r = client.post("/content", json={"title": "t", "content_type": "article"}, headers=auth_header(tokens["user"]))
+    assert r.status_code == 201
+def test_deactivation_invalidates_cached_identity(client, tokens, identity_cache):
+    assert client.get("/auth/me", headers=auth_header(tokens["user"])).get_json()["is_active"] is True
+    r = client.post(f"/admin/users/{tokens['user_id']}/deactivate", headers=auth_header(tokens["admin"]))
+    assert r.status_code == 200
+    r = client.get("/auth/me", headers=auth_header(tokens["user"]))
+    assert r.status_code == 401
+    assert r.get_json() == {"error": "Account deactivated."}
+def test_deleted_user_is_rejected(app, client, tokens):
+    with app.app_context():
+        db.session.delete(db.session.get(User, tokens["user_id"]))
+        db.session.commit()
+    r = client.get("/auth/me", headers=auth_header(tokens["user"]))
+    assert r.status_code == 401
+    assert r.get_json() == {"error": "User not found."}
+def test_non_admin_is_forbidden_without_role_query(app, client, tokens, identity_cache):
+    client.get("/auth/me", headers=auth_header(tokens["user"]))
+    r, statements = count_queries(
+        app, lambda: client.post(f"/admin/users/{tokens['user_id']}/deactivate", headers=auth_header(tokens["user"]))
+    )
+    assert r.status_code == 403
+    assert statements == []
+def test_identity_invalidations_are_broadcast():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = RedisDeactivatedUsers(fakeredis.FakeRedis(server=server), sync_seconds=0)
+    second = RedisDeactivatedUsers(fakeredis.FakeRedis(server=server), sync_seconds=0)
+    cache = IdentityCache()
+    second.on_identity_change = cache.invalidate
+    try:
+        cache.set(7, "cached", 60)
+        cache.set(8, "other", 60)
+        first.publish_identity_change({7})
+        deadline = time.monotonic() + 5
+        while cache.get(7, 60) is not None:
+            assert time.monotonic() < deadline, "identity invalidation was not broadcast"
+            time.sleep(0.01)
+        assert cache.get(8, 60) == "other"
+        assert 7 not in second
+    finally:
+        first.shutdown()
+        second.shutdown()
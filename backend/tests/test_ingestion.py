@@ -0,0 +1,138 @@
+import gzip
+import hashlib
+import threading
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from backend.app import db
+from backend.app.ingestion import FeedError, ingestor, parse_feed
+from backend.app.models import Content, ContentTypeEnum, FeedState, User
+from backend.app.moderation import counters
+RSS = b"""<?xml version="1.0"?>
+<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">
+<channel><title>Pod</title>
+<item><title>Episode 1</title><guid>ep-1</guid><link>https://pod.example/1</link>
+<description>First</description><pubDate>Tue, 06 Jan 2026 10:00:00 +0200</pubDate>
+<enclosure url="https://cdn.example/1.mp3" type="audio/mpeg"/></item>
+<item><title>Episode 2</title><link>https://pod.example/2</link><content:encoded>Second</content:encoded></item>
+<item><guid>no-title</guid></item>
+</channel></rss>"""
+ATOM = b"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom" xmlns:yt="http://www.youtube.com/xml/schemas/2015" xmlns:media="http://search.yahoo.com/mrss/">
+<entry><id>yt:video:abc</id><title>Talk</title>
+<link rel="alternate" href="https://www.youtube.com/watch?v=abc"/>
+<published>2026-02-01T12:00:00+00:00</published>
+<media:group><media:description>A talk</media:description></media:group></entry>
+</feed>"""
+def test_parse_rss():
+    items = parse_feed(RSS)
+    assert [i["guid"] for i in items] == ["ep-1", "https://pod.example/2"]
+    assert items[0]["media_url"] == "https://cdn.example/1.mp3"
+    assert items[0]["published_at"] == datetime(2026, 1, 6, 8, 0)
+    assert items[1]["body"] == "Second"
+def test_parse_atom():
+    [item] = parse_feed(ATOM)
+    assert item["guid"] == "yt:video:abc"
+    assert item["link"] == "https://www.youtube.com/watch?v=abc"
+    assert item["body"] == "A talk"
+    assert item["published_at"] == datetime(2026, 2, 1, 12, 0)
+def test_parse_rejects_garbage():
+    with pytest.raises(FeedError):
+        parse_feed(b"<html><body>nope</body></html>")
+    with pytest.raises(FeedError):
+        parse_feed(b"not xml")
+@pytest.fixture
+def feeds(app, monkeypatch):
+    documents = {"/pod.xml": RSS, "/yt.xml": ATOM}
+    requests_seen = []
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            body = documents.get(self.path)
+            requests_seen.append((self.path, dict(self.headers)))
+            if body is None:
+                self.send_response(404)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+                return
+            etag = '"%s"' % hashlib.md5(body).hexdigest()
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            payload = body
+            self.send_response(200)
+            self.send_header("ETag", etag)
+            if "gzip" in self.headers.get("Accept-Encoding", ""):
+                payload = gzip.compress(body)
+                self.send_header("Content-Encoding", "gzip")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+        def log_message(self, *args):
+            pass
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    monkeypatch.setitem(app.config, "FEED_SOURCES", [
+        {"name": "podcasts", "url": base + "/pod.xml", "content_type": "audio"},
+        {"name": "youtube", "url": base + "/yt.xml", "content_type": "video"},
+        {"name": "broken", "url": base + "/missing.xml", "content_type": "article"},
+    ])
+    documents["_requests"] = requests_seen
+    yield documents
+    server.shutdown()
+    server.server_close()
+def test_ingest_upserts_and_deduplicates(app, feeds):
+    with app.app_context():
+        results = ingestor.ingest()
+        assert results["podcasts"] == {"items": 2, "error": None, "not_modified": False}
+        assert results["youtube"] == {"items": 1, "error": None, "not_modified": False}
+        assert results["broken"]["items"] == 0 and "404" in results["broken"]["error"]
+        feeds["/pod.xml"] = RSS.replace(b"Episode 1", b"Episode 1 (remastered)")
+        ingestor.ingest(names=["podcasts"])
+        contents = {c.external_id: c for c in Content.query.all()}
+        assert len(contents) == 3
+        assert contents["ep-1"].title == "Episode 1 (remastered)"
+        assert contents["ep-1"].content_type == ContentTypeEnum.audio
+        assert contents["yt:video:abc"].content_type == ContentTypeEnum.video
+        assert contents["yt:video:abc"].created_at == datetime(2026, 2, 1, 12, 0)
+        author = db.session.get(User, contents["ep-1"].author_id)
+        assert author.email == app.config["FEED_SYSTEM_USER_EMAIL"]
+        assert author.password_hash is None
+def test_ingest_counts_only_rows_it_inserted(app, feeds):
+    with app.app_context():
+        before = counters.totals().get(("type", "audio"), 0)
+        db.session.add(Content(
+            title="Raced", body="b", content_type=ContentTypeEnum.audio, external_id="ep-1",
+            author_id=ingestor._system_author_id(),
+        ))
+        db.session.commit()
+        assert ingestor.ingest(names=["podcasts"])["podcasts"]["items"] == 2
+        assert counters.totals()[("type", "audio")] == before + 2
+        assert Content.query.filter_by(external_id="ep-1").one().title == "Episode 1"
+def test_ingest_cli(runner, feeds):
+    result = runner.invoke(args=["ingest-feeds", "--source", "youtube"])
+    assert result.exit_code == 0, result.output
+    assert result.output.strip() == "youtube: 1 items"
+def test_ingest_uses_conditional_requests(app, feeds):
+    with app.app_context():
+        ingestor.ingest(names=["podcasts"])
+        state = FeedState.query.one()
+        assert state.etag and state.changed_at is not None
+        first_etag, first_changed = state.etag, state.changed_at
+        results = ingestor.ingest(names=["podcasts"])
+        assert results["podcasts"] == {"items": 0, "error": None, "not_modified": True}
+        state = FeedState.query.one()
+        assert state.changed_at == first_changed
+        assert state.fetched_at > first_changed
+        feeds["/pod.xml"] = RSS.replace(b"Episode 2", b"Episode 2b")
+        assert ingestor.ingest(names=["podcasts"])["podcasts"]["items"] == 2
+    sent = [headers for path, headers in feeds["_requests"] if path == "/pod.xml"]
+    assert "If-None-Match" not in sent[0]
+    assert sent[1]["If-None-Match"] == first_etag
+    assert all("gzip" in h["Accept-Encoding"] for h in sent)
+def test_parse_feed_streams_from_file_object():
+    import io
+    items = parse_feed(io.BytesIO(RSS))
+    assert len(items) == 2
@@ -0,0 +1,66 @@
+import os
+import signal
+import subprocess
+import sys
+import time
+import pytest
+from flask_jwt_extended import create_access_token
+from sqlalchemy import create_engine, text
+from backend.app import db
+from backend.app.models import User
+from backend.benchmarks.common import PROJECT_ROOT
+from backend.benchmarks.loadtest_workers import free_port
+@pytest.fixture
+def sqlite_file(tmp_path):
+    path = tmp_path / "served.db"
+    engine = create_engine(f"sqlite:///{path}")
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(User.__table__.insert().values(id=1, email="served@example.com", name="Served"))
+    yield engine
+    engine.dispose()
+def test_gunicorn_preload_serves_and_flushes_audit_on_shutdown(app, sqlite_file):
+    pytest.importorskip("gunicorn")
+    requests = pytest.importorskip("requests")
+    with app.app_context():
+        token = create_access_token(identity="1")
+    port = free_port()
+    env = dict(
+        os.environ,
+        PYTHONPATH=PROJECT_ROOT,
+        APP_CONFIG="backend.config.ProdConfig",
+        DATABASE_URL=str(sqlite_file.url),
+        GUNICORN_BIND=f"127.0.0.1:{port}",
+        GUNICORN_WORKERS="1",
+        GUNICORN_WORKER_CLASS="gthread",
+        AUDIT_ASYNC="true",
+        AUDIT_FLUSH_INTERVAL="60",
+    )
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", os.path.join(PROJECT_ROOT, "backend", "gunicorn.conf.py"), "backend.wsgi:app"],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        deadline = time.monotonic() + 30
+        while True:
+            try:
+                r = requests.get(
+                    f"http://127.0.0.1:{port}/users/me/profile",
+                    headers={"Authorization": f"Bearer {token}", "Connection": "close"},
+                    timeout=5,
+                )
+                break
+            except requests.ConnectionError:
+                assert time.monotonic() < deadline, "gunicorn did not start"
+                time.sleep(0.1)
+        assert r.status_code == 200
+    finally:
+        proc.send_signal(signal.SIGTERM)
+        proc.wait(30)
+    assert proc.returncode == 0
+    with sqlite_file.connect() as conn:
+        actions = [row[0] for row in conn.execute(text("SELECT action FROM audit_logs"))]
+    assert actions == ["get_profile"]
@@ -0,0 +1,77 @@
+import gc
+import json
+import subprocess
+import sys
+import threading
+import pytest
+from backend.app.metrics import metrics
+@pytest.fixture
+def fresh_metrics():
+    metrics.reset()
+    yield metrics
+    metrics._multiproc_dir = None
+def _sample(text, prefix):
+    for line in text.splitlines():
+        if line.startswith(prefix):
+            return float(line.rsplit(" ", 1)[1])
+    return None
+def test_metrics_exposes_latency_status_and_db_counts(client, fresh_metrics):
+    for _ in range(3):
+        assert client.get("/categories").status_code == 200
+    client.get("/no/such/route")
+    r = client.get("/metrics")
+    assert r.status_code == 200
+    assert r.content_type.startswith("text/plain; version=0.0.4")
+    body = r.get_data(as_text=True)
+    assert _sample(body, 'http_request_duration_seconds_count{method="GET",route="/categories"}') == 3
+    assert _sample(body, 'http_request_duration_seconds_bucket{method="GET",route="/categories",le="+Inf"}') == 3
+    assert _sample(body, 'http_requests_total{method="GET",route="/categories",status="200"}') == 3
+    assert _sample(body, 'http_db_queries_total{method="GET",route="/categories"}') >= 3
+    assert _sample(body, 'http_requests_total{method="GET",route="<unmatched>",status="404"}') == 1
+    assert "# TYPE audit_queue_depth gauge" in body
+def test_histogram_buckets_are_cumulative(client, fresh_metrics):
+    client.get("/categories")
+    body = client.get("/metrics").get_data(as_text=True)
+    counts = [
+        float(line.rsplit(" ", 1)[1])
+        for line in body.splitlines()
+        if line.startswith('http_request_duration_seconds_bucket{method="GET",route="/categories"')
+    ]
+    assert counts == sorted(counts)
+    assert counts[-1] == 1
+def test_metrics_token_required_when_configured(app, client, monkeypatch, fresh_metrics):
+    monkeypatch.setitem(app.config, "METRICS_TOKEN", "s3cret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer s3cret"}).status_code == 200
+def test_counts_survive_thread_exit(client, fresh_metrics):
+    worker = threading.Thread(target=lambda: [client.get("/categories") for _ in range(2)])
+    worker.start()
+    worker.join()
+    del worker
+    gc.collect()
+    assert not any(shard.latency for shard in metrics._shards)
+    body = client.get("/metrics").get_data(as_text=True)
+    assert _sample(body, 'http_request_duration_seconds_count{method="GET",route="/categories"}') == 2
+def test_multiprocess_snapshots_are_merged(client, fresh_metrics, tmp_path):
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    def write(name, pid):
+        snapshot = {
+            "pid": pid,
+            "latency": [["GET", "/categories"] + [1] + [0] * 14 + [0.002]],
+            "statuses": [["GET", "/categories", 200, 1]],
+            "db": [["GET", "/categories", 2, 0.001]],
+            "gauges": {"audit_queue_depth": [[[], 7]]},
+        }
+        (tmp_path / f"metrics-{name}.json").write_text(json.dumps(snapshot))
+    write("live", sys.modules["os"].getppid())
+    write("dead", dead.pid)
+    metrics._multiproc_dir = str(tmp_path)
+    client.get("/categories")
+    body = client.get("/metrics").get_data(as_text=True)
+    assert _sample(body, 'http_request_duration_seconds_count{method="GET",route="/categories"}') == 3
+    assert _sample(body, 'http_requests_total{method="GET",route="/categories",status="200"}') == 3
+    assert _sample(body, "audit_queue_depth ") == 7
+    metrics.flush()
+    assert (tmp_path / f"metrics-{metrics._instance}.json").exists()
@@ -0,0 +1,127 @@
+import pytest
+from backend.app import db
+from sqlalchemy import func, select
+from backend.app.models import Category, Content, ContentCounter, Flag
+from backend.app.moderation import counters
+from backend.tests.utils import auth_header, login, register
+def _token(client, email, role):
+    password = "Mq4#Tz8!Kw2@Lr6"
+    register(client, {"name": email.split("@")[0], "email": email, "password": password, "role": role})
+    return login(client, email, password).get_json()["access_token"]
+@pytest.fixture
+def admin(client):
+    return _token(client, "moderation.admin@example.com", "Admin")
+@pytest.fixture
+def writer(client):
+    return _token(client, "moderation.writer@example.com", "TechWriter")
+@pytest.fixture
+def category_id(app):
+    with app.app_context():
+        category = Category(name="Moderation")
+        db.session.add(category)
+        db.session.commit()
+        return category.id
+def _create(client, token, category_id, title="Post", content_type="article", status="Draft"):
+    r = client.post("/content", json={
+        "title": title, "content_type": content_type, "status": status, "category_id": category_id,
+    }, headers=auth_header(token))
+    assert r.status_code == 201
+    return r.get_json()["id"]
+def _nonzero(app):
+    key = (ContentCounter.author_id, ContentCounter.dimension, ContentCounter.key)
+    with app.app_context():
+        rows = db.session.execute(select(*key, func.sum(ContentCounter.count)).group_by(*key)).all()
+        return {tuple(row[:3]): row[3] for row in rows if row[3]}
+def _assert_counters_consistent(app, runner):
+    maintained = _nonzero(app)
+    assert runner.invoke(args=["rebuild-counters"]).exit_code == 0
+    assert _nonzero(app) == maintained
+def test_stats_follow_orm_writes(app, client, runner, admin, writer, category_id):
+    first = _create(client, writer, category_id)
+    second = _create(client, writer, category_id, content_type="video", status="Published")
+    client.post(f"/content/{second}/comments", json={"body": "nice"}, headers=auth_header(writer))
+    client.post(f"/content/{second}/reactions", json={"type": "like"}, headers=auth_header(writer))
+    client.post(f"/admin/contents/{first}/approve", headers=auth_header(admin))
+    r = client.get("/content/stats", headers=auth_header(admin))
+    assert r.status_code == 200
+    stats = r.get_json()
+    assert stats["totalPosts"] == 2
+    assert stats["postsPending"] == 0
+    assert stats["likes"] == 1
+    assert stats["comments"] == 1
+    assert stats["byStatus"] == {"Published": 2}
+    assert stats["byType"] == {"article": 1, "video": 1}
+    assert stats["byCategory"] == {str(category_id): 2}
+    _assert_counters_consistent(app, runner)
+    client.delete(f"/admin/contents/{second}", headers=auth_header(admin))
+    stats = client.get("/content/stats", headers=auth_header(admin)).get_json()
+    assert (stats["totalPosts"], stats["likes"], stats["comments"]) == (1, 0, 0)
+    _assert_counters_consistent(app, runner)
+def test_writer_stats_cover_only_their_content(client, admin, writer, category_id):
+    mine = _create(client, writer, category_id, status="Published")
+    theirs = _create(client, admin, category_id, content_type="video", status="Published")
+    for cid in (mine, theirs):
+        client.post(f"/content/{cid}/comments", json={"body": "hi"}, headers=auth_header(admin))
+        client.post(f"/content/{cid}/reactions", json={"type": "like"}, headers=auth_header(admin))
+    stats = client.get("/content/stats", headers=auth_header(writer)).get_json()
+    assert (stats["totalPosts"], stats["likes"], stats["comments"]) == (1, 1, 1)
+    assert stats["byType"] == {"article": 1}
+    assert stats["byCategory"] == {str(category_id): 1}
+    assert client.get("/content/stats", headers=auth_header(admin)).get_json()["totalPosts"] == 2
+def test_writer_stats_follow_bulk_moderation(app, client, runner, admin, writer, category_id):
+    ids = [_create(client, writer, category_id, title=f"Draft {i}") for i in range(3)]
+    other = _create(client, admin, category_id, status="Published")
+    for cid in (ids[0], other):
+        client.post(f"/content/{cid}/comments", json={"body": "hi"}, headers=auth_header(admin))
+        client.post(f"/content/{cid}/reactions", json={"type": "like"}, headers=auth_header(admin))
+    client.post("/admin/contents/bulk/approve", json={"ids": ids[:2] + [other]}, headers=auth_header(admin))
+    client.post("/admin/contents/bulk/flag", json={"ids": [ids[1], other], "reason": "spam"}, headers=auth_header(admin))
+    stats = client.get("/content/stats", headers=auth_header(writer)).get_json()
+    assert stats["byStatus"] == {"Draft": 1, "Flagged": 1, "Published": 1}
+    _assert_counters_consistent(app, runner)
+    client.post("/admin/contents/bulk/delete", json={"ids": [ids[0], other]}, headers=auth_header(admin))
+    stats = client.get("/content/stats", headers=auth_header(writer)).get_json()
+    assert (stats["totalPosts"], stats["likes"], stats["comments"]) == (2, 0, 0)
+    assert stats["byStatus"] == {"Draft": 1, "Flagged": 1}
+    _assert_counters_consistent(app, runner)
+def test_flag_persists_row_and_count(app, client, admin, writer, category_id):
+    cid = _create(client, writer, category_id, title="Spam")
+    for reason in ("spam", "off-topic"):
+        r = client.post(f"/admin/contents/{cid}/flag", json={"reason": reason}, headers=auth_header(admin))
+        assert r.status_code == 200
+    with app.app_context():
+        assert db.session.get(Content, cid).flag_count == 2
+        assert Flag.query.filter_by(content_id=cid).count() == 2
+    items = client.get("/content/flagged", headers=auth_header(admin)).get_json()["items"]
+    assert [(i["id"], i["type"], i["reason"], i["flag_count"]) for i in items] == [(cid, "article", "off-topic", 2)]
+def test_queue_is_cursor_paginated_and_scoped(app, client, runner, admin, writer, category_id):
+    ids = [_create(client, writer, category_id, title=f"Draft {i}") for i in range(5)]
+    other = _create(client, admin, category_id, title="Admin draft")
+    client.post("/admin/contents/bulk/flag", json={"ids": ids[:2], "reason": "spam"}, headers=auth_header(admin))
+    seen, cursor = [], None
+    for _ in range(len(ids) + 1):
+        params = {"queue": "pending", "limit": 2}
+        if cursor:
+            params["cursor"] = cursor
+        body = client.get("/content/flagged", query_string=params, headers=auth_header(admin)).get_json()
+        seen += [item["id"] for item in body["items"]]
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert seen == [other] + ids[:1:-1]
+    mine = client.get("/content/flagged", query_string={"queue": "pending"}, headers=auth_header(writer)).get_json()
+    assert [item["id"] for item in mine["items"]] == ids[:1:-1]
+    flagged = client.get("/content/flagged", headers=auth_header(writer)).get_json()["items"]
+    assert {item["id"] for item in flagged} == set(ids[:2])
+    stats = client.get("/content/stats", headers=auth_header(admin)).get_json()
+    assert (stats["flagged"], stats["postsPending"]) == (2, 4)
+    _assert_counters_consistent(app, runner)
+    client.post("/admin/contents/bulk/delete", json={"ids": ids}, headers=auth_header(admin))
+    assert client.get("/content/stats", headers=auth_header(admin)).get_json()["totalPosts"] == 1
+    _assert_counters_consistent(app, runner)
+@pytest.mark.parametrize("params", [{"queue": "archived"}, {"cursor": "yesterday|1"}])
+def test_queue_rejects_bad_parameters(client, admin, params):
+    assert client.get("/content/flagged", query_string=params, headers=auth_header(admin)).status_code == 400
+def test_moderation_requires_writer_or_admin(client, user_token):
+    assert client.get("/content/flagged", headers=auth_header(user_token)).status_code == 403
+    assert client.get("/content/stats", headers=auth_header(user_token)).status_code == 403
@@ -0,0 +1,73 @@
+import pytest
+from backend.app import db, hasher
+from backend.app.models import FederatedIdentity, User
+class DummyGoogle:
+    def __init__(self, userinfo):
+        self.userinfo = userinfo
+    def authorize_access_token(self):
+        return {"access_token": "t"}
+    def parse_id_token(self, token):
+        return self.userinfo
+class DummyResponse:
+    def __init__(self, payload):
+        self.payload = payload
+    def json(self):
+        return self.payload
+class DummyGithub:
+    def __init__(self, profile, emails):
+        self.profile = profile
+        self.emails = emails
+        self.calls = []
+    def authorize_access_token(self):
+        return {"access_token": "t"}
+    def get(self, path, token=None):
+        self.calls.append(path)
+        return DummyResponse(self.profile if path == "user" else self.emails)
+class DummyOAuth:
+    def __init__(self, google=None, github=None):
+        self.google = google
+        self.github = github
+@pytest.fixture
+def fake_oauth(monkeypatch):
+    def install(**providers):
+        monkeypatch.setattr("backend.app.auth.oauth", DummyOAuth(**providers))
+    return install
+def test_google_first_login_creates_user_without_password(client, app, fake_oauth, monkeypatch):
+    def fail(*args):
+        raise AssertionError("OAuth sign-up must not hash a password")
+    monkeypatch.setattr(hasher, "generate", fail)
+    fake_oauth(google=DummyGoogle({"sub": "g-123", "email": "gina.ross@example.com", "name": "Gina Ross"}))
+    r = client.get("/auth/callback/google")
+    assert r.status_code == 200
+    assert r.get_json()["access_token"]
+    with app.app_context():
+        user = User.query.filter_by(email="gina.ross@example.com").one()
+        assert user.password_hash is None
+        identity = FederatedIdentity.query.filter_by(provider="google", subject="g-123").one()
+        assert identity.user_id == user.id
+def test_google_repeat_login_reuses_identity(client, app, fake_oauth):
+    fake_oauth(google=DummyGoogle({"sub": "g-456", "email": "hal.ito@example.com"}))
+    assert client.get("/auth/callback/google").status_code == 200
+    fake_oauth(google=DummyGoogle({"sub": "g-456", "email": "hal.ito@new-domain.example.com"}))
+    assert client.get("/auth/callback/google").status_code == 200
+    with app.app_context():
+        assert User.query.count() == 1
+        assert FederatedIdentity.query.count() == 1
+def test_github_links_existing_account_by_email(client, app, fake_oauth):
+    with app.app_context():
+        db.session.add(User(email="ivy.lane@example.com", name="Ivy", password_hash=hasher.generate("Pw!12345678")))
+        db.session.commit()
+    github = DummyGithub({"id": 77, "email": None, "name": "Ivy Lane"}, [{"email": "ivy.lane@example.com", "primary": True}])
+    fake_oauth(github=github)
+    assert client.get("/auth/callback/github").status_code == 200
+    assert client.get("/auth/callback/github").status_code == 200
+    assert github.calls.count("user/emails") == 1
+    with app.app_context():
+        user = User.query.filter_by(email="ivy.lane@example.com").one()
+        assert hasher.check(user.password_hash, "Pw!12345678")
+        assert [i.subject for i in user.identities] == ["77"]
+def test_oauth_only_account_cannot_password_login(client, fake_oauth):
+    fake_oauth(google=DummyGoogle({"sub": "g-789", "email": "jon.park@example.com"}))
+    client.get("/auth/callback/google")
+    r = client.post("/auth/login", json={"email": "jon.park@example.com", "password": ""})
+    assert r.status_code == 401
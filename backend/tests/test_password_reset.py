@@ -139,4 +139,12 @@ def test_reset_password_sms_with_incorrect_code(client, monkeypatch, app):
         "confirm_password": "M3x!c0$p!55@"
     })
     assert r.status_code == 400
-    assert "Invalid or expired code." in r.get_json()["error"]
\ No newline at end of file
+    assert "Invalid or expired code." in r.get_json()["error"]
+def test_reset_request_ignores_stale_identity_map(client, app):
+    user = User.query.filter_by(email="ursula.parker@example.com").one()
+    db.session.execute(User.__table__.update().where(User.__table__.c.id == user.id).values(is_active=False))
+    db.session.commit()
+    assert user.is_active is True
+    r = client.post("/auth/request-password-reset", json={"email": "ursula.parker@example.com"})
+    assert r.status_code == 200
+    assert PasswordResetToken.query.count() == 0
@@ -0,0 +1,72 @@
+import time
+import pytest
+from backend.app.profiling import ProfileStore, request_profiler, sign, verify
+@pytest.fixture
+def profiling(app):
+    app.config.update(PROFILING_ENABLED=True, PROFILING_BACKEND="cprofile", PROFILING_SAMPLE_RATE=0.0)
+    request_profiler.init_app(app)
+    yield request_profiler
+    app.config.update(PROFILING_ENABLED=False, PROFILING_BACKEND="auto", PROFILING_SAMPLE_RATE=0.0)
+    app.before_request_funcs[None].remove(request_profiler._start)
+    app.after_request_funcs[None].remove(request_profiler._finish)
+    app.teardown_request_funcs[None].remove(request_profiler._abandon)
+    request_profiler.init_app(app)
+def _header(app, ttl=60):
+    return {"X-Profile": sign(app.config["SECRET_KEY"], int(time.time()) + ttl)}
+def test_disabled_profiler_registers_no_hooks(app, client):
+    assert request_profiler._start not in app.before_request_funcs.get(None, [])
+    assert request_profiler._finish not in app.after_request_funcs.get(None, [])
+    client.get("/categories", headers=_header(app))
+    assert request_profiler.store.all() == []
+def test_signed_header_captures_profile_and_sql(app, client, profiling, admin_token):
+    assert client.get("/categories", headers=_header(app)).status_code == 200
+    client.get("/categories")
+    auth = {"Authorization": f"Bearer {admin_token}"}
+    r = client.get("/admin/profiles", headers=auth)
+    assert r.status_code == 200
+    summaries = r.get_json()
+    assert len(summaries) == 1
+    assert summaries[0]["endpoint"] == "categories.list_categories"
+    assert summaries[0]["trigger"] == "header"
+    assert "collapsed" not in summaries[0]
+    record = client.get(f"/admin/profiles/{summaries[0]['id']}", headers=auth).get_json()
+    assert record["backend"] == "cprofile"
+    assert any("FROM categories" in q["statement"] for q in record["sql"])
+    assert record["top"]
+    r = client.get(f"/admin/profiles/{summaries[0]['id']}/collapsed", headers=auth)
+    assert r.mimetype == "text/plain"
+    lines = r.get_data(as_text=True).splitlines()
+    assert all(int(line.rsplit(" ", 1)[1]) > 0 for line in lines)
+    assert any(";" in line for line in lines)
+def test_invalid_or_expired_signature_is_ignored(app, client, profiling):
+    client.get("/categories", headers={"X-Profile": "9999999999.forged"})
+    client.get("/categories", headers=_header(app, ttl=-10))
+    assert profiling.store.all() == []
+def test_sample_rate_profiles_unsigned_requests(app, client, profiling):
+    app.config["PROFILING_SAMPLE_RATE"] = 1.0
+    client.get("/categories")
+    assert [r["trigger"] for r in profiling.store.all()] == ["sample"]
+def test_pyinstrument_backend_when_installed(app, client, profiling):
+    pytest.importorskip("pyinstrument")
+    app.config["PROFILING_BACKEND"] = "pyinstrument"
+    client.get("/categories", headers=_header(app))
+    record = profiling.store.all()[0]
+    assert record["backend"] == "pyinstrument"
+    assert record["collapsed"]
+def test_token_endpoint_requires_admin(app, client, user_token, admin_token):
+    assert client.post("/admin/profiles/token", headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+    assert client.get("/admin/profiles", headers={"Authorization": f"Bearer {user_token}"}).status_code == 403
+    r = client.post("/admin/profiles/token", json={"ttl": 30}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 201
+    body = r.get_json()
+    assert body["header"] == "X-Profile"
+    assert verify(app.config["SECRET_KEY"], body["value"])
+    r = client.post("/admin/profiles/token", json={"ttl": 0}, headers={"Authorization": f"Bearer {admin_token}"})
+    assert r.status_code == 400
+def test_directory_store_keeps_newest_profiles(tmp_path):
+    store = ProfileStore(max_profiles=2, directory=str(tmp_path))
+    for i in range(3):
+        store.add({"id": f"p{i}", "created_at_ns": i, "endpoint": "x"})
+    assert [r["id"] for r in store.all()] == ["p2", "p1"]
+    assert store.get("p0") is None
+    assert store.get("p2")["endpoint"] == "x"
@@ -0,0 +1,201 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+import pytest
+from backend.app.upstream import UpstreamCache, UpstreamError, upstream
+ARTICLES = [{"id": i, "title": f"Post {i}", "url": f"https://dev.to/p/{i}", "published_at": "2026-01-01", "body": "x"} for i in range(3)]
+FEED = {"items": [{"guid": "g1", "title": "Ep 1", "link": "https://yt/1", "pubDate": "2026-01-01", "enclosure": {"url": "https://a/1.mp3"}}]}
+FEEDS = {
+    "yt": {"items": [{"guid": "v1", "title": "Video", "link": "https://yt/v1", "pubDate": "2026-01-03 09:00:00"}]},
+    "pod": {"items": [{"title": "Pod", "pubDate": "2026-01-02 09:00:00", "enclosure": {"url": "https://a/p.mp3"}}]},
+}
+class StubUpstream:
+    def __init__(self):
+        self.calls = {}
+        self.delay = 0.0
+        self.delays = {}
+        self.status = 200
+        self.version = 1
+        self.not_modified = 0
+        self._lock = threading.Lock()
+        stub = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                parsed = urlparse(self.path)
+                with stub._lock:
+                    stub.calls[parsed.path] = stub.calls.get(parsed.path, 0) + 1
+                query = parse_qs(parsed.query)
+                time.sleep(stub.delays.get(query.get("rss_url", [parsed.path])[0], stub.delay))
+                if stub.status != 200:
+                    self.send_response(stub.status)
+                    self.end_headers()
+                    return
+                if parsed.path == "/rss":
+                    body = FEEDS.get(query["rss_url"][0], FEED)
+                elif parsed.path == "/api/comments":
+                    body = [{"a_id": parse_qs(parsed.query)["a_id"][0]}]
+                else:
+                    body = ARTICLES
+                payload = json.dumps(body).encode()
+                etag = '"v%d"' % stub.version
+                if self.headers.get("If-None-Match") == etag:
+                    with stub._lock:
+                        stub.not_modified += 1
+                    self.send_response(304)
+                    self.end_headers()
+                    return
+                self.send_response(200)
+                self.send_header("ETag", etag)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+            def log_message(self, *args):
+                pass
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+@pytest.fixture
+def stub(app, monkeypatch):
+    server = StubUpstream()
+    monkeypatch.setitem(app.config, "PROXY_DEVTO_API_URL", server.url + "/api")
+    monkeypatch.setitem(app.config, "PROXY_RSS2JSON_URL", server.url + "/rss")
+    monkeypatch.setitem(app.config, "PROXY_YOUTUBE_FEED_URL", "yt")
+    monkeypatch.setitem(app.config, "PROXY_PODCAST_FEED_URL", "pod")
+    upstream.cache.clear()
+    yield server
+    upstream.cache.clear()
+    server.close()
+def test_proxy_routes_are_registered_and_shape_payloads(client, stub):
+    r = client.get("/proxy/devto-articles")
+    assert r.status_code == 200
+    assert r.get_json()[0] == {"id": 0, "title": "Post 0", "url": "https://dev.to/p/0", "published_at": "2026-01-01"}
+    assert client.get("/proxy/youtube-videos").get_json()["items"][0]["guid"] == "v1"
+    assert client.get("/proxy/podcasts").get_json()[0]["audio_url"] == "https://a/p.mp3"
+    assert client.get("/proxy/devto-comments?a_id=7").get_json() == [{"a_id": "7"}]
+    assert client.get("/proxy/devto-comments").status_code == 400
+def test_concurrent_misses_are_coalesced(app, stub):
+    stub.delay = 0.2
+    def fetch(_):
+        return app.test_client().get("/proxy/devto-articles").status_code
+    with ThreadPoolExecutor(max_workers=100) as pool:
+        cold = list(pool.map(fetch, range(100)))
+        warm = list(pool.map(fetch, range(100)))
+    assert set(cold + warm) == {200}
+    assert stub.calls == {"/api/articles": 1}
+    assert upstream.cache.stats["coalesced"] + upstream.cache.stats["misses"] == 100
+def test_failures_are_negatively_cached(client, stub):
+    stub.status = 503
+    for _ in range(5):
+        r = client.get("/proxy/devto-articles")
+        assert r.status_code == 500
+        assert "Failed to fetch Dev.to articles" in r.get_json()["error"]
+    assert stub.calls == {"/api/articles": 1}
+    assert upstream.cache.stats["negative_hits"] == 4
+def test_read_timeout_is_enforced(client, stub, monkeypatch):
+    monkeypatch.setattr(upstream, "timeout", (1, 0.1))
+    stub.delay = 0.5
+    started = time.perf_counter()
+    r = client.get("/proxy/devto-article/1")
+    assert r.status_code == 500
+    assert time.perf_counter() - started < 0.5
+def test_expired_entries_revalidate_with_etag(client, stub, monkeypatch):
+    monkeypatch.setattr(upstream.cache, "ttl", 0)
+    monkeypatch.setattr(upstream.cache, "stale_ttl", 0)
+    first = client.get("/proxy/devto-articles").get_json()
+    assert client.get("/proxy/devto-articles").get_json() == first
+    assert stub.calls == {"/api/articles": 2}
+    assert stub.not_modified == 1
+    stub.version = 2
+    assert client.get("/proxy/devto-articles").status_code == 200
+    assert stub.not_modified == 1
+def test_feed_merges_sources_by_publish_date(client, stub):
+    r = client.get("/proxy/feed")
+    assert r.status_code == 200
+    body = r.get_json()
+    assert [(i["source"], i["type"]) for i in body["items"]] == [
+        ("youtube", "video"), ("podcasts", "audio"),
+        ("devto", "article"), ("devto", "article"), ("devto", "article"),
+    ]
+    assert {name: s["status"] for name, s in body["sources"].items()} == {
+        "youtube": "ok", "devto": "ok", "podcasts": "ok",
+    }
+    assert client.get("/proxy/feed?sources=devto&limit=2").get_json()["items"][1]["id"] == 1
+    assert client.get("/proxy/feed?sources=nope").status_code == 400
+def test_feed_returns_partial_results_when_a_source_is_slow(client, stub, monkeypatch):
+    monkeypatch.setitem(client.application.config, "PROXY_FEED_TIMEOUT", 0.3)
+    stub.delays = {"pod": 1.0, "yt": 0.1, "/api/articles": 0.1}
+    started = time.perf_counter()
+    body = client.get("/proxy/feed").get_json()
+    assert time.perf_counter() - started < 0.6
+    assert body["sources"]["podcasts"] == {"status": "timeout"}
+    assert body["sources"]["youtube"]["status"] == "ok"
+    assert {i["source"] for i in body["items"]} == {"youtube", "devto"}
+def test_slow_source_does_not_starve_the_fanout_pool(app, stub, monkeypatch):
+    monkeypatch.setitem(app.config, "PROXY_FEED_TIMEOUT", 0.5)
+    stub.delays = {"pod": 2.0}
+    def fetch(_):
+        return app.test_client().get("/proxy/feed").get_json()["sources"]
+    with ThreadPoolExecutor(max_workers=20) as pool:
+        results = list(pool.map(fetch, range(20)))
+    for sources in results:
+        assert sources["podcasts"] == {"status": "timeout"}
+        assert sources["youtube"]["status"] == sources["devto"]["status"] == "ok"
+    assert stub.calls["/rss"] == 2
+def test_followers_stop_waiting_after_wait_timeout():
+    cache = UpstreamCache(wait_timeout=0.05)
+    release = threading.Event()
+    leader = threading.Thread(target=cache.get, args=("k", lambda: release.wait(1)))
+    leader.start()
+    deadline = time.monotonic() + 1
+    while "k" not in cache._inflight and time.monotonic() < deadline:
+        time.sleep(0.005)
+    with pytest.raises(UpstreamError):
+        cache.get("k", lambda: "unused")
+    release.set()
+    leader.join()
+    cache.shutdown()
+def test_feed_reports_all_failures(client, stub):
+    stub.status = 502
+    r = client.get("/proxy/feed")
+    assert r.status_code == 500
+    assert {s["status"] for s in r.get_json()["sources"].values()} == {"error"}
+def test_cache_serves_stale_while_revalidating():
+    cache = UpstreamCache(ttl=0.05, stale_ttl=60, negative_ttl=60)
+    calls = []
+    release = threading.Event()
+    def loader():
+        calls.append(1)
+        if len(calls) > 1:
+            release.wait(1)
+        return len(calls)
+    assert cache.get("k", loader) == 1
+    time.sleep(0.06)
+    assert cache.get("k", loader) == 1
+    assert cache.get("k", loader) == 1
+    release.set()
+    deadline = time.monotonic() + 1
+    while cache.get("k", loader) != 2 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert cache.get("k", loader) == 2
+    assert len(calls) == 2
+    assert cache.stats["stale_hits"] >= 2
+    cache.shutdown()
+def test_failed_refresh_keeps_serving_stale_value():
+    cache = UpstreamCache(ttl=0.01, stale_ttl=60, negative_ttl=60)
+    assert cache.get("k", lambda: "good") == "good"
+    time.sleep(0.02)
+    def broken():
+        raise UpstreamError("down")
+    assert cache.get("k", broken) == "good"
+    time.sleep(0.05)
+    assert cache.get("k", broken) == "good"
+    assert cache.stats["errors"] == 1
+    cache.shutdown()
@@ -0,0 +1,75 @@
+import pytest
+from backend.app.ratelimit import MemoryBackend, limiter
+@pytest.fixture
+def limits(app, monkeypatch):
+    monkeypatch.setitem(app.config, "RATELIMIT_ENABLED", True)
+    monkeypatch.setitem(app.config, "RATELIMIT_LIMITS", {
+        "login": {"ip": (5, 60), "identifier": (2, 60)},
+        "password_reset_sms": {"ip": (3, 60)},
+    })
+    limiter.reset()
+    yield
+    limiter.reset()
+def test_ring_buffer_slides_with_window(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("backend.app.ratelimit.time.monotonic", lambda: clock[0])
+    backend = MemoryBackend()
+    assert backend.hit("k", 2, 10)[0]
+    clock[0] += 4
+    assert backend.hit("k", 2, 10)[0]
+    allowed, retry_after = backend.hit("k", 2, 10)
+    assert not allowed and retry_after == pytest.approx(6)
+    clock[0] += 6
+    assert backend.hit("k", 2, 10)[0]
+    assert not backend.hit("k", 2, 10)[0]
+def test_memory_backend_bounds_tracked_keys():
+    backend = MemoryBackend(max_keys=3)
+    for i in range(10):
+        backend.hit(f"key-{i}", 1, 60)
+    assert len(backend._buckets) == 3
+def test_login_throttled_per_identifier(client, limits):
+    payload = {"email": "mallory@example.com", "password": "wrong-password"}
+    assert client.post("/auth/login", json=payload).status_code == 401
+    assert client.post("/auth/login", json=payload).status_code == 401
+    r = client.post("/auth/login", json=payload)
+    assert r.status_code == 429
+    assert int(r.headers["Retry-After"]) >= 1
+    other = {"email": "someone.else@example.com", "password": "wrong-password"}
+    assert client.post("/auth/login", json=other).status_code == 401
+def test_login_throttled_per_ip(client, limits):
+    codes = [
+        client.post("/auth/login", json={"email": f"user{i}@example.com", "password": "x"}).status_code
+        for i in range(6)
+    ]
+    assert codes == [401] * 5 + [429]
+def test_sms_reset_throttled(client, limits):
+    codes = [
+        client.post("/auth/request-password-reset-sms", json={"identifier": "088998899"}).status_code
+        for _ in range(4)
+    ]
+    assert codes == [400, 400, 400, 429]
+def test_phone_spellings_share_an_identifier_bucket(app, client, limits, monkeypatch):
+    monkeypatch.setitem(app.config["RATELIMIT_LIMITS"], "password_reset_sms", {"identifier": (2, 60)})
+    codes = [
+        client.post("/auth/request-password-reset-sms", json={"identifier": number}).status_code
+        for number in ("+254 700 123456", "254700123456", "0700123456")
+    ]
+    assert codes[-1] == 429
+    r = client.post("/auth/request-password-reset-sms", json={"identifier": "+254711123456"})
+    assert r.status_code != 429
+def test_identifier_rejection_does_not_spend_ip_budget(client, limits):
+    payload = {"email": "mallory@example.com", "password": "wrong-password"}
+    codes = [client.post("/auth/login", json=payload).status_code for _ in range(6)]
+    assert codes == [401, 401] + [429] * 4
+    other = {"email": "someone.else@example.com", "password": "wrong-password"}
+    assert client.post("/auth/login", json=other).status_code == 401
+def test_ip_buckets_use_forwarded_client_address(app, client, limits, monkeypatch):
+    from werkzeug.middleware.proxy_fix import ProxyFix
+    monkeypatch.setattr(app, "wsgi_app", ProxyFix(app.wsgi_app, x_for=1))
+    def attempt(i, ip):
+        return client.post(
+            "/auth/login", json={"email": f"user{i}@example.com", "password": "x"},
+            headers={"X-Forwarded-For": ip},
+        ).status_code
+    assert [attempt(i, "203.0.113.1") for i in range(6)] == [401] * 5 + [429]
+    assert attempt(99, "203.0.113.2") == 401
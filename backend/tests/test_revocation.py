@@ -0,0 +1,137 @@
+import time
+from datetime import datetime, timedelta
+import pytest
+from flask_jwt_extended.utils import decode_token
+from sqlalchemy import update
+from backend.app import db
+from backend.app.models import RefreshToken, User
+from backend.app.revocation import BloomFilter, MemoryRevocationStore, RedisDeactivatedUsers
+from backend.tests.utils import auth_header, count_queries, get_tokens, user_id_from_token
+def test_bloom_filter_membership():
+    bloom = BloomFilter(capacity=1000, error_rate=0.01)
+    for i in range(500):
+        bloom.add(f"jti-{i}")
+    assert all(f"jti-{i}" in bloom for i in range(500))
+    false_positives = sum(f"other-{i}" in bloom for i in range(5000))
+    assert false_positives < 150
+def test_login_does_not_persist_refresh_tokens(client, app):
+    get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        assert RefreshToken.query.count() == 0
+def test_refresh_needs_no_database_query(client, app):
+    _, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        app.extensions["token_revocation"].sync(force=True)
+    r, statements = count_queries(app, lambda: client.post("/auth/refresh", headers=auth_header(rt)))
+    assert r.status_code == 200
+    assert r.get_json()["access_token"]
+    assert statements == []
+def test_logout_revokes_refresh_token(client, app):
+    _, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    assert client.delete("/auth/logout", headers=auth_header(rt)).status_code == 200
+    r = client.post("/auth/refresh", headers=auth_header(rt))
+    assert r.status_code == 401
+    assert r.get_json() == {"error": "Token revoked."}
+    with app.app_context():
+        row = RefreshToken.query.one()
+        assert row.revoked is True
+def test_logout_revokes_refresh_token_persisted_before_deploy(client, app):
+    _, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        payload = decode_token(rt)
+        db.session.add(RefreshToken(
+            token=payload["jti"],
+            user_id=user_id_from_token(rt),
+            expires_at=datetime.utcnow() + timedelta(days=1),
+            revoked=False,
+        ))
+        db.session.commit()
+    assert client.delete("/auth/logout", headers=auth_header(rt)).status_code == 200
+    with app.app_context():
+        assert RefreshToken.query.filter_by(token=payload["jti"]).one().revoked is True
+        assert MemoryRevocationStore().is_revoked(payload["jti"]) is True
+def test_revocations_from_other_workers_are_synced(client, app):
+    _, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        payload = decode_token(rt)
+        db.session.add(RefreshToken(
+            token=payload["jti"],
+            user_id=user_id_from_token(rt),
+            expires_at=datetime.utcnow() + timedelta(days=1),
+            revoked=True,
+        ))
+        db.session.commit()
+        app.extensions["token_revocation"].sync(force=True)
+    assert client.post("/auth/refresh", headers=auth_header(rt)).status_code == 401
+def test_incremental_sync_rescans_revocations_committed_late(client, app):
+    _, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        jti = decode_token(rt)["jti"]
+        expires_at = datetime.utcnow() + timedelta(days=1)
+        db.session.add(RefreshToken(token=jti, user_id=user_id_from_token(rt), expires_at=expires_at))
+        db.session.commit()
+        store = MemoryRevocationStore(sync_seconds=0, overlap_seconds=60)
+        store.sync(force=True)
+        db.session.add(RefreshToken(
+            token="later-id", user_id=user_id_from_token(rt), expires_at=expires_at,
+            revoked=True, revoked_at=datetime.utcnow(),
+        ))
+        db.session.commit()
+        store.sync()
+        assert "later-id" in store._bloom
+        db.session.execute(
+            update(RefreshToken)
+            .where(RefreshToken.token == jti)
+            .values(revoked=True, revoked_at=datetime.utcnow() - timedelta(seconds=30))
+        )
+        db.session.commit()
+        store.sync()
+        assert store.is_revoked(jti) is True
+def test_deactivated_user_is_rejected_without_database_query(client, app, admin_token):
+    at, rt = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        uid = user_id_from_token(at)
+    assert client.post(f"/admin/users/{uid}/deactivate", headers=auth_header(admin_token)).status_code == 200
+    for token, method, url in ((at, "GET", "/auth/me"), (rt, "POST", "/auth/refresh")):
+        r, statements = count_queries(app, lambda: client.open(url, method=method, headers=auth_header(token)))
+        assert r.status_code == 401
+        assert r.get_json() == {"error": "Account deactivated."}
+        assert statements == []
+def test_deactivated_user_cannot_log_in(client, app):
+    at, _ = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        user = db.session.get(User, user_id_from_token(at))
+        user.is_active = False
+        db.session.commit()
+    r = client.post("/auth/login", json={"email": "kara.mills@example.com", "password": "Rt5!Ms8#Kp2@Lw9"})
+    assert r.status_code == 403
+    assert r.get_json() == {"error": "Account deactivated."}
+def test_deactivations_from_other_workers_are_loaded(client, app):
+    at, _ = get_tokens(client, email="kara.mills@example.com", password="Rt5!Ms8#Kp2@Lw9")
+    with app.app_context():
+        uid = user_id_from_token(at)
+        db.session.execute(update(User).where(User.id == uid).values(is_active=False))
+        db.session.commit()
+        assert client.get("/auth/me", headers=auth_header(at)).status_code == 200
+        app.extensions["user_deactivations"].load()
+    assert client.get("/auth/me", headers=auth_header(at)).status_code == 401
+def test_redis_deactivations_are_broadcast():
+    fakeredis = pytest.importorskip("fakeredis")
+    server = fakeredis.FakeServer()
+    first = RedisDeactivatedUsers(fakeredis.FakeRedis(server=server), sync_seconds=0)
+    second = RedisDeactivatedUsers(fakeredis.FakeRedis(server=server), sync_seconds=0)
+    try:
+        first.update(42, active=False)
+        assert 42 in first
+        deadline = time.monotonic() + 5
+        while 42 not in second and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert 42 in second
+        second.update(42, active=True)
+        deadline = time.monotonic() + 5
+        while 42 in first and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert 42 not in first
+    finally:
+        first.shutdown()
+        second.shutdown()
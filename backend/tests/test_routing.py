@@ -0,0 +1,66 @@
+import time
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.pool import StaticPool
+from backend.app import db
+from backend.app.models import Category
+from backend.app.routing import REPLICA_BIND, MemoryStickiness, RedisStickiness
+from backend.config import engine_options, replica_binds
+from backend.tests.utils import auth_header
+@pytest.fixture
+def replica(app, monkeypatch):
+    engine = create_engine("sqlite://", poolclass=StaticPool, connect_args={"check_same_thread": False})
+    db.metadata.create_all(engine)
+    with engine.begin() as conn:
+        conn.execute(Category.__table__.insert().values(name="Replica only"))
+    with app.app_context():
+        monkeypatch.setitem(db.engines, REPLICA_BIND, engine)
+    yield engine
+    engine.dispose()
+def _names(client, headers=None):
+    r = client.get("/categories", headers=headers)
+    assert r.status_code == 200
+    return {c["name"] for c in r.get_json()}
+def test_read_only_endpoints_use_replica(app, client, replica):
+    with app.app_context():
+        db.session.add(Category(name="Primary only"))
+        db.session.commit()
+    assert _names(client) == {"Replica only"}
+def test_writes_go_to_primary_and_reads_stick_to_it(app, client, replica, admin_token):
+    client.delete_cookie("db_primary_until")
+    r = client.post("/admin/categories", json={"name": "Fresh"}, headers=auth_header(admin_token))
+    assert r.status_code == 201
+    cookie = client.get_cookie("db_primary_until")
+    assert cookie is not None and float(cookie.value) > time.time()
+    assert _names(client) == {"Fresh"}
+    with replica.connect() as conn:
+        assert [row.name for row in conn.execute(Category.__table__.select())] == ["Replica only"]
+    client.delete_cookie("db_primary_until")
+    assert _names(client) == {"Replica only"}
+def test_bearer_clients_stick_to_primary_without_cookies(app, client, replica, admin_token, monkeypatch):
+    monkeypatch.setitem(app.extensions, "db_stickiness", MemoryStickiness())
+    r = client.post("/admin/categories", json={"name": "Fresh"}, headers=auth_header(admin_token))
+    assert r.status_code == 201
+    client.delete_cookie("db_primary_until")
+    assert _names(client, auth_header(admin_token)) == {"Fresh"}
+    assert _names(client) == {"Replica only"}
+def test_redis_stickiness_expires_per_identity():
+    fakeredis = pytest.importorskip("fakeredis")
+    store = RedisStickiness(fakeredis.FakeRedis())
+    store.mark("7", 10)
+    assert store.is_sticky("7") and not store.is_sticky("8")
+def test_no_sticky_cookie_without_replica(client, admin_token):
+    client.delete_cookie("db_primary_until")
+    r = client.post("/admin/categories", json={"name": "Fresh"}, headers=auth_header(admin_token))
+    assert r.status_code == 201
+    assert client.get_cookie("db_primary_until") is None
+    assert _names(client) == {"Fresh"}
+def test_engine_options_from_environment(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "7")
+    monkeypatch.setenv("DB_STATEMENT_TIMEOUT_MS", "2500")
+    options = engine_options("postgresql://db/app")
+    assert options["pool_size"] == 7
+    assert options["pool_pre_ping"] is True
+    assert options["connect_args"] == {"options": "-c statement_timeout=2500"}
+    assert "pool_size" not in engine_options("sqlite:///app.db")
+    assert replica_binds("postgresql://replica/app")["replica"]["url"] == "postgresql://replica/app"
@@ -0,0 +1,45 @@
+import time
+import pytest
+from backend.app import scheduling
+from backend.app.scheduling import JobRunner
+class FakeJob:
+    def __init__(self):
+        self.started = []
+        self.stopped = 0
+    def start_scheduler(self, app, interval_minutes):
+        self.started.append(interval_minutes)
+    def shutdown(self):
+        self.stopped += 1
+@pytest.fixture
+def job(app, monkeypatch, tmp_path):
+    fake = FakeJob()
+    monkeypatch.setattr(scheduling, "_jobs", lambda: [(fake, "TOKEN_SWEEP_INTERVAL_MINUTES")])
+    monkeypatch.setitem(app.config, "TOKEN_SWEEP_INTERVAL_MINUTES", 15)
+    monkeypatch.setitem(app.config, "SCHEDULER_LOCK_FILE", str(tmp_path / "scheduler.lock"))
+    monkeypatch.setitem(app.config, "SCHEDULER_LEADER_RETRY_SECONDS", 0.05)
+    return fake
+def test_only_one_runner_schedules_jobs(app, job):
+    pytest.importorskip("fcntl")
+    first, second = JobRunner(), JobRunner()
+    try:
+        assert first.start(app) is True
+        assert second.start(app) is False
+        assert job.started == [15]
+        first.shutdown()
+        assert job.stopped == 1
+        deadline = time.monotonic() + 5
+        while len(job.started) < 2:
+            assert time.monotonic() < deadline, "follower never took over the scheduler lock"
+            time.sleep(0.01)
+        assert second.leader
+    finally:
+        first.shutdown()
+        second.shutdown()
+    assert job.stopped == 2
+def test_create_app_does_not_start_jobs_when_testing(app):
+    assert app.extensions["job_runner"].leader is False
+def test_runner_without_jobs_stays_idle(app, monkeypatch):
+    monkeypatch.setattr(scheduling, "_jobs", lambda: [])
+    runner = JobRunner()
+    assert runner.start(app) is False
+    assert runner._waiter is None
@@ -0,0 +1,64 @@
+from collections import Counter
+from types import SimpleNamespace
+from backend.app import db, seeding
+from backend.app.models import Comment, Notification, Reaction, ReactionTypeEnum, User
+def _materialize(counts, **options):
+    return {name: list(rows) for name, rows in seeding.generate(counts, **options).items()}
+def test_allocate_respects_cap_and_total():
+    counts = seeding.allocate(100, [50, 30, 10, 10], cap=40)
+    assert sum(counts) == 100
+    assert max(counts) == 40
+    assert seeding.allocate(1000, [1, 1], cap=10) == [10, 10]
+def test_zipf_skews_reactions_toward_popular_content():
+    counts = seeding.counts_for("tiny", users=500, contents=200, reactions=5000)
+    reactions = _materialize(counts, zipf=1.2)["reactions"]
+    per_content = sorted(Counter(r["content_id"] for r in reactions).values(), reverse=True)
+    assert len(reactions) == 5000
+    assert per_content[0] > 20 * per_content[len(per_content) // 2]
+    assert len({(r["user_id"], r["content_id"]) for r in reactions}) == 5000
+    uniform = _materialize(counts, zipf=0)["reactions"]
+    assert max(Counter(r["content_id"] for r in uniform).values()) < per_content[0]
+def test_comment_threads_are_deep_but_bounded():
+    counts = seeding.counts_for("tiny", contents=5, comments=2000)
+    comments = _materialize(counts, reply_ratio=0.9, depth_bias=0.9, max_depth=6)["comments"]
+    parents = {c["id"]: c["parent_id"] for c in comments}
+    def depth(comment_id):
+        d = 0
+        while parents[comment_id]:
+            comment_id = parents[comment_id]
+            d += 1
+        return d
+    assert max(depth(c["id"]) for c in comments) == 6
+def test_seed_appends_after_existing_rows(app):
+    counts = seeding.counts_for("tiny")
+    with app.app_context():
+        first = seeding.seeder.seed(counts, seed=1)
+        second = seeding.seeder.seed(counts, seed=1)
+        assert first["users"]["rows"] == second["users"]["rows"] == counts["users"]
+        assert User.query.count() == 2 * counts["users"]
+        assert Comment.query.count() == 2 * counts["comments"]
+        assert Reaction.query.count() == 2 * counts["reactions"]
+        assert Notification.query.count() == 2 * counts["notifications"]
+        assert db.session.query(User).filter_by(email=seeding.user_email(counts["users"] + 1)).one()
+def test_seed_cli_reports_rows(app):
+    result = app.test_cli_runner().invoke(args=["seed", "--scale", "tiny", "--reactions", "50", "--comments", "10"])
+    assert result.exit_code == 0, result.output
+    assert "reactions" in result.output and " 50 rows" in result.output
+def test_copy_writes_csv_with_enum_names_and_nulls():
+    statements = []
+    class Cursor:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def copy_expert(self, sql, buffer):
+            statements.append((sql, buffer.read()))
+    conn = SimpleNamespace(connection=SimpleNamespace(dbapi_connection=SimpleNamespace(cursor=Cursor)))
+    rows = [
+        {"id": 1, "user_id": 2, "content_id": 3, "type": ReactionTypeEnum.like, "created_at": seeding.BASE_TIME},
+        {"id": 2, "user_id": 2, "content_id": None, "type": ReactionTypeEnum.dislike, "created_at": seeding.BASE_TIME},
+    ]
+    seeding._copy(conn, db.metadata.tables["reactions"], rows)
+    sql, payload = statements[0]
+    assert sql == "COPY reactions (id, user_id, content_id, type, created_at) FROM STDIN WITH (FORMAT csv)"
+    assert payload.splitlines() == ["1,2,3,like,2024-01-01 00:00:00", "2,2,,dislike,2024-01-01 00:00:00"]
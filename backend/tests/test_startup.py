@@ -0,0 +1,27 @@
+from backend.app.startup import package_totals, parse_importtime, startup_profiler
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |     sqlalchemy.util
+import time:       300 |        420 |   sqlalchemy
+import time:        50 |        470 | backend.app
+"""
+def test_parse_importtime():
+    entries = parse_importtime(SAMPLE.splitlines())
+    assert [(e["module"], e["depth"]) for e in entries] == [
+        ("sqlalchemy.util", 2), ("sqlalchemy", 1), ("backend.app", 0),
+    ]
+    assert entries[1]["cumulative_us"] == 420
+    assert package_totals(entries) == {"sqlalchemy": 420, "backend": 50}
+def test_public_worker_skips_auth_integrations():
+    report = startup_profiler.profile("backend.config.TestConfig", blueprints="content,categories")
+    assert report["blueprints"] == ["categories", "content"]
+    modules = {entry["module"] for entry in report["imports"]}
+    assert "backend.app.content" in modules
+    for lazy in ("authlib.integrations.flask_client", "flask_migrate", "flask_mail", "backend.app.auth"):
+        assert lazy not in modules
+def test_oauth_provider_without_credentials_is_unavailable(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, "GOOGLE_CLIENT_ID", None)
+    app.extensions.pop("authlib.integrations.flask_client", None)
+    r = client.get("/auth/login/google")
+    app.extensions.pop("authlib.integrations.flask_client", None)
+    assert r.status_code == 503
+    assert r.get_json() == {"error": "Google login is not configured."}
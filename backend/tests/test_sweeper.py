@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+import pytest
+from backend.app import db, hasher
+from backend.app.metrics import metrics
+from backend.app.models import EmailVerificationToken, PasswordResetToken, PhoneOTP, RefreshToken, User
+from backend.app.sweeper import sweeper
+@pytest.fixture
+def stale_rows(app):
+    now = datetime.utcnow()
+    past = now - timedelta(hours=2)
+    future = now + timedelta(hours=2)
+    with app.app_context():
+        user = User(email="lena.ortiz@example.com", name="Lena", password_hash=hasher.generate("Pw!12345678"))
+        db.session.add(user)
+        db.session.flush()
+        for i in range(5):
+            db.session.add(RefreshToken(token=f"old-{i}", user_id=user.id, expires_at=past, revoked=True))
+            db.session.add(PhoneOTP(phone_number="+254700000000", otp_code=f"{i:06d}", expires_at=past))
+        db.session.add(RefreshToken(token="live", user_id=user.id, expires_at=future, revoked=True))
+        db.session.add(PhoneOTP(phone_number="+254700000000", otp_code="999999", expires_at=future))
+        db.session.add(PasswordResetToken(user_id=user.id, token="expired", expires_at=past))
+        db.session.add(PasswordResetToken(user_id=user.id, token="used", expires_at=future, used=True))
+        db.session.add(PasswordResetToken(user_id=user.id, token="valid", expires_at=future))
+        db.session.add(EmailVerificationToken(user_id=user.id, token="ev-old", expires_at=past))
+        db.session.add(EmailVerificationToken(user_id=user.id, token="ev-new", expires_at=future))
+        db.session.commit()
+def test_sweep_removes_only_expired_or_used_rows(app, stale_rows):
+    with app.app_context():
+        removed = sweeper.sweep(batch_size=2)
+        assert removed == {
+            "refresh_tokens": 5,
+            "password_reset_tokens": 2,
+            "email_verification_tokens": 1,
+            "phone_otps": 5,
+        }
+        assert [t.token for t in RefreshToken.query.all()] == ["live"]
+        assert [t.token for t in PasswordResetToken.query.all()] == ["valid"]
+        assert [t.otp_code for t in PhoneOTP.query.all()] == ["999999"]
+        assert sweeper.stats.last_removed == removed
+def test_sweep_totals_are_exported_as_metrics(app, stale_rows):
+    with app.app_context():
+        before = sweeper.stats.as_dict()["total_removed"].get("phone_otps", 0)
+        sweeper.sweep()
+    gauge = {labels[0][1]: value for labels, value in metrics.snapshot()["gauges"]["sweeper_rows_removed"]}
+    assert gauge["phone_otps"] == before + 5
+def test_sweep_respects_max_batches(app, stale_rows):
+    with app.app_context():
+        removed = sweeper.sweep(batch_size=2, max_batches=1)
+        assert removed["refresh_tokens"] == 2
+        assert RefreshToken.query.count() == 4
+def test_sweep_cli_reports_counts(app, runner, stale_rows):
+    result = runner.invoke(args=["sweep-tokens", "--batch-size", "3"])
+    assert result.exit_code == 0
+    assert "phone_otps: 5 rows removed" in result.output
+    with app.app_context():
+        assert PhoneOTP.query.count() == 1
@@ -1,4 +1,5 @@
 import pytest
+from sqlalchemy import event
 from flask_jwt_extended.utils import decode_token
 from backend.app.models import Role, UserRole
 from backend.app import db
@@ -22,6 +23,18 @@ def get_tokens(client, email="emma.watson@example.com", password="Gt9@Xy2!QpL8#Z
     resp = login(client, email, password)
     data = resp.get_json() or {}
     return data["access_token"], data["refresh_token"]
+def count_queries(app, fn):
+    statements = []
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        result = fn()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    return result, statements
 def user_id_from_token(token):
     return int(decode_token(token)["sub"])
 @pytest.fixture
@@ -0,0 +1,3 @@
+import os
+from backend.app import create_app
+app = create_app(os.getenv("APP_CONFIG", "backend.config.ProdConfig"))
@@ -2,5 +2,5 @@ from app import create_app
 
 app = create_app()
 
-if _name_ == "_main_":
+if __name__ == "__main__":
     app.run(host="0.0.0.0", port=5000)